@@ -0,0 +1,269 @@
+"""
+Module du cache des blobs - Résultats de détection indexés par SHA de blob git, partagés entre dépôts et analyses
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import List, Dict, Optional, Set, Tuple, BinaryIO
+from config import DOSSIER_CACHE, TAILLE_MAX_CACHE_BLOBS
+
+# Nom du fichier du cache dans DOSSIER_CACHE
+NOM_FICHIER_CACHE_BLOBS = 'blobs.sqlite3'
+
+# Taille approximative d'une entrée hors résultat (clé, version, colonnes SQLite)
+TAILLE_FIXE_ENTREE = 64
+
+# Après une éviction, le cache est ramené à cette fraction de sa taille maximale
+FRACTION_APRES_EVICTION = 0.9
+
+# Attente maximale d'un verrou tenu par un autre processus (secondes) : au-delà, une lecture
+# est un échec du cache et une écriture est abandonnée, sans interrompre l'analyse
+DELAI_ATTENTE_CACHE = 5
+
+# Nombre de nouvelles entrées écrites ensemble, dans une transaction courte
+TAILLE_LOT_ECRITURE = 100
+
+
+def calculer_sha_blob(octets: bytes) -> str:
+    """
+    Calculer le SHA d'un blob git (identique à `git hash-object`)
+    
+    Args:
+        octets: Contenu du fichier
+        
+    Returns:
+        SHA hexadécimal du blob
+    """
+    empreinte = hashlib.sha1(b'blob %d\x00' % len(octets))
+    empreinte.update(octets)
+    return empreinte.hexdigest()
+
+
+class FluxEmpreinte:
+    """Flux en lecture qui calcule au passage le SHA de blob git du contenu lu"""
+    
+    def __init__(self, flux: BinaryIO, taille: int):
+        """
+        Initialisation du flux
+        
+        Args:
+            flux: Flux binaire lu
+            taille: Taille annoncée du contenu (en-tête du blob)
+        """
+        self.flux = flux
+        self.taille = taille
+        self.lus = 0
+        self._empreinte = hashlib.sha1(b'blob %d\x00' % taille)
+    
+    def read(self, taille: int = -1) -> bytes:
+        """
+        Lire une partie du flux
+        
+        Args:
+            taille: Nombre maximal d'octets lus (-1 : jusqu'à la fin)
+            
+        Returns:
+            Octets lus
+        """
+        octets = self.flux.read(taille)
+        self.lus += len(octets)
+        self._empreinte.update(octets)
+        return octets
+    
+    @property
+    def sha(self) -> Optional[str]:
+        """SHA du blob, None si le contenu n'a pas été lu entièrement"""
+        if self.lus != self.taille:
+            return None
+        return self._empreinte.hexdigest()
+
+
+class CacheBlobs:
+    """Cache persistant SHA de blob -> découvertes (liste vide : blob propre), avec éviction LRU"""
+    
+    def __init__(self, version: str, chemin: Optional[str] = None,
+                 taille_max: int = TAILLE_MAX_CACHE_BLOBS):
+        """
+        Initialisation du cache
+        
+        Args:
+            version: Version des règles (empreinte du paquet et mode d'analyse) ; les entrées
+                     d'une autre version sont ignorées et supprimées
+            chemin: Chemin du fichier SQLite, par défaut DOSSIER_CACHE/blobs.sqlite3
+            taille_max: Taille maximale des résultats enregistrés (octets)
+        """
+        if chemin is None:
+            chemin = str(Path(DOSSIER_CACHE) / NOM_FICHIER_CACHE_BLOBS)
+        Path(chemin).parent.mkdir(exist_ok=True, parents=True)
+        
+        self.version = version
+        self.taille_max = taille_max
+        self._verrou = threading.Lock()
+        # Accès enregistrés en mémoire, écrits en une fois par valider()
+        self._acces: Set[str] = set()
+        # Nouvelles entrées pas encore écrites : SHA -> (résultat, taille, dernier accès)
+        self._nouvelles: Dict[str, Tuple[bytes, int, float]] = {}
+        self.succes = 0
+        self.echecs = 0
+        
+        # Connexion partagée entre les dépôts analysés simultanément, protégée par un verrou.
+        # Journal WAL : les lectures d'autres processus ne sont jamais bloquées par une écriture,
+        # et les écritures ne tiennent le verrou que le temps d'une transaction courte
+        self.connexion = sqlite3.connect(chemin, timeout=DELAI_ATTENTE_CACHE, check_same_thread=False)
+        try:
+            self.connexion.execute('PRAGMA journal_mode=WAL')
+            self.connexion.execute('PRAGMA synchronous=NORMAL')
+            with self.connexion:
+                self.connexion.execute(
+                    'CREATE TABLE IF NOT EXISTS blobs ('
+                    'sha TEXT PRIMARY KEY, version TEXT NOT NULL, resultat BLOB NOT NULL, '
+                    'taille INTEGER NOT NULL, dernier_acces REAL NOT NULL)'
+                )
+                self.connexion.execute('CREATE INDEX IF NOT EXISTS blobs_acces ON blobs (dernier_acces)')
+                # Les résultats obtenus avec d'autres règles ne seront plus jamais valides
+                self.connexion.execute('DELETE FROM blobs WHERE version != ?', (version,))
+        except sqlite3.OperationalError as e:
+            print(f"⚠️  Cache des blobs indisponible, analyse sans cache : {e}")
+            self.connexion.close()
+            self.connexion = None
+    
+    def obtenir(self, sha: str, chemin_fichier: str) -> Optional[List[Dict]]:
+        """
+        Obtenir les découvertes mémorisées pour un blob
+        
+        Args:
+            sha: SHA du blob
+            chemin_fichier: Chemin du fichier dans le dépôt analysé (ajouté aux découvertes)
+            
+        Returns:
+            Découvertes (liste vide si le blob est propre), None si le blob est inconnu
+        """
+        with self._verrou:
+            if sha in self._nouvelles:
+                resultat = self._nouvelles[sha][0]
+            else:
+                resultat = self._lire(sha)
+                if resultat is None:
+                    self.echecs += 1
+                    return None
+                self._acces.add(sha)
+            self.succes += 1
+        if not resultat:
+            return []
+        decouvertes = json.loads(zlib.decompress(resultat).decode('utf-8'))
+        for decouverte in decouvertes:
+            decouverte['chemin_fichier'] = chemin_fichier
+        return decouvertes
+    
+    def _lire(self, sha: str) -> Optional[bytes]:
+        """
+        Lire le résultat enregistré d'un blob (appelé avec le verrou tenu)
+        
+        Args:
+            sha: SHA du blob
+            
+        Returns:
+            Résultat compressé (vide : blob propre), None si le blob est inconnu ou la base occupée
+        """
+        if self.connexion is None:
+            return None
+        try:
+            ligne = self.connexion.execute(
+                'SELECT resultat FROM blobs WHERE sha = ? AND version = ?', (sha, self.version)
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return None if ligne is None else ligne[0]
+    
+    def memoriser(self, sha: str, decouvertes: List[Dict]):
+        """
+        Mémoriser les découvertes d'un blob (écrites par lots de TAILLE_LOT_ECRITURE)
+        
+        Args:
+            sha: SHA du blob
+            decouvertes: Découvertes du détecteur pour ce blob (liste vide : blob propre)
+        """
+        resultat = b''
+        if decouvertes:
+            # Le chemin dépend du dépôt, pas du contenu : il est ajouté à la lecture
+            sans_chemin = [
+                {cle: valeur for cle, valeur in decouverte.items() if cle != 'chemin_fichier'}
+                for decouverte in decouvertes
+            ]
+            resultat = zlib.compress(json.dumps(sans_chemin, ensure_ascii=False, separators=(',', ':'))
+                                     .encode('utf-8'))
+        
+        with self._verrou:
+            self._nouvelles[sha] = (resultat, TAILLE_FIXE_ENTREE + len(resultat), time.time())
+            self._acces.discard(sha)
+            if len(self._nouvelles) >= TAILLE_LOT_ECRITURE:
+                self._ecrire_nouvelles()
+    
+    def _ecrire_nouvelles(self):
+        """Écrire les nouvelles entrées en une transaction courte (appelé avec le verrou tenu)"""
+        if not self._nouvelles:
+            return
+        lignes = [
+            (sha, self.version, resultat, taille, dernier_acces)
+            for sha, (resultat, taille, dernier_acces) in self._nouvelles.items()
+        ]
+        self._nouvelles.clear()
+        if self.connexion is None:
+            return
+        try:
+            with self.connexion:
+                self.connexion.executemany(
+                    'INSERT OR REPLACE INTO blobs (sha, version, resultat, taille, dernier_acces) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    lignes
+                )
+        except sqlite3.OperationalError as e:
+            # Base occupée par un autre processus : ces blobs seront simplement réanalysés
+            print(f"⚠️  Cache des blobs occupé, {len(lignes)} entrée(s) non enregistrée(s) : {e}")
+    
+    def valider(self):
+        """Enregistrer les nouvelles entrées et les accès, puis évincer les moins récemment utilisées"""
+        with self._verrou:
+            self._ecrire_nouvelles()
+            acces = self._acces
+            self._acces = set()
+            if self.connexion is None:
+                return
+            
+            try:
+                with self.connexion:
+                    if acces:
+                        maintenant = time.time()
+                        self.connexion.executemany(
+                            'UPDATE blobs SET dernier_acces = ? WHERE sha = ?',
+                            [(maintenant, sha) for sha in acces]
+                        )
+                    
+                    taille_totale = self.connexion.execute(
+                        'SELECT COALESCE(SUM(taille), 0) FROM blobs'
+                    ).fetchone()[0]
+                    if taille_totale > self.taille_max:
+                        a_liberer = taille_totale - int(self.taille_max * FRACTION_APRES_EVICTION)
+                        a_supprimer = []
+                        for sha, taille in self.connexion.execute(
+                            'SELECT sha, taille FROM blobs ORDER BY dernier_acces'
+                        ):
+                            if a_liberer <= 0:
+                                break
+                            a_supprimer.append((sha,))
+                            a_liberer -= taille
+                        self.connexion.executemany('DELETE FROM blobs WHERE sha = ?', a_supprimer)
+            except sqlite3.OperationalError as e:
+                # Accès perdus (ils ne servent qu'à l'ordre d'éviction), éviction reprise à la prochaine validation
+                print(f"⚠️  Cache des blobs occupé, validation reportée : {e}")
+    
+    def fermer(self):
+        """Valider les dernières modifications et fermer le fichier du cache"""
+        self.valider()
+        if self.connexion is not None:
+            self.connexion.close()
+            self.connexion = None
@@ -0,0 +1,194 @@
+"""
+Module du filtre de Bloom - Appartenance compacte d'un nom à un ensemble, fichier projeté en mémoire
+"""
+import hashlib
+import math
+import mmap
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+# Identifiant et version du format de fichier
+SIGNATURE_FILTRE = b'BLOOMHA1'
+
+# En-tête : signature, nombre de bits, nombre de fonctions, capacité, éléments ajoutés,
+# identifiant de la source, dernier rowid intégré, compteur de suppressions de la source
+FORMAT_EN_TETE = '<8sQIQQ32sQQ'
+TAILLE_EN_TETE = struct.calcsize(FORMAT_EN_TETE)
+
+
+class FiltreBloom:
+    """Filtre de Bloom : aucun faux négatif, faux positifs bornés par le dimensionnement"""
+    
+    def __init__(self, fichier, projection: mmap.mmap):
+        """
+        Initialisation du filtre à partir d'un fichier déjà projeté (voir creer() et ouvrir())
+        
+        Args:
+            fichier: Fichier ouvert en lecture et écriture
+            projection: Projection en mémoire du fichier
+        """
+        self._fichier = fichier
+        self._projection = projection
+        # Fichier temporaire et chemin définitif d'un filtre créé par creer() (publié par synchroniser())
+        self._publication: Optional[tuple] = None
+        (_, self.bits, self.fonctions, self.capacite, self.elements,
+         identifiant, self.rowid_max, self.suppressions) = struct.unpack_from(FORMAT_EN_TETE, projection, 0)
+        self.identifiant = identifiant.rstrip(b'\x00').decode('ascii')
+    
+    @staticmethod
+    def dimensionner(capacite: int, taux_faux_positifs: float) -> tuple:
+        """
+        Calculer la taille optimale du filtre
+        
+        Args:
+            capacite: Nombre d'éléments prévu
+            taux_faux_positifs: Taux de faux positifs visé à pleine capacité
+            
+        Returns:
+            (nombre de bits, multiple de 8 ; nombre de fonctions de hachage)
+        """
+        bits = math.ceil(-capacite * math.log(taux_faux_positifs) / (math.log(2) ** 2))
+        bits = max(64, (bits + 7) // 8 * 8)
+        fonctions = max(1, round(bits / capacite * math.log(2)))
+        return bits, fonctions
+    
+    @classmethod
+    def creer(cls, chemin: str, capacite: int, taux_faux_positifs: float, identifiant: str = '') -> 'FiltreBloom':
+        """
+        Créer un filtre vide (remplace le fichier existant)
+        
+        Le filtre est construit dans un fichier temporaire du même dossier, qui ne remplace le
+        fichier existant qu'à la première synchronisation (os.replace) : les processus qui ont
+        projeté l'ancien fichier gardent son inode, jamais tronqué ni réécrit sous leurs lectures.
+        
+        Args:
+            chemin: Chemin du fichier du filtre
+            capacite: Nombre d'éléments prévu
+            taux_faux_positifs: Taux de faux positifs visé à pleine capacité
+            identifiant: Identifiant de la source des éléments
+            
+        Returns:
+            Filtre vide
+        """
+        bits, fonctions = cls.dimensionner(capacite, taux_faux_positifs)
+        chemin = Path(chemin)
+        chemin.parent.mkdir(exist_ok=True, parents=True)
+        descripteur, temporaire = tempfile.mkstemp(prefix=f'{chemin.name}.', suffix='.tmp', dir=chemin.parent)
+        fichier = os.fdopen(descripteur, 'w+b')
+        try:
+            fichier.truncate(TAILLE_EN_TETE + bits // 8)
+            projection = mmap.mmap(fichier.fileno(), 0)
+        except OSError:
+            fichier.close()
+            os.unlink(temporaire)
+            raise
+        struct.pack_into(FORMAT_EN_TETE, projection, 0, SIGNATURE_FILTRE, bits, fonctions, capacite, 0,
+                         identifiant.encode('ascii'), 0, 0)
+        filtre = cls(fichier, projection)
+        filtre._publication = (temporaire, str(chemin))
+        return filtre
+    
+    @classmethod
+    def ouvrir(cls, chemin: str, prive: bool = False) -> Optional['FiltreBloom']:
+        """
+        Ouvrir un filtre existant, projeté en mémoire sans être lu
+        
+        Args:
+            chemin: Chemin du fichier du filtre
+            prive: Projection privée : les ajouts restent dans ce processus et le fichier n'est
+                   jamais modifié (fichier partagé avec d'autres processus)
+                   
+        Returns:
+            Filtre, None si le fichier est absent, illisible ou d'un autre format
+        """
+        try:
+            fichier = open(chemin, 'rb' if prive else 'r+b')
+        except OSError:
+            return None
+        try:
+            projection = mmap.mmap(fichier.fileno(), 0, access=mmap.ACCESS_COPY if prive else mmap.ACCESS_WRITE)
+        except (OSError, ValueError):
+            fichier.close()
+            return None
+        
+        if len(projection) < TAILLE_EN_TETE or projection[:len(SIGNATURE_FILTRE)] != SIGNATURE_FILTRE:
+            projection.close()
+            fichier.close()
+            return None
+        filtre = cls(fichier, projection)
+        if len(projection) != TAILLE_EN_TETE + filtre.bits // 8 or not filtre.fonctions:
+            filtre.fermer()
+            return None
+        return filtre
+    
+    def _positions(self, cle: str):
+        """
+        Calculer les bits d'une clé (double hachage sur une seule empreinte)
+        
+        Args:
+            cle: Élément
+            
+        Yields:
+            Rang de chaque bit
+        """
+        h1, h2 = struct.unpack('<QQ', hashlib.blake2b(cle.encode('utf-8'), digest_size=16).digest())
+        h2 |= 1
+        for i in range(self.fonctions):
+            yield (h1 + i * h2) % self.bits
+    
+    def ajouter(self, cle: str):
+        """
+        Ajouter un élément
+        
+        Args:
+            cle: Élément
+        """
+        projection = self._projection
+        for position in self._positions(cle):
+            octet = TAILLE_EN_TETE + (position >> 3)
+            projection[octet] |= 1 << (position & 7)
+        self.elements += 1
+    
+    def peut_contenir(self, cle: str) -> bool:
+        """
+        Vérifier si un élément a pu être ajouté
+        
+        Args:
+            cle: Élément
+            
+        Returns:
+            False si l'élément n'a jamais été ajouté, True s'il l'a probablement été
+        """
+        projection = self._projection
+        for position in self._positions(cle):
+            if not projection[TAILLE_EN_TETE + (position >> 3)] & (1 << (position & 7)):
+                return False
+        return True
+    
+    def __contains__(self, cle: str) -> bool:
+        """Équivalent de peut_contenir()"""
+        return self.peut_contenir(cle)
+    
+    def synchroniser(self):
+        """
+        Écrire l'en-tête et les bits modifiés sur le disque (sans effet pour une projection privée),
+        puis publier à son chemin définitif un filtre créé par creer()
+        """
+        struct.pack_into(FORMAT_EN_TETE, self._projection, 0, SIGNATURE_FILTRE, self.bits, self.fonctions,
+                         self.capacite, self.elements, self.identifiant.encode('ascii'),
+                         self.rowid_max, self.suppressions)
+        self._projection.flush()
+        if self._publication is not None:
+            os.replace(*self._publication)
+            self._publication = None
+    
+    def fermer(self):
+        """Enregistrer et fermer le fichier du filtre"""
+        if self._projection.closed:
+            return
+        self.synchroniser()
+        self._projection.close()
+        self._fichier.close()
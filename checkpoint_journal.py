@@ -0,0 +1,221 @@
+"""
+Module du journal de reprise - Progression enregistrée au fur et à mesure pour reprendre une analyse interrompue
+"""
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import List, Dict, Optional
+from config import FICHIER_REPRISE
+
+# Champs datés des informations d'un dépôt, enregistrés au format ISO 8601
+CHAMPS_DATES_DEPOT = ('maj_le', 'pousse_le')
+
+
+class JournalReprise:
+    """
+    Journal en ajout seul (une ligne JSON par événement) d'une analyse en cours
+    
+    Événements : 'debut' (type d'analyse, heure de début et dépôts prévus), 'fichier' (fichier
+    analysé et ses découvertes brutes), 'depot' (dépôt terminé et ses découvertes finales).
+    Chaque ligne est transmise au système dès son écriture : un processus tué ne perd au plus
+    que la ligne en cours, ignorée à la relecture. Le journal est supprimé une fois tous les
+    dépôts prévus analysés et le rapport généré.
+    """
+    
+    def __init__(self, chemin: str = FICHIER_REPRISE):
+        """
+        Initialisation du journal (aucun fichier ouvert avant commencer() ou reprendre())
+        
+        Args:
+            chemin: Chemin du fichier du journal
+        """
+        self.chemin = Path(chemin)
+        self._fichier = None
+        self._verrou = threading.Lock()
+        # État relu par reprendre() ou tenu à jour pendant l'analyse
+        self.depots_prevus: List[Dict] = []
+        self.depots_termines: Dict[str, List[Dict]] = {}
+        self._fichiers_termines: Dict[str, Dict[str, List[Dict]]] = {}
+    
+    @property
+    def actif(self) -> bool:
+        """Un journal est ouvert en écriture"""
+        return self._fichier is not None
+    
+    def existe(self) -> bool:
+        """Une analyse interrompue peut être reprise"""
+        return self.chemin.is_file() and self.chemin.stat().st_size > 0
+    
+    @staticmethod
+    def _serialiser_depot(depot: Dict) -> Dict:
+        """Convertir les dates des informations d'un dépôt en texte"""
+        return {
+            cle: valeur.isoformat() if isinstance(valeur, datetime) else valeur
+            for cle, valeur in depot.items()
+        }
+    
+    @staticmethod
+    def _restaurer_depot(depot: Dict) -> Dict:
+        """Reconvertir les dates des informations d'un dépôt"""
+        for cle in CHAMPS_DATES_DEPOT:
+            if isinstance(depot.get(cle), str):
+                try:
+                    depot[cle] = datetime.fromisoformat(depot[cle])
+                except ValueError:
+                    depot[cle] = None
+        return depot
+    
+    def _ecrire(self, evenement: Dict, durable: bool = False):
+        """
+        Ajouter un événement à la fin du journal
+        
+        Args:
+            evenement: Événement sérialisable en JSON
+            durable: Forcer l'écriture sur le disque (fsync), et pas seulement vers le système
+        """
+        ligne = json.dumps(evenement, ensure_ascii=False, separators=(',', ':'), default=str) + '\n'
+        with self._verrou:
+            if self._fichier is None:
+                return
+            self._fichier.write(ligne)
+            self._fichier.flush()
+            if durable:
+                os.fsync(self._fichier.fileno())
+    
+    def commencer(self, type_analyse: str, heure_debut_analyse: datetime, depots: List[Dict]):
+        """
+        Commencer le journal d'une nouvelle analyse (remplace un journal existant)
+        
+        Args:
+            type_analyse: Type d'analyse
+            heure_debut_analyse: Heure de début de l'analyse (reprise dans le rapport)
+            depots: Dépôts à analyser, dans l'ordre
+        """
+        self.fermer()
+        self.chemin.parent.mkdir(exist_ok=True, parents=True)
+        self.depots_prevus = list(depots)
+        self.depots_termines = {}
+        self._fichiers_termines = {}
+        self._fichier = open(self.chemin, 'w', encoding='utf-8')
+        self._ecrire({
+            'evenement': 'debut',
+            'type_analyse': type_analyse,
+            'heure_debut': heure_debut_analyse.isoformat(),
+            'depots': [self._serialiser_depot(depot) for depot in depots],
+        }, durable=True)
+    
+    def reprendre(self) -> Optional[Dict]:
+        """
+        Relire le journal d'une analyse interrompue et le rouvrir pour y ajouter la suite
+        
+        Returns:
+            {'type_analyse', 'heure_debut', 'depots_restants', 'decouvertes'} (découvertes des
+            dépôts déjà terminés), None si aucun journal exploitable n'existe
+        """
+        if not self.existe():
+            return None
+        
+        debut = None
+        depots_termines = {}
+        fichiers_termines = {}
+        with open(self.chemin, 'r', encoding='utf-8') as f:
+            for ligne in f:
+                try:
+                    evenement = json.loads(ligne)
+                except ValueError:
+                    # Dernière ligne coupée par l'interruption
+                    continue
+                nature = evenement.get('evenement')
+                if nature == 'debut':
+                    debut = evenement
+                elif nature == 'fichier':
+                    fichiers_termines.setdefault(evenement['depot'], {})[evenement['chemin']] = \
+                        evenement.get('decouvertes') or []
+                elif nature == 'depot':
+                    depots_termines[evenement['depot']] = evenement.get('decouvertes') or []
+        if debut is None:
+            return None
+        
+        self.fermer()
+        self.depots_prevus = [self._restaurer_depot(depot) for depot in debut.get('depots', [])]
+        self.depots_termines = depots_termines
+        self._fichiers_termines = {
+            depot: fichiers for depot, fichiers in fichiers_termines.items() if depot not in depots_termines
+        }
+        self._fichier = open(self.chemin, 'a', encoding='utf-8')
+        
+        decouvertes = []
+        for decouvertes_depot in depots_termines.values():
+            decouvertes.extend(decouvertes_depot)
+        return {
+            'type_analyse': debut.get('type_analyse', 'inconnu'),
+            'heure_debut': datetime.fromisoformat(debut['heure_debut']),
+            'depots_restants': self.depots_restants(),
+            'decouvertes': decouvertes,
+        }
+    
+    def depots_restants(self) -> List[Dict]:
+        """
+        Obtenir les dépôts prévus qui ne sont pas encore terminés
+        
+        Returns:
+            Informations des dépôts restants, dans l'ordre prévu
+        """
+        with self._verrou:
+            return [depot for depot in self.depots_prevus if depot.get('nom_complet') not in self.depots_termines]
+    
+    def fichiers_termines(self, nom_depot: str) -> Dict[str, List[Dict]]:
+        """
+        Obtenir les fichiers d'un dépôt déjà analysés avant l'interruption
+        
+        Args:
+            nom_depot: Nom complet du dépôt
+            
+        Returns:
+            Dictionnaire chemin -> découvertes brutes du fichier (vide si le dépôt n'a pas été commencé)
+        """
+        with self._verrou:
+            return dict(self._fichiers_termines.get(nom_depot, {}))
+    
+    def fichier_termine(self, nom_depot: str, chemin: str, decouvertes: List[Dict]):
+        """
+        Enregistrer un fichier analysé
+        
+        Args:
+            nom_depot: Nom complet du dépôt
+            chemin: Chemin du fichier dans le dépôt
+            decouvertes: Découvertes brutes du fichier (avant déduplication et filtrage)
+        """
+        self._ecrire({'evenement': 'fichier', 'depot': nom_depot, 'chemin': chemin, 'decouvertes': decouvertes})
+    
+    def depot_termine(self, nom_depot: str, decouvertes: List[Dict]):
+        """
+        Enregistrer un dépôt terminé (analysé, ignoré ou en échec)
+        
+        Args:
+            nom_depot: Nom complet du dépôt
+            decouvertes: Découvertes finales du dépôt, telles qu'elles figureront dans le rapport
+        """
+        if not self.actif:
+            return
+        self._ecrire({'evenement': 'depot', 'depot': nom_depot, 'decouvertes': decouvertes}, durable=True)
+        with self._verrou:
+            self.depots_termines[nom_depot] = decouvertes
+            self._fichiers_termines.pop(nom_depot, None)
+    
+    def terminer(self):
+        """Supprimer le journal d'une analyse entièrement terminée"""
+        self.fermer()
+        self.chemin.unlink(missing_ok=True)
+        self.depots_prevus = []
+        self.depots_termines = {}
+        self._fichiers_termines = {}
+    
+    def fermer(self):
+        """Fermer le journal en le conservant (analyse à reprendre)"""
+        with self._verrou:
+            if self._fichier is not None:
+                self._fichier.close()
+                self._fichier = None
@@ -0,0 +1,103 @@
+"""
+Module de récupération concurrente - Téléchargements par un pool de threads, bornés et dans l'ordre d'origine
+"""
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Optional, Iterable, Iterator, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from config import GITHUB_TOKEN, REQUETES_SIMULTANEES
+
+
+class RecuperateurConcurrent:
+    """Téléchargement concurrent du contenu brut des fichiers, via un client HTTP à connexions persistantes"""
+    
+    def __init__(self, token: str = GITHUB_TOKEN, requetes_simultanees: int = REQUETES_SIMULTANEES,
+                 timeout: int = 30):
+        """
+        Initialisation du récupérateur
+        
+        Args:
+            token: GitHub Personal Access Token
+            requetes_simultanees: Nombre maximal de requêtes en cours
+            timeout: Délai d'expiration d'une requête (secondes)
+        """
+        self.requetes_simultanees = max(1, requetes_simultanees)
+        self.timeout = timeout
+        
+        # Une connexion persistante par requête simultanée, réutilisée d'un fichier à l'autre
+        self.session = requests.Session()
+        adaptateur = HTTPAdapter(pool_connections=self.requetes_simultanees,
+                                 pool_maxsize=self.requetes_simultanees)
+        self.session.mount('https://', adaptateur)
+        self.session.mount('http://', adaptateur)
+        if token:
+            self.session.headers['Authorization'] = f'token {token}'
+    
+    def telecharger(self, url: str) -> Optional[bytes]:
+        """
+        Télécharger le contenu brut d'un fichier
+        
+        Args:
+            url: URL de téléchargement
+            
+        Returns:
+            Contenu du fichier (octets), None en cas d'échec
+        """
+        try:
+            reponse = self.session.get(url, timeout=self.timeout)
+        except requests.RequestException:
+            return None
+        if reponse.status_code != 200:
+            return None
+        return reponse.content
+    
+    def recuperer(self, fichiers: Iterable[Dict]) -> Iterator[Tuple[Dict, Optional[bytes]]]:
+        """
+        Télécharger des fichiers avec plusieurs requêtes en cours, dans l'ordre d'origine
+        
+        Fenêtre glissante de téléchargements soumis à un pool de threads : l'appelant analyse
+        les fichiers reçus pendant que les suivants sont téléchargés, et au plus
+        2 * requetes_simultanees contenus sont en attente si l'analyse est plus lente que le réseau.
+        
+        Args:
+            fichiers: Informations des fichiers (clé url_telechargement)
+            
+        Yields:
+            (informations du fichier, contenu ou None en cas d'échec)
+        """
+        taille_fenetre = 2 * self.requetes_simultanees
+        en_cours = deque()
+        with ThreadPoolExecutor(max_workers=self.requetes_simultanees) as threads:
+            try:
+                for infos_fichier in fichiers:
+                    url = infos_fichier.get('url_telechargement')
+                    en_cours.append((infos_fichier, threads.submit(self.telecharger, url) if url else None))
+                    if len(en_cours) >= taille_fenetre:
+                        yield self._resultat(*en_cours.popleft())
+                
+                while en_cours:
+                    yield self._resultat(*en_cours.popleft())
+            finally:
+                # Arrêt anticipé de l'appelant : annuler les téléchargements pas encore commencés
+                for _, telechargement in en_cours:
+                    if telechargement is not None:
+                        telechargement.cancel()
+    
+    @staticmethod
+    def _resultat(infos_fichier: Dict, telechargement: Optional[Future]) -> Tuple[Dict, Optional[bytes]]:
+        """
+        Attendre la fin d'un téléchargement
+        
+        Args:
+            infos_fichier: Informations du fichier
+            telechargement: Téléchargement soumis, None si le fichier n'a pas d'URL
+            
+        Returns:
+            (informations du fichier, contenu ou None)
+        """
+        return infos_fichier, telechargement.result() if telechargement is not None else None
+    
+    def fermer(self):
+        """Fermer les connexions persistantes"""
+        self.session.close()
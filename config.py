@@ -10,14 +10,25 @@ load_dotenv()
 
 # ================= CONFIGURATION GITHUB =================
 GITHUB_TOKEN = os.getenv('GITHUB_TOKEN', '')
+# Tokens supplémentaires de la réserve : liste séparée par des virgules, et/ou fichier (un token par ligne)
+GITHUB_TOKENS = [token.strip() for token in os.getenv('GITHUB_TOKENS', '').split(',') if token.strip()]
+FICHIER_TOKENS_GITHUB = os.getenv('FICHIER_TOKENS_GITHUB', '')
 GITHUB_ENTERPRISE_URL = os.getenv('GITHUB_ENTERPRISE_URL', '')  # Pour GitHub Enterprise
 GITHUB_API_VERSION = os.getenv('GITHUB_API_VERSION', '2022-11-28')
 
 # ================= CONFIGURATION DU SCAN =================
 INTERVALLE_SCAN_HEURES = int(os.getenv('INTERVALLE_SCAN_HEURES', 24))
 DOSSIER_SORTIE = os.getenv('DOSSIER_SORTIE', './rapports_analyse')
+# Dépôts analysés il y a plus de MAX_HISTORIQUE_JOURS jours : réanalysés par ordre de priorité (mode automatique,
+# REANALYSES_PAR_ANALYSE par analyse) si l'historique est conservé, retirés de l'historique sinon
 CONSERVE_HISTORIQUE = os.getenv('CONSERVE_HISTORIQUE', 'true').lower() == 'true'
 MAX_HISTORIQUE_JOURS = int(os.getenv('MAX_HISTORIQUE_JOURS', 30))
+REANALYSES_PAR_ANALYSE = int(os.getenv('REANALYSES_PAR_ANALYSE', 20))
+# Durée du bail d'un dépôt en cours d'analyse (historique partagé par plusieurs instances du scanner) : renouvelé
+# tant que l'instance est en vie, il expire après sa mort et le dépôt peut alors être repris par une autre instance
+DUREE_BAIL_MINUTES = float(os.getenv('DUREE_BAIL_MINUTES', 10))
+# Journal de reprise de l'analyse en cours (fichiers et découvertes enregistrés au fur et à mesure, --reprendre)
+FICHIER_REPRISE = os.getenv('FICHIER_REPRISE', './historique_analyse/reprise_analyse.jsonl')
 
 # ================= MODÈLES D'INFORMATIONS SENSIBLES ÉTENDUES =================
 MODELES_SENSIBLES = [
@@ -400,7 +411,33 @@ NIVEAU_CONFIANCE = {
 }
 
 # Taille maximale des fichiers à analyser (en octets)
-TAILLE_MAX_FICHIER = 10 * 1024 * 1024  # 10 MB
+TAILLE_MAX_FICHIER = int(os.getenv('TAILLE_MAX_FICHIER', 10 * 1024 * 1024))  # 10 MB
+
+# Analyse en flux des gros fichiers : au-delà de ce seuil, le fichier est lu bloc par bloc
+TAILLE_MIN_FLUX = int(os.getenv('TAILLE_MIN_FLUX', 1024 * 1024))  # 1 MB
+TAILLE_BLOC_FLUX = int(os.getenv('TAILLE_BLOC_FLUX', 256 * 1024))  # 256 KB
+# Recouvrement maximal entre deux blocs (longueur retenue pour les motifs sans borne)
+RECOUVREMENT_MAX_FLUX = int(os.getenv('RECOUVREMENT_MAX_FLUX', 4096))
+
+# Appliquer les règles au contenu entier du fichier (correspondances sur plusieurs lignes)
+# plutôt que ligne par ligne
+ANALYSE_TAMPON_ENTIER = os.getenv('ANALYSE_TAMPON_ENTIER', 'false').lower() == 'true'
+
+# Profilage des règles (appels, correspondances, temps cumulé par règle)
+PROFILAGE_REGLES = os.getenv('PROFILAGE_REGLES', 'false').lower() == 'true'
+# Temps maximal (secondes) d'une règle sur un fichier avant son abandon pour ce fichier - 0 pour désactiver
+BUDGET_REGLE_SECONDES = float(os.getenv('BUDGET_REGLE_SECONDES', 2.0))
+
+# Répertoire du cache (paquet de règles analysées) - vide pour désactiver
+DOSSIER_CACHE = os.getenv('DOSSIER_CACHE', './cache')
+# Cache des résultats par SHA de blob git (évite de retélécharger et réanalyser un contenu déjà vu)
+CACHE_BLOBS = os.getenv('CACHE_BLOBS', 'true').lower() == 'true'
+TAILLE_MAX_CACHE_BLOBS = int(os.getenv('TAILLE_MAX_CACHE_BLOBS', 64 * 1024 * 1024))  # 64 MB
+# Cache des réponses de l'API revalidées par ETag / Last-Modified (les réponses 304 ne consomment pas de budget)
+CACHE_HTTP = os.getenv('CACHE_HTTP', 'true').lower() == 'true'
+TAILLE_MAX_CACHE_HTTP = int(os.getenv('TAILLE_MAX_CACHE_HTTP', 256 * 1024 * 1024))  # 256 MB
+# Réponses non revalidées depuis ce nombre de jours supprimées - 0 pour désactiver
+AGE_MAX_CACHE_HTTP_JOURS = float(os.getenv('AGE_MAX_CACHE_HTTP_JOURS', 30))
 
 # Encodages de fichiers à essayer
 ENCODAGES = ['utf-8', 'latin-1', 'iso-8859-1', 'cp1252']
@@ -423,8 +460,11 @@ FAUX_POSITIFS = [
 
 # ================= LIMITES API GITHUB =================
 DEPOTS_MAX_PAR_RECHERCHE = int(os.getenv('DEPOTS_MAX_PAR_RECHERCHE', 200))
-DELAI_RECHERCHE_SECONDES = int(os.getenv('DELAI_RECHERCHE_SECONDES', 2))
-REQUETES_MAX_PAR_HEURE = int(os.getenv('REQUETES_MAX_PAR_HEURE', 30))
+# Les requêtes sont espacées d'après les en-têtes X-RateLimit-* et Retry-After de GitHub
+# (budgets core, search, code_search et graphql suivis séparément)
+# Plafond local de requêtes par heure et par ressource, en plus des limites de GitHub (0 : aucun)
+REQUETES_MAX_PAR_HEURE = int(os.getenv('REQUETES_MAX_PAR_HEURE', 0))
+# Nombre de nouvelles tentatives après une requête refusée pour limite de taux
 TAUX_LIMIT_RETRY = int(os.getenv('TAUX_LIMIT_RETRY', 5))
 
 # ================= CONFIGURATION DE NOTIFICATION =================
@@ -438,6 +478,11 @@ SEUIL_ALERTE_HAUTE = int(os.getenv('SEUIL_ALERTE_HAUTE', 5))
 SEUIL_ALERTE_MOYENNE = int(os.getenv('SEUIL_ALERTE_MOYENNE', 10))
 
 # ================= CONFIGURATION DE BASE DE DONNÉES =================
+# Historique d'analyse : base historique_analyse/DB_NAME (seul sqlite est pris en charge)
+# Filtre de Bloom des dépôts analysés (dans DOSSIER_CACHE) : la plupart des dépôts jamais analysés
+# sont écartés sans interroger la base - environ 0,6 MB par million de dépôts à 10 % de faux positifs
+FILTRE_HISTORIQUE = os.getenv('FILTRE_HISTORIQUE', 'true').lower() == 'true'
+TAUX_FAUX_POSITIFS_FILTRE = float(os.getenv('TAUX_FAUX_POSITIFS_FILTRE', 0.1))
 DB_TYPE = os.getenv('DB_TYPE', 'sqlite')  # sqlite, postgres, mysql
 DB_HOST = os.getenv('DB_HOST', 'localhost')
 DB_PORT = os.getenv('DB_PORT', '')
@@ -478,6 +523,26 @@ REPORT_TEMPLATE = os.getenv('REPORT_TEMPLATE', 'default')
 INCLUDE_CONTEXT_LINES = int(os.getenv('INCLUDE_CONTEXT_LINES', 3))
 GENERATE_SUMMARY = os.getenv('GENERATE_SUMMARY', 'true').lower() == 'true'
 
+# ================= RÉCUPÉRATION DES FICHIERS =================
+# Mode de récupération du contenu : 'api' (un appel par fichier), 'graphql' (de nombreux fichiers par
+# requête GraphQL), 'archive' (une archive tar par dépôt) ou 'clone' (clone superficiel dans un
+# répertoire temporaire, hors limite de taux de l'API)
+MODE_RECUPERATION = os.getenv('MODE_RECUPERATION', 'api')
+# Nombre de téléchargements simultanés par dépôt (mode api)
+REQUETES_SIMULTANEES = int(os.getenv('REQUETES_SIMULTANEES', 16))
+# Délai maximal d'un clone (secondes)
+DELAI_CLONE_SECONDES = int(os.getenv('DELAI_CLONE_SECONDES', 300))
+# Nombre de fichiers lus en parallèle dans un clone local
+THREADS_LECTURE_LOCALE = int(os.getenv('THREADS_LECTURE_LOCALE', 8))
+# Nombre maximal de fichiers par requête GraphQL (réduit automatiquement si le serveur refuse la requête)
+FICHIERS_MAX_REQUETE_GRAPHQL = int(os.getenv('FICHIERS_MAX_REQUETE_GRAPHQL', 100))
+# Volume de texte visé par requête GraphQL de contenu (octets)
+OCTETS_MAX_REQUETE_GRAPHQL = int(os.getenv('OCTETS_MAX_REQUETE_GRAPHQL', 2 * 1024 * 1024))
+# URL de l'API GitHub (archives des dépôts, point d'accès GraphQL)
+URL_API_GITHUB = os.getenv('URL_API_GITHUB', 'https://api.github.com')
+
 # ================= CONFIGURATION DE PARALLÉLISME =================
 MAX_WORKERS = int(os.getenv('MAX_WORKERS', 5))
-BATCH_SIZE = int(os.getenv('BATCH_SIZE', 10))
\ No newline at end of file
+BATCH_SIZE = int(os.getenv('BATCH_SIZE', 10))
+# Nombre de dépôts analysés simultanément (1 : un dépôt après l'autre)
+DEPOTS_SIMULTANES = int(os.getenv('DEPOTS_SIMULTANES', 4))
\ No newline at end of file
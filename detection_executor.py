@@ -0,0 +1,418 @@
+"""
+Module d'exécution parallèle de la détection - Répartit l'analyse des fichiers sur plusieurs processus
+"""
+import itertools
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, Future, CancelledError, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Dict, Iterable, Tuple, Optional, Callable
+from config import MAX_WORKERS, BATCH_SIZE
+from secret_detector import DetecteurSecret, Tampon
+
+# Méthode de démarrage des processus de travail. Jamais fork : le groupe est créé pendant l'analyse,
+# alors que les threads de récupération tiennent des verrous qu'un processus copié hériterait verrouillés.
+# Avec forkserver, les processus sont copiés d'un serveur sans threads qui a déjà importé les règles
+METHODE_DEMARRAGE = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+# Un appel de règle qui dépasse MARGE_DUREE_APPEL fois le budget d'une règle sur un fichier
+# ne se terminera vraisemblablement pas (retour arrière catastrophique) : son processus est tué
+MARGE_DUREE_APPEL = 2
+
+# Intervalle de surveillance des processus de travail pendant l'attente des lots (secondes)
+PERIODE_SURVEILLANCE = 0.5
+
+# Nombre de renvois d'un lot dont le processus s'est arrêté sans avoir été tué par la surveillance
+RELANCES_MAX = 2
+
+# Lots en cours par processus de travail : au-delà, analyser() attend un résultat avant d'envoyer
+# le lot suivant (contenus des fichiers en attente bornés, récupération ralentie d'autant)
+LOTS_EN_COURS_PAR_WORKER = 2
+
+# Champs de l'état partagé de chaque processus : pid, numéro du lot (-1 si inactif),
+# index du fichier dans le lot, rang de la règle en cours, début de l'appel (horloge monotone, 0 si aucun)
+CHAMPS_ETAT = 5
+
+# Signal d'arrêt d'un processus bloqué (SIGKILL n'existe pas sous Windows)
+SIGNAL_ARRET = getattr(signal, 'SIGKILL', signal.SIGTERM)
+
+# Détecteur propre à chaque processus de travail, compilé une seule fois à son démarrage
+_detecteur_worker: Optional[DetecteurSecret] = None
+
+# État partagé avec le processus principal, et emplacement de ce processus dans cet état
+_etat_worker = None
+_emplacement_worker = 0
+
+
+def _initialiser_worker(modeles: List[str], tampon_entier: bool, profilage: bool, budget_regle: float,
+                        etat=None, compteur=None):
+    """
+    Initialiser un processus de travail avec ses règles précompilées
+    
+    Args:
+        modeles: Liste de motifs d'expressions régulières
+        tampon_entier: Mode d'analyse du détecteur
+        profilage: Enregistrer les compteurs de chaque règle
+        budget_regle: Temps maximal d'une règle sur un fichier
+        etat: Tableau partagé où publier la règle en cours (None sans surveillance)
+        compteur: Compteur partagé des emplacements déjà attribués dans l'état
+    """
+    global _detecteur_worker, _etat_worker, _emplacement_worker
+    _detecteur_worker = DetecteurSecret(modeles, tampon_entier=tampon_entier,
+                                        profilage=profilage, budget_regle=budget_regle)
+    if etat is None:
+        return
+    
+    with compteur.get_lock():
+        _emplacement_worker = compteur.value
+        compteur.value += 1
+    _etat_worker = etat
+    base = _emplacement_worker * CHAMPS_ETAT
+    etat[base] = os.getpid()
+    _signaler_fichier(-1, -1)
+    _detecteur_worker.surveillance = _signaler_regle
+
+
+def _signaler_fichier(numero_lot: int, index_fichier: int):
+    """
+    Publier le fichier en cours d'analyse (aucun appel de règle en cours)
+    
+    Args:
+        numero_lot: Numéro du lot, -1 si le processus est inactif
+        index_fichier: Index du fichier dans le lot
+    """
+    if _etat_worker is None:
+        return
+    base = _emplacement_worker * CHAMPS_ETAT
+    _etat_worker[base + 4] = 0.0
+    _etat_worker[base + 1] = numero_lot
+    _etat_worker[base + 2] = index_fichier
+
+
+def _signaler_regle(rang: int):
+    """
+    Publier la règle dont l'appel commence
+    
+    Le début est écrit en dernier et remis à zéro d'abord : le processus principal, qui le lit
+    après les autres champs, ne peut pas associer le début d'un appel à la règle d'un autre.
+    
+    Args:
+        rang: Rang de la règle (RANG_MOTEUR_COMBINE pour le moteur combiné)
+    """
+    base = _emplacement_worker * CHAMPS_ETAT
+    _etat_worker[base + 4] = 0.0
+    _etat_worker[base + 3] = rang
+    _etat_worker[base + 4] = time.monotonic()
+
+
+def _analyser_lot(numero_lot: int, lot: List[Tuple[str, Tampon]],
+                  exclusions: Dict[int, List[int]]) -> Tuple[List[List[Dict]], Dict]:
+    """
+    Analyser un lot de fichiers dans un processus de travail
+    
+    Args:
+        numero_lot: Numéro du lot (publié dans l'état partagé)
+        lot: Liste de (chemin du fichier, contenu)
+        exclusions: Règles abandonnées de chaque fichier (index dans le lot -> rangs)
+        
+    Returns:
+        Découvertes de chaque fichier dans l'ordre du lot, et données du profileur pour ce lot
+    """
+    decouvertes = []
+    for index_fichier, (chemin, contenu) in enumerate(lot):
+        _signaler_fichier(numero_lot, index_fichier)
+        decouvertes.append(
+            _detecteur_worker.detecter_secrets_dans_texte(contenu, chemin, exclusions.get(index_fichier, ()))
+        )
+    _signaler_fichier(-1, -1)
+    return decouvertes, _detecteur_worker.profileur.extraire()
+
+
+class ExecuteurDetection:
+    """
+    Exécuteur de détection réparti sur un groupe de processus
+    
+    Le budget de temps des règles est aussi appliqué de l'extérieur : chaque processus publie la
+    règle et le fichier en cours dans un état partagé, et un processus bloqué dans un seul appel
+    (que le budget vérifié entre deux appels ne peut pas interrompre) est tué. Le groupe est
+    alors recréé et les lots en cours renvoyés, la règle fautive étant abandonnée pour ce fichier.
+    """
+    
+    def __init__(self, detecteur: DetecteurSecret, nombre_workers: int = MAX_WORKERS,
+                 taille_lot: int = BATCH_SIZE):
+        """
+        Initialisation de l'exécuteur
+        
+        Args:
+            detecteur: Détecteur de référence (règles et mode d'analyse repris par les processus)
+            nombre_workers: Nombre de processus de travail (1 ou moins : analyse dans le processus courant,
+                            sans surveillance extérieure du budget)
+            taille_lot: Nombre de fichiers envoyés ensemble à un processus
+        """
+        self.detecteur = detecteur
+        self.nombre_workers = nombre_workers
+        self.taille_lot = max(1, taille_lot)
+        # Durée maximale d'un seul appel de règle, 0 si le budget est désactivé
+        self.duree_max_appel = max(0.0, detecteur.budget_regle) * MARGE_DUREE_APPEL
+        self._pool = None
+        self._etat = None
+        self._numeros_lots = itertools.count()
+        # Appels bloqués des processus tués : numéro du lot -> (index du fichier, rang, durée)
+        self._depassements: Dict[int, Tuple[int, int, float]] = {}
+        self._processus_tues = 0
+        # Plusieurs dépôts peuvent être analysés simultanément
+        self._verrou = threading.Lock()
+    
+    def _obtenir_pool(self) -> ProcessPoolExecutor:
+        """Créer le groupe de processus à la première utilisation (ou après l'arrêt du précédent)"""
+        with self._verrou:
+            if self._pool is None:
+                contexte = multiprocessing.get_context(METHODE_DEMARRAGE)
+                if METHODE_DEMARRAGE == 'forkserver':
+                    contexte.set_forkserver_preload([__name__])
+                etat = compteur = None
+                if self.duree_max_appel > 0:
+                    etat = contexte.RawArray('d', CHAMPS_ETAT * self.nombre_workers)
+                    compteur = contexte.Value('i', 0)
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.nombre_workers,
+                    mp_context=contexte,
+                    initializer=_initialiser_worker,
+                    initargs=(self.detecteur.regles_texte.sources, self.detecteur.tampon_entier,
+                              self.detecteur.profileur.actif, self.detecteur.budget_regle, etat, compteur)
+                )
+                self._etat = etat
+            return self._pool
+    
+    def _abandonner_pool(self, pool: ProcessPoolExecutor):
+        """
+        Arrêter un groupe de processus inutilisable, sans attendre ses lots
+        (appelé avec le verrou tenu)
+        
+        Args:
+            pool: Groupe à arrêter (ignoré s'il a déjà été remplacé)
+        """
+        if self._pool is not pool:
+            return
+        self._pool = None
+        self._etat = None
+        pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _soumettre(self, lot: List[Tuple[str, Tampon]], exclusions: Dict[int, List[int]],
+                   rappel: Optional[Callable[[str, List[Dict]], None]]) -> Tuple[int, Future]:
+        """
+        Envoyer un lot à un processus de travail
+        
+        Args:
+            lot: Liste de (chemin du fichier, contenu)
+            exclusions: Règles abandonnées de chaque fichier (index dans le lot -> rangs)
+            rappel: Fonction appelée pour chaque fichier du lot une fois celui-ci analysé
+            
+        Returns:
+            Numéro du lot et futur du résultat de _analyser_lot
+        """
+        while True:
+            pool = self._obtenir_pool()
+            numero_lot = next(self._numeros_lots)
+            try:
+                futur = pool.submit(_analyser_lot, numero_lot, lot, exclusions)
+                break
+            except RuntimeError:
+                # Groupe arrêté entre-temps (processus tué ou terminé brutalement) : le recréer
+                with self._verrou:
+                    self._abandonner_pool(pool)
+        
+        if rappel is not None:
+            chemins = [chemin for chemin, _ in lot]
+            
+            def signaler(futur_termine: Future):
+                if futur_termine.cancelled() or futur_termine.exception() is not None:
+                    return
+                # Copies : les découvertes sont complétées par le thread qui fusionne les résultats
+                for chemin, decouvertes in zip(chemins, futur_termine.result()[0]):
+                    rappel(chemin, [dict(decouverte) for decouverte in decouvertes])
+            
+            futur.add_done_callback(signaler)
+        return numero_lot, futur
+    
+    def _surveiller(self):
+        """Tuer les processus bloqués dans un appel de règle plus long que duree_max_appel"""
+        with self._verrou:
+            if self._pool is None or self._etat is None:
+                return
+            
+            etat = self._etat
+            maintenant = time.monotonic()
+            bloques = []
+            for emplacement in range(self.nombre_workers):
+                base = emplacement * CHAMPS_ETAT
+                # Le début de l'appel est lu après les autres champs (voir _signaler_regle)
+                pid, numero_lot, index_fichier, rang = etat[base:base + 4]
+                debut = etat[base + 4]
+                if numero_lot < 0 or debut <= 0 or maintenant - debut <= self.duree_max_appel:
+                    continue
+                self._depassements[int(numero_lot)] = (int(index_fichier), int(rang), maintenant - debut)
+                bloques.append(int(pid))
+            if not bloques:
+                return
+            
+            for pid in bloques:
+                try:
+                    os.kill(pid, SIGNAL_ARRET)
+                except OSError:
+                    pass
+            self._processus_tues += len(bloques)
+            self._abandonner_pool(self._pool)
+    
+    def _envoyer(self, lot: List[Tuple[str, Tampon]],
+                 rappel: Optional[Callable[[str, List[Dict]], None]]) -> Dict:
+        """
+        Envoyer un nouveau lot et préparer son suivi pour _attendre()
+        
+        Args:
+            lot: Liste de (chemin du fichier, contenu)
+            rappel: Fonction appelée pour chaque fichier du lot une fois celui-ci analysé
+            
+        Returns:
+            Suivi du lot : contenu, numéro et futur de l'envoi, règles abandonnées, renvois,
+            processus tués au moment de l'envoi et découvertes (None tant que le lot est en cours)
+        """
+        with self._verrou:
+            processus_tues = self._processus_tues
+        return {
+            'lot': lot,
+            'envoi': self._soumettre(lot, {}, rappel),
+            'exclusions': {},
+            'relances': 0,
+            'tues_a_l_envoi': processus_tues,
+            'decouvertes': None,
+        }
+    
+    def _attendre(self, suivis: List[Dict], en_attente: set,
+                  rappel: Optional[Callable[[str, List[Dict]], None]], en_cours_max: int = 0):
+        """
+        Attendre les résultats des lots envoyés en surveillant les processus, jusqu'à ce qu'il
+        ne reste pas plus de en_cours_max lots en cours
+        
+        Un lot interrompu par l'arrêt du groupe est renvoyé au nouveau groupe. Si son propre
+        processus a été tué, la règle bloquée est enregistrée comme abandonnée pour ce fichier
+        et exclue du renvoi. Le contenu d'un lot terminé est libéré.
+        
+        Args:
+            suivis: Suivi de chaque lot envoyé (voir _envoyer()), découvertes complétées ici
+            en_attente: Index des lots en cours dans suivis, mis à jour ici
+            rappel: Fonction appelée pour chaque fichier une fois celui-ci analysé
+            en_cours_max: Nombre de lots pouvant rester en cours au retour
+        """
+        while len(en_attente) > en_cours_max:
+            wait([suivis[numero]['envoi'][1] for numero in en_attente], timeout=PERIODE_SURVEILLANCE,
+                 return_when=FIRST_COMPLETED)
+            
+            for numero in sorted(en_attente):
+                suivi = suivis[numero]
+                numero_lot, futur = suivi['envoi']
+                if not futur.done():
+                    continue
+                try:
+                    decouvertes_lot, profil_lot = futur.result()
+                except (BrokenProcessPool, CancelledError):
+                    with self._verrou:
+                        depassement = self._depassements.pop(numero_lot, None)
+                        processus_tues = self._processus_tues
+                    if depassement is not None:
+                        index_fichier, rang, duree = depassement
+                        suivi['exclusions'].setdefault(index_fichier, []).append(rang)
+                        self.detecteur.profileur.abandonner(rang, suivi['lot'][index_fichier][0], duree,
+                                                            self.detecteur.budget_regle)
+                    elif processus_tues == suivi['tues_a_l_envoi']:
+                        # Arrêt qui ne vient pas de la surveillance (mémoire épuisée, etc.)
+                        suivi['relances'] += 1
+                        if suivi['relances'] > RELANCES_MAX:
+                            raise
+                    suivi['tues_a_l_envoi'] = processus_tues
+                    suivi['envoi'] = self._soumettre(suivi['lot'], suivi['exclusions'], rappel)
+                    continue
+                
+                suivi['decouvertes'] = decouvertes_lot
+                suivi['lot'] = None
+                self.detecteur.profileur.fusionner(profil_lot)
+                en_attente.discard(numero)
+            
+            if self.duree_max_appel > 0:
+                self._surveiller()
+    
+    def analyser(self, fichiers: Iterable[Tuple[str, Tampon]],
+                 rappel: Optional[Callable[[str, List[Dict]], None]] = None) -> List[Tuple[str, List[Dict]]]:
+        """
+        Analyser des fichiers et fusionner les résultats dans l'ordre d'origine
+        
+        Les fichiers sont consommés au fur et à mesure : les lots déjà envoyés sont analysés
+        pendant que les suivants sont récupérés. Au plus LOTS_EN_COURS_PAR_WORKER lots par
+        processus sont en cours : au-delà, un résultat est attendu avant de lire la suite.
+        
+        Args:
+            fichiers: Itérable de (chemin du fichier, contenu)
+            rappel: Fonction appelée avec (chemin, découvertes) dès qu'un fichier est analysé,
+                    éventuellement depuis un autre thread et dans le désordre
+                    
+        Returns:
+            Liste de (chemin du fichier, découvertes), dans l'ordre des fichiers
+        """
+        if self.nombre_workers <= 1:
+            resultats = []
+            for chemin, contenu in fichiers:
+                decouvertes = self.detecteur.detecter_secrets_dans_texte(contenu, chemin)
+                if rappel is not None:
+                    rappel(chemin, decouvertes)
+                resultats.append((chemin, decouvertes))
+            return resultats
+        
+        resultats = []
+        suivis: List[Dict] = []
+        en_attente = set()
+        en_cours_max = LOTS_EN_COURS_PAR_WORKER * self.nombre_workers
+        lot = []
+        
+        for chemin, contenu in fichiers:
+            # Le préfiltre par ancres est assez rapide pour rester dans le processus courant :
+            # seuls les fichiers pouvant contenir un secret sont envoyés aux processus
+            if not contenu or not self.detecteur.peut_contenir_secret(contenu):
+                resultats.append((chemin, None))
+                if rappel is not None:
+                    rappel(chemin, [])
+                continue
+            
+            # Les mmap et memoryview ne peuvent pas être transmis tels quels à un autre processus
+            if not isinstance(contenu, (str, bytes)):
+                contenu = bytes(contenu)
+            
+            resultats.append((chemin, len(suivis)))
+            lot.append((chemin, contenu))
+            if len(lot) >= self.taille_lot:
+                # Place libérée avant l'envoi : jamais plus de en_cours_max lots en mémoire
+                self._attendre(suivis, en_attente, rappel, en_cours_max - 1)
+                en_attente.add(len(suivis))
+                suivis.append(self._envoyer(lot, rappel))
+                lot = []
+        
+        if lot:
+            en_attente.add(len(suivis))
+            suivis.append(self._envoyer(lot, rappel))
+        
+        # Fusion dans l'ordre de soumission, compteurs des règles regroupés dans le processus courant
+        self._attendre(suivis, en_attente, rappel)
+        decouvertes_par_lot = [iter(suivi['decouvertes']) for suivi in suivis]
+        return [
+            (chemin, next(decouvertes_par_lot[numero_lot]) if numero_lot is not None else [])
+            for chemin, numero_lot in resultats
+        ]
+    
+    def fermer(self):
+        """Arrêter les processus de travail"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+            self._etat = None
@@ -1,34 +1,52 @@
 
-import time
+import os
 import re
-from datetime import datetime
-from typing import List, Dict, Optional
-from github import Github, GithubException
-from config import GITHUB_TOKEN, MOTS_CLES_RECHERCHE_IA, DEPOTS_MAX_PAR_RECHERCHE, DELAI_RECHERCHE_SECONDES
+import posixpath
+import shutil
+import subprocess
+import tarfile
+import tempfile
+from urllib.parse import quote
+from typing import List, Dict, Optional, Callable, Iterator, Tuple, BinaryIO, Iterable, Any
+import requests
+from github import Github, GithubException, RateLimitExceededException
+from token_pool import ReserveJetons, JetonGitHub, charger_tokens
+from http_cache import CacheHttp
+from config import (
+    GITHUB_TOKEN, MOTS_CLES_RECHERCHE_IA, DEPOTS_MAX_PAR_RECHERCHE, URL_API_GITHUB, DELAI_CLONE_SECONDES
+)
+
+# Nombre d'octets examinés pour reconnaître un fichier binaire
+TAILLE_TEST_BINAIRE = 8000
+
+# URL du contenu brut d'un fichier (proprietaire/depot, référence, chemin)
+URL_CONTENU_BRUT = "https://raw.githubusercontent.com/{depot}/{reference}/{chemin}"
 
 
 class ScannerGitHub:
     """Scanner de dépôts GitHub"""
     
-    def __init__(self, token: str = GITHUB_TOKEN):
+    def __init__(self, token: str = GITHUB_TOKEN, url_api: str = URL_API_GITHUB,
+                 tokens: Optional[List[str]] = None, cache_http: Optional[CacheHttp] = None):
         """
         Initialisation du scanner GitHub
         
         Args:
             token: GitHub Personal Access Token
+            url_api: URL de l'API GitHub (téléchargement des archives)
+            tokens: Tokens de la réserve, par défaut token suivi de GITHUB_TOKENS et FICHIER_TOKENS_GITHUB
+            cache_http: Cache des réponses de l'API, revalidées par requêtes conditionnelles (aucun si absent)
         """
-        if not token:
-            raise ValueError("Token GitHub requis. Veuillez définir GITHUB_TOKEN dans le fichier .env")
+        # Chaque requête part avec le token qui a le plus grand budget pour sa ressource
+        self.reserve = ReserveJetons(tokens if tokens is not None else charger_tokens(token), cache_http)
         
-        # Configuration des délais d'expiration et des tentatives pour éviter les longues attentes
-        self.github = Github(
-            token,
-            timeout=30,  # Délai d'expiration de 30 secondes
-            retry=None   # Désactive les tentatives automatiques, nous les gérons nous-mêmes
-        )
+        # Premier token : client par défaut et téléchargements hors API
+        self.github = self.reserve.jetons[0].github
+        self.token = self.reserve.jetons[0].token
+        self.url_api = url_api.rstrip('/')
         self.restant_limite_taux = None
         self.reinitialisation_limite_taux = None
-        
+    
     def obtenir_infos_limite_taux(self) -> Dict:
         """Obtenir les informations de limite de taux de l'API"""
         limite_taux = self.github.get_rate_limit()
@@ -40,14 +58,179 @@ class ScannerGitHub:
             'reinitialisation': noyau.reset
         }
     
-    def attendre_limite_taux(self):
-        """Attendre la réinitialisation de la limite de taux"""
-        infos = self.obtenir_infos_limite_taux()
-        if infos['restant'] < 10:
-            # infos['reinitialisation'] est un objet datetime, doit être comparé à datetime.now()
-            temps_attente = (infos['reinitialisation'] - datetime.now()).total_seconds() + 10
-            print(f"⚠️  Limite de taux d'API presque épuisée, attente de {temps_attente:.0f} secondes...")
-            time.sleep(max(0, temps_attente))
+    def attendre_limite_taux(self, ressource: str = 'core'):
+        """
+        Attendre qu'un token dispose de nouveau d'un budget pour la ressource, sans appel à l'API
+        
+        Args:
+            ressource: Ressource de l'API (core, search, code_search, graphql)
+        """
+        jeton = self.reserve.choisir(ressource)
+        if jeton is not None:
+            jeton.limiteur.acquerir(ressource, reserver=False)
+    
+    def _appeler(self, jeton: JetonGitHub, ressource: str, fonction: Callable, *args, **kwargs):
+        """
+        Appeler l'API via PyGithub avec un token donné, en respectant le budget de la ressource
+        
+        Le budget est mis à jour à partir des en-têtes de chaque réponse, par le hook de la session
+        du token (JetonGitHub._suivre_reponse) ; une requête refusée pour limite de taux est
+        réessayée après le délai indiqué par GitHub, jusqu'à TAUX_LIMIT_RETRY fois.
+        Un token refusé (401) est mis en quarantaine.
+        
+        Args:
+            jeton: Token de l'objet PyGithub appelé
+            ressource: Ressource de l'API sollicitée
+            fonction: Méthode PyGithub qui effectue la requête
+            
+        Returns:
+            Résultat de la méthode
+        """
+        tentative = 0
+        while True:
+            self.reserve.acquerir(jeton, ressource)
+            try:
+                resultat = fonction(*args, **kwargs)
+            except GithubException as e:
+                attente = jeton.limiteur.mettre_a_jour(e.headers or {}, ressource, e.status,
+                                                       isinstance(e, RateLimitExceededException))
+                if attente is None:
+                    if e.status == 401:
+                        self.reserve.mettre_en_quarantaine(jeton, "401 (token invalide, expiré ou révoqué)")
+                    raise
+                if tentative >= jeton.limiteur.tentatives:
+                    raise
+                tentative += 1
+                print(f"⚠️  Limite de taux de l'API ({ressource}) atteinte, nouvelle tentative "
+                      f"({tentative}/{jeton.limiteur.tentatives}) dans {attente:.0f} secondes...")
+                continue
+            return resultat
+    
+    def _appeler_reserve(self, ressource: str, appel: Callable[[Github], Any]) -> Tuple[Any, JetonGitHub]:
+        """
+        Appeler l'API avec le token qui a le plus grand budget, en changeant de token s'il est refusé
+        
+        Un token refusé (401, ou 403 hors limite de taux) laisse la place au suivant. Un 403
+        n'écarte le premier token que si un autre token obtient la réponse : s'ils sont tous
+        refusés, c'est la ressource qui est inaccessible et l'erreur remonte.
+        
+        Args:
+            ressource: Ressource de l'API sollicitée
+            appel: Fonction recevant le client PyGithub du token choisi et effectuant la requête
+            
+        Returns:
+            (résultat de l'appel, token utilisé, à réutiliser pour les objets obtenus)
+        """
+        exclus = []
+        refuses = []
+        erreur = None
+        while True:
+            jeton = self.reserve.choisir(ressource, exclus)
+            if jeton is None:
+                raise erreur
+            try:
+                resultat = self._appeler(jeton, ressource, appel, jeton.github)
+            except GithubException as e:
+                if e.status not in (401, 403):
+                    raise
+                # Limite de taux épuisée malgré les tentatives : essayer un autre token
+                if e.status == 403 and not isinstance(e, RateLimitExceededException):
+                    # Deuxième refus : la ressource elle-même est inaccessible
+                    if refuses:
+                        raise
+                    refuses.append(jeton)
+                exclus.append(jeton)
+                erreur = e
+                continue
+            
+            # Un autre token a obtenu la réponse : le refus venait du token lui-même
+            for refuse in refuses:
+                self.reserve.mettre_en_quarantaine(refuse, "403 (token sans accès ou bloqué)")
+            return resultat, jeton
+    
+    def _parcourir_pages(self, ressource: str, creer_liste: Callable[[Github], Any],
+                         jeton: Optional[JetonGitHub] = None) -> Iterator:
+        """
+        Parcourir une liste paginée PyGithub, chaque page passant par le limiteur
+        
+        Args:
+            ressource: Ressource de l'API sollicitée
+            creer_liste: Fonction recevant un client PyGithub et retournant la liste paginée
+                         (PaginatedList, construite sans requête)
+            jeton: Token imposé (liste obtenue depuis un objet de ce token) ; sans token imposé,
+                   chaque page part avec le token qui a le plus grand budget
+                   
+        Yields:
+            Éléments de la liste
+        """
+        page = 0
+        while True:
+            if jeton is None:
+                elements, _ = self._appeler_reserve(ressource, lambda github: creer_liste(github).get_page(page))
+            else:
+                elements = self._appeler(jeton, ressource, creer_liste(jeton.github).get_page, page)
+            yield from elements
+            if len(elements) < self.github.per_page:
+                return
+            page += 1
+    
+    def _requete_api(self, ressource: str, url: str, entetes: Optional[Dict[str, str]] = None,
+                     **kwargs) -> requests.Response:
+        """
+        Effectuer une requête HTTP directe vers l'API avec le token qui a le plus grand budget
+        
+        Args:
+            ressource: Ressource de l'API sollicitée
+            url: URL de la requête
+            entetes: En-têtes ajoutés à celui du token (Accept...)
+            **kwargs: Arguments transmis à requests.get
+            
+        Returns:
+            Réponse HTTP (dernière tentative si toutes ont été refusées)
+        """
+        tentative = 0
+        exclus = []
+        while True:
+            jeton = self.reserve.choisir(ressource, exclus)
+            self.reserve.acquerir(jeton, ressource)
+            reponse = requests.get(url, headers={**(entetes or {}), 'Authorization': f'token {jeton.token}'}, **kwargs)
+            # Les en-têtes de l'API sont sur la première réponse en cas de redirection (codeload)
+            entetes = reponse.history[0].headers if reponse.history else reponse.headers
+            attente = jeton.limiteur.mettre_a_jour(entetes, ressource, reponse.status_code)
+            
+            if reponse.status_code == 401 and self.reserve.choisir(ressource, exclus + [jeton]) is not None:
+                self.reserve.mettre_en_quarantaine(jeton, "401 (token invalide, expiré ou révoqué)")
+                exclus.append(jeton)
+                reponse.close()
+                continue
+            if attente is None or tentative >= jeton.limiteur.tentatives:
+                return reponse
+            reponse.close()
+            tentative += 1
+            print(f"⚠️  Limite de taux de l'API ({ressource}) atteinte, nouvelle tentative "
+                  f"({tentative}/{jeton.limiteur.tentatives}) dans {attente:.0f} secondes...")
+    
+    @staticmethod
+    def _infos_depot(depot) -> Dict:
+        """
+        Extraire les informations d'un dépôt
+        
+        Args:
+            depot: Dépôt GitHub (objet PyGithub)
+            
+        Returns:
+            Dictionnaire des informations du dépôt
+        """
+        return {
+            'nom': depot.name,
+            'nom_complet': depot.full_name,
+            'url': depot.html_url,
+            'url_clone': depot.clone_url,
+            'description': depot.description,
+            'maj_le': depot.updated_at,
+            'pousse_le': depot.pushed_at,
+            'branche': depot.default_branch,
+        }
     
     def obtenir_depots_utilisateur(self, nom_utilisateur: str) -> List[Dict]:
         """
@@ -60,19 +243,12 @@ class ScannerGitHub:
             Liste d'informations sur les dépôts
         """
         try:
-            utilisateur = self.github.get_user(nom_utilisateur)
+            utilisateur, jeton = self._appeler_reserve('core', lambda github: github.get_user(nom_utilisateur))
             depots = []
             
-            for depot in utilisateur.get_repos():
+            for depot in self._parcourir_pages('core', lambda _: utilisateur.get_repos(), jeton):
                 if not depot.private:
-                    depots.append({
-                        'nom': depot.name,
-                        'nom_complet': depot.full_name,
-                        'url': depot.html_url,
-                        'url_clone': depot.clone_url,
-                        'description': depot.description,
-                        'maj_le': depot.updated_at,
-                    })
+                    depots.append(self._infos_depot(depot))
             
             return depots
         except GithubException as e:
@@ -90,19 +266,12 @@ class ScannerGitHub:
             Liste d'informations sur les dépôts
         """
         try:
-            organisation = self.github.get_organization(nom_organisation)
+            organisation, jeton = self._appeler_reserve('core', lambda github: github.get_organization(nom_organisation))
             depots = []
             
-            for depot in organisation.get_repos():
+            for depot in self._parcourir_pages('core', lambda _: organisation.get_repos(), jeton):
                 if not depot.private:
-                    depots.append({
-                        'nom': depot.name,
-                        'nom_complet': depot.full_name,
-                        'url': depot.html_url,
-                        'url_clone': depot.clone_url,
-                        'description': depot.description,
-                        'maj_le': depot.updated_at,
-                    })
+                    depots.append(self._infos_depot(depot))
             
             return depots
         except GithubException as e:
@@ -127,11 +296,13 @@ class ScannerGitHub:
         for mot_cle in MOTS_CLES_RECHERCHE_IA:
             try:
                 print(f"🔍 Recherche du mot-clé : {mot_cle}")
-                self.attendre_limite_taux()
                 
-                # Recherche de code
+                # Recherche de code, chaque page dans le budget propre à la recherche de code
+                # du token le moins sollicité
                 requete = f'{mot_cle} in:file language:python'
-                resultats = self.github.search_code(requete, order='desc')
+                resultats = self._parcourir_pages(
+                    'code_search', lambda github: github.search_code(requete, order='desc')
+                )
                 
                 # Extraire les dépôts à partir des résultats de recherche de code
                 for code in resultats:
@@ -154,22 +325,12 @@ class ScannerGitHub:
                         continue  # Ne pas compter, continuer avec le suivant
                     
                     # Ajouter à la liste des résultats
-                    tous_depots.append({
-                        'nom': depot.name,
-                        'nom_complet': depot.full_name,
-                        'url': depot.html_url,
-                        'url_clone': depot.clone_url,
-                        'description': depot.description,
-                        'maj_le': depot.updated_at,
-                    })
-                
-                # Délai pour éviter de déclencher la limite de taux
-                time.sleep(DELAI_RECHERCHE_SECONDES)
+                    tous_depots.append(self._infos_depot(depot))
                 
                 if len(tous_depots) >= depots_max:
                     print(f"✅ {len(tous_depots)} dépôts non analysés trouvés ({compte_ignores} déjà analysés ignorés)")
                     break
-                    
+            
             except GithubException as e:
                 print(f"⚠️  Erreur lors de la recherche '{mot_cle}' : {e}")
                 continue
@@ -179,42 +340,225 @@ class ScannerGitHub:
         
         return tous_depots
     
-    def obtenir_fichiers_depot(self, nom_complet_depot: str, chemin: str = "") -> List[Dict]:
+    def obtenir_commit_tete(self, nom_complet_depot: str, branche: Optional[str] = None) -> Optional[str]:
+        """
+        Obtenir le SHA du dernier commit de la branche par défaut
+        
+        Args:
+            nom_complet_depot: Nom complet du dépôt (proprietaire/depot)
+            branche: Branche par défaut si elle est déjà connue (None : commit HEAD du dépôt)
+            
+        Returns:
+            SHA du commit, None si indisponible (dépôt vide, accès refusé)
+        """
+        if branche is None:
+            # HEAD désigne la branche par défaut : un seul appel, dont la réponse est le SHA seul
+            try:
+                reponse = self._requete_api('core', f"{self.url_api}/repos/{nom_complet_depot}/commits/HEAD",
+                                            entetes={'Accept': 'application/vnd.github.sha'}, timeout=30)
+            except requests.RequestException:
+                return None
+            with reponse:
+                sha = reponse.text.strip() if reponse.status_code == 200 else ''
+            return sha or None
+        
+        try:
+            branche_depot, _ = self._appeler_reserve(
+                'core', lambda github: github.get_repo(nom_complet_depot, lazy=True).get_branch(branche)
+            )
+            return branche_depot.commit.sha
+        except GithubException:
+            return None
+    
+    def obtenir_blobs_arbre(self, nom_complet_depot: str, reference: str) -> Optional[Dict[str, str]]:
+        """
+        Obtenir le SHA de chaque fichier d'une révision (arbre récursif, un seul appel)
+        
+        L'arbre d'un commit ne change jamais : sa réponse est presque toujours revalidée
+        par le cache HTTP sans consommer de budget.
+        
+        Args:
+            nom_complet_depot: Nom complet du dépôt (proprietaire/depot)
+            reference: SHA du commit
+            
+        Returns:
+            Dictionnaire chemin -> SHA de blob, None si l'arbre est tronqué ou indisponible
+            (commit supprimé par un push forcé)
+        """
+        try:
+            arbre, _ = self._appeler_reserve(
+                'core',
+                lambda github: github.get_repo(nom_complet_depot, lazy=True).get_git_tree(reference, recursive=True)
+            )
+        except GithubException:
+            return None
+        if arbre.raw_data.get('truncated'):
+            return None
+        return {element.path: element.sha for element in arbre.tree if element.type == "blob"}
+    
+    def obtenir_fichiers_depot(self, nom_complet_depot: str, chemin: str = "",
+                               filtre_dossier: Optional[Callable[[str], bool]] = None,
+                               filtre_fichier: Optional[Callable[[str], bool]] = None,
+                               reference: Optional[str] = None) -> List[Dict]:
         """
         Obtenir la liste des fichiers dans un dépôt
         
+        L'arborescence complète de la branche par défaut est obtenue en un seul appel
+        (API Git Trees). Si GitHub la tronque (dépôt très volumineux), les répertoires sont
+        parcourus un par un : chaque répertoire coûte alors un appel, et ceux refusés par
+        filtre_dossier (node_modules, vendor, etc.) sont écartés avant d'être listés.
+        
         Args:
             nom_complet_depot: Nom complet du dépôt (proprietaire/depot)
             chemin: Chemin du fichier
+            filtre_dossier: Fonction acceptant le chemin d'un répertoire, False pour ne pas le parcourir
+            filtre_fichier: Fonction acceptant le chemin d'un fichier, False pour l'ignorer
+            reference: Révision listée (SHA du commit), par défaut la branche par défaut
             
         Returns:
             Liste d'informations sur les fichiers
         """
         try:
-            depot = self.github.get_repo(nom_complet_depot)
-            contenus = depot.get_contents(chemin)
-            
-            fichiers = []
-            for contenu in contenus:
-                if contenu.type == "dir":
-                    # Récupération récursive des fichiers des sous-répertoires
-                    fichiers.extend(self.obtenir_fichiers_depot(nom_complet_depot, contenu.path))
-                else:
-                    fichiers.append({
-                        'chemin': contenu.path,
-                        'nom': contenu.name,
-                        'url_telechargement': contenu.download_url,
-                        'sha': contenu.sha,
-                    })
-            
-            return fichiers
+            depot, jeton = self._appeler_reserve('core', lambda github: github.get_repo(nom_complet_depot))
+        except GithubException as e:
+            self._signaler_echec_liste(e)
+            return []
+        
+        if not chemin:
+            fichiers = self._lister_arbre(depot, jeton, filtre_dossier, filtre_fichier, reference)
+            if fichiers is not None:
+                return fichiers
+        
+        return self._lister_fichiers(depot, jeton, chemin, filtre_dossier, filtre_fichier, reference)
+    
+    def _lister_arbre(self, depot, jeton: JetonGitHub, filtre_dossier: Optional[Callable[[str], bool]],
+                      filtre_fichier: Optional[Callable[[str], bool]],
+                      reference: Optional[str] = None) -> Optional[List[Dict]]:
+        """
+        Lister tous les fichiers d'une révision en un seul appel (arbre récursif)
+        
+        Args:
+            depot: Dépôt GitHub (objet PyGithub)
+            jeton: Token avec lequel le dépôt a été obtenu
+            filtre_dossier: Fonction acceptant le chemin d'un répertoire, False pour l'écarter
+            filtre_fichier: Fonction acceptant le chemin d'un fichier, False pour l'ignorer
+            reference: Révision listée, par défaut la branche par défaut
+            
+        Returns:
+            Liste d'informations sur les fichiers, None si l'arbre est tronqué ou indisponible
+            (le parcours répertoire par répertoire prend alors le relais)
+        """
+        reference = reference or depot.default_branch
+        try:
+            arbre = self._appeler(jeton, 'core', depot.get_git_tree, reference, recursive=True)
         except GithubException as e:
-            # Erreur 403 ignorée directement, sans attente
+            # Erreur 403 : le parcours répertoire par répertoire échouera de la même façon
             if e.status == 403:
-                print(f"  ⏭️  Ignorer : accès non autorisé (403 Forbidden)")
+                self._signaler_echec_liste(e)
+                return []
+            return None
+        
+        if arbre.raw_data.get('truncated'):
+            print(f"  ℹ️  Arborescence tronquée par GitHub, parcours répertoire par répertoire")
+            return None
+        
+        # Résultat du filtre de chaque répertoire, un répertoire écarté écarte tout son sous-arbre
+        dossiers_acceptes = {'': True}
+        
+        def dossier_accepte(chemin_dossier: str) -> bool:
+            accepte = dossiers_acceptes.get(chemin_dossier)
+            if accepte is None:
+                accepte = (dossier_accepte(posixpath.dirname(chemin_dossier))
+                           and (not filtre_dossier or filtre_dossier(chemin_dossier)))
+                dossiers_acceptes[chemin_dossier] = accepte
+            return accepte
+        
+        fichiers = []
+        for element in arbre.tree:
+            # Ignorer les répertoires et les sous-modules (type "commit")
+            if element.type != "blob":
+                continue
+            if not dossier_accepte(posixpath.dirname(element.path)):
+                continue
+            if filtre_fichier and not filtre_fichier(element.path):
+                continue
+            fichiers.append({
+                'chemin': element.path,
+                'nom': posixpath.basename(element.path),
+                'url_telechargement': URL_CONTENU_BRUT.format(
+                    depot=depot.full_name, reference=quote(reference), chemin=quote(element.path)
+                ),
+                'sha': element.sha,
+                'taille': element.size,
+            })
+        
+        return fichiers
+    
+    def _lister_fichiers(self, depot, jeton: JetonGitHub, chemin: str, filtre_dossier: Optional[Callable[[str], bool]],
+                         filtre_fichier: Optional[Callable[[str], bool]],
+                         reference: Optional[str] = None) -> List[Dict]:
+        """
+        Lister récursivement les fichiers d'un répertoire, en élaguant les répertoires exclus
+        
+        Args:
+            depot: Dépôt GitHub (objet PyGithub, obtenu une seule fois pour tout le parcours)
+            jeton: Token avec lequel le dépôt a été obtenu
+            chemin: Chemin du répertoire
+            filtre_dossier: Fonction acceptant le chemin d'un répertoire, False pour ne pas le parcourir
+            filtre_fichier: Fonction acceptant le chemin d'un fichier, False pour l'ignorer
+            reference: Révision parcourue, par défaut la branche par défaut
+            
+        Returns:
+            Liste d'informations sur les fichiers
+        """
+        try:
+            if reference:
+                contenus = self._appeler(jeton, 'core', depot.get_contents, chemin, ref=reference)
             else:
-                print(f"⚠️  Échec de récupération de la liste des fichiers : {e}")
+                contenus = self._appeler(jeton, 'core', depot.get_contents, chemin)
+        except GithubException as e:
+            self._signaler_echec_liste(e)
             return []
+        
+        # Un chemin de fichier retourne un seul contenu
+        if not isinstance(contenus, list):
+            contenus = [contenus]
+        
+        fichiers = []
+        for contenu in contenus:
+            if contenu.type == "dir":
+                # Élaguer le sous-arbre avant de le lister
+                if filtre_dossier and not filtre_dossier(contenu.path):
+                    continue
+                # Récupération récursive des fichiers des sous-répertoires
+                fichiers.extend(self._lister_fichiers(depot, jeton, contenu.path, filtre_dossier, filtre_fichier,
+                                                      reference))
+            else:
+                if filtre_fichier and not filtre_fichier(contenu.path):
+                    continue
+                fichiers.append({
+                    'chemin': contenu.path,
+                    'nom': contenu.name,
+                    'url_telechargement': contenu.download_url,
+                    'sha': contenu.sha,
+                    'taille': contenu.size,
+                })
+        
+        return fichiers
+    
+    @staticmethod
+    def _signaler_echec_liste(e: GithubException):
+        """
+        Afficher l'échec de récupération d'une liste de fichiers
+        
+        Args:
+            e: Exception levée par l'API GitHub
+        """
+        # Erreur 403 ignorée directement, sans attente
+        if e.status == 403:
+            print(f"  ⏭️  Ignorer : accès non autorisé (403 Forbidden)")
+        else:
+            print(f"⚠️  Échec de récupération de la liste des fichiers : {e}")
     
     def obtenir_contenu_fichier(self, nom_complet_depot: str, chemin_fichier: str) -> Optional[str]:
         """
@@ -228,8 +572,8 @@ class ScannerGitHub:
             Contenu du fichier (texte)
         """
         try:
-            depot = self.github.get_repo(nom_complet_depot)
-            contenu = depot.get_contents(chemin_fichier)
+            depot, jeton = self._appeler_reserve('core', lambda github: github.get_repo(nom_complet_depot))
+            contenu = self._appeler(jeton, 'core', depot.get_contents, chemin_fichier)
             
             # Décoder le contenu
             try:
@@ -242,3 +586,282 @@ class ScannerGitHub:
             if e.status == 403:
                 pass  # Ignorer silencieusement
             return None
+    
+    def obtenir_contenu_fichier_octets(self, nom_complet_depot: str, chemin_fichier: str) -> Optional[bytes]:
+        """
+        Obtenir le contenu brut d'un fichier, sans décodage
+        
+        Le détecteur analyse directement les octets et ne décode que les lignes trouvées,
+        ce qui évite une copie décodée par fichier et n'écarte plus les fichiers non UTF-8.
+        
+        Args:
+            nom_complet_depot: Nom complet du dépôt (proprietaire/depot)
+            chemin_fichier: Chemin du fichier
+            
+        Returns:
+            Contenu du fichier (octets), None pour un fichier binaire ou inaccessible
+        """
+        try:
+            depot, jeton = self._appeler_reserve('core', lambda github: github.get_repo(nom_complet_depot))
+            contenu = self._appeler(jeton, 'core', depot.get_contents, chemin_fichier)
+            octets = contenu.decoded_content
+            
+            if self.est_binaire(octets):
+                return None
+            return octets
+        except GithubException as e:
+            # Erreur 403 ignorée directement, sans affichage d'erreur
+            if e.status == 403:
+                pass  # Ignorer silencieusement
+            return None
+    
+    def ouvrir_flux_fichier(self, url_telechargement: str) -> Optional[requests.Response]:
+        """
+        Ouvrir le contenu brut d'un fichier en flux, sans le charger en mémoire
+        
+        Args:
+            url_telechargement: URL de téléchargement du fichier
+            
+        Returns:
+            Réponse HTTP en flux (à fermer par l'appelant), None en cas d'échec
+        """
+        try:
+            reponse = requests.get(
+                url_telechargement,
+                headers={'Authorization': f'token {self.token}'},
+                stream=True,
+                timeout=30
+            )
+            if reponse.status_code != 200:
+                reponse.close()
+                return None
+            # Décompresser le flux si le serveur l'a compressé
+            reponse.raw.decode_content = True
+            return reponse
+        except requests.RequestException:
+            return None
+    
+    def ouvrir_archive_depot(self, nom_complet_depot: str,
+                             reference: Optional[str] = None) -> Optional[requests.Response]:
+        """
+        Ouvrir en flux l'archive tar (gzip) d'une révision d'un dépôt
+        
+        Args:
+            nom_complet_depot: Nom complet du dépôt (proprietaire/depot)
+            reference: Révision téléchargée (SHA du commit), par défaut la branche par défaut
+            
+        Returns:
+            Réponse HTTP en flux (à fermer par l'appelant), None en cas d'échec
+        """
+        url = f"{self.url_api}/repos/{nom_complet_depot}/tarball"
+        if reference:
+            url += f"/{quote(reference)}"
+        try:
+            reponse = self._requete_api(
+                'core',
+                url,
+                stream=True,
+                timeout=30
+            )
+            if reponse.status_code != 200:
+                if reponse.status_code == 403:
+                    print(f"  ⏭️  Ignorer : accès non autorisé (403 Forbidden)")
+                else:
+                    print(f"⚠️  Échec du téléchargement de l'archive : HTTP {reponse.status_code}")
+                reponse.close()
+                return None
+            # Décompresser le flux si le serveur l'a compressé (l'archive elle-même reste en gzip)
+            reponse.raw.decode_content = True
+            return reponse
+        except requests.RequestException as e:
+            print(f"⚠️  Échec du téléchargement de l'archive : {e}")
+            return None
+    
+    @staticmethod
+    def parcourir_archive(flux: BinaryIO, filtre_dossier: Optional[Callable[[str], bool]] = None,
+                          filtre_fichier: Optional[Callable[[str], bool]] = None
+                          ) -> Iterator[Tuple[Dict, BinaryIO]]:
+        """
+        Parcourir les fichiers d'une archive tar en flux, sans rien extraire sur disque
+        
+        L'archive est lue séquentiellement : le contenu de chaque fichier doit être lu
+        avant de passer au suivant.
+        
+        Args:
+            flux: Flux binaire de l'archive (tar, éventuellement compressée en gzip)
+            filtre_dossier: Fonction acceptant le chemin d'un répertoire, False pour l'écarter
+            filtre_fichier: Fonction acceptant le chemin d'un fichier, False pour l'ignorer
+            
+        Yields:
+            (informations du fichier, contenu en flux)
+        """
+        with tarfile.open(fileobj=flux, mode='r|*') as archive:
+            for membre in archive:
+                if not membre.isfile():
+                    continue
+                
+                # Retirer le répertoire racine ajouté par GitHub (proprietaire-depot-sha/)
+                parties = membre.name.split('/', 1)
+                if len(parties) < 2 or not parties[1]:
+                    continue
+                chemin = parties[1]
+                
+                dossier = posixpath.dirname(chemin)
+                if dossier and filtre_dossier and not filtre_dossier(dossier):
+                    continue
+                if filtre_fichier and not filtre_fichier(chemin):
+                    continue
+                
+                contenu = archive.extractfile(membre)
+                if contenu is None:
+                    continue
+                yield {
+                    'chemin': chemin,
+                    'nom': posixpath.basename(chemin),
+                    'taille': membre.size,
+                }, contenu
+    
+    def cloner_depot(self, url_clone: str, dossiers_exclus: Iterable[str] = (),
+                     delai: int = DELAI_CLONE_SECONDES) -> Optional[str]:
+        """
+        Cloner superficiellement un dépôt dans un répertoire temporaire
+        
+        Le clone ne contient que le dernier commit (profondeur 1), sans les blobs tant qu'ils ne
+        sont pas nécessaires (si le serveur le permet), et les répertoires exclus ne sont pas
+        extraits (sparse checkout). Le trafic du clone ne compte pas dans la limite de taux de l'API.
+        
+        Args:
+            url_clone: URL du dépôt (https://, file://, ...)
+            dossiers_exclus: Noms des répertoires à ne pas extraire
+            delai: Délai maximal de chaque commande git (secondes)
+            
+        Returns:
+            Chemin du répertoire du clone (à supprimer par l'appelant avec supprimer_clone),
+            None en cas d'échec
+        """
+        dossier = tempfile.mkdtemp(prefix='scan_depot_')
+        # Ne jamais demander d'identifiants de manière interactive
+        environnement = dict(os.environ, GIT_TERMINAL_PROMPT='0')
+        commandes = [
+            ['git', 'clone', '--depth', '1', '--single-branch', '--filter=blob:none',
+             '--no-checkout', '--quiet', url_clone, dossier],
+            ['git', '-C', dossier, 'sparse-checkout', 'set', '--no-cone', '/*',
+             *(f'!{nom_dossier}/' for nom_dossier in dossiers_exclus)],
+            ['git', '-C', dossier, 'checkout', '--quiet'],
+        ]
+        
+        for commande in commandes:
+            try:
+                resultat = subprocess.run(commande, env=environnement, capture_output=True,
+                                          text=True, timeout=delai)
+            except (OSError, subprocess.TimeoutExpired) as e:
+                print(f"⚠️  Échec du clone de {url_clone} : {e}")
+                self.supprimer_clone(dossier)
+                return None
+            
+            if resultat.returncode != 0:
+                # Sans sparse checkout (git trop ancien), tout le dépôt est extrait
+                if commande[3] == 'sparse-checkout':
+                    continue
+                print(f"⚠️  Échec du clone de {url_clone} : {resultat.stderr.strip()}")
+                self.supprimer_clone(dossier)
+                return None
+        
+        return dossier
+    
+    @staticmethod
+    def lister_blobs_clone(dossier: str) -> Dict[str, str]:
+        """
+        Lire le SHA de blob de chaque fichier dans l'index d'un clone
+        
+        Args:
+            dossier: Chemin du répertoire du clone
+            
+        Returns:
+            Dictionnaire chemin -> SHA de blob (vide en cas d'échec)
+        """
+        try:
+            resultat = subprocess.run(['git', '-C', dossier, 'ls-files', '--stage', '-z'],
+                                      capture_output=True, timeout=60)
+        except (OSError, subprocess.TimeoutExpired):
+            return {}
+        if resultat.returncode != 0:
+            return {}
+        
+        shas = {}
+        # Format : "<mode> <sha> <étape>\t<chemin>\0"
+        for entree in resultat.stdout.split(b'\x00'):
+            if not entree:
+                continue
+            informations, _, chemin = entree.partition(b'\t')
+            mode, sha, _ = informations.split(b' ', 2)
+            if mode.startswith(b'100'):
+                shas[chemin.decode('utf-8', errors='surrogateescape')] = sha.decode('ascii')
+        return shas
+    
+    @staticmethod
+    def supprimer_clone(dossier: str):
+        """
+        Supprimer le répertoire d'un clone
+        
+        Args:
+            dossier: Chemin du répertoire du clone
+        """
+        def rendre_modifiable(fonction, chemin, _):
+            # Les objets git sont en lecture seule (Windows refuse de les supprimer)
+            os.chmod(chemin, 0o700)
+            fonction(chemin)
+        
+        shutil.rmtree(dossier, onerror=rendre_modifiable)
+    
+    @staticmethod
+    def parcourir_dossier_local(racine: str, filtre_dossier: Optional[Callable[[str], bool]] = None,
+                                filtre_fichier: Optional[Callable[[str], bool]] = None
+                                ) -> Iterator[Tuple[Dict, str]]:
+        """
+        Parcourir les fichiers d'une copie de travail locale
+        
+        Args:
+            racine: Répertoire racine (clone du dépôt)
+            filtre_dossier: Fonction acceptant le chemin relatif d'un répertoire, False pour l'écarter
+            filtre_fichier: Fonction acceptant le chemin relatif d'un fichier, False pour l'ignorer
+            
+        Yields:
+            (informations du fichier, chemin absolu)
+        """
+        for dossier, sous_dossiers, noms_fichiers in os.walk(racine):
+            relatif = os.path.relpath(dossier, racine).replace(os.sep, '/')
+            relatif = '' if relatif == '.' else relatif + '/'
+            
+            # Élaguer les sous-répertoires exclus et le répertoire .git du clone
+            sous_dossiers[:] = sorted(
+                nom for nom in sous_dossiers
+                if not (not relatif and nom == '.git')
+                and (not filtre_dossier or filtre_dossier(relatif + nom))
+            )
+            
+            for nom in sorted(noms_fichiers):
+                chemin_absolu = os.path.join(dossier, nom)
+                chemin = relatif + nom
+                if os.path.islink(chemin_absolu):
+                    continue
+                if filtre_fichier and not filtre_fichier(chemin):
+                    continue
+                yield {
+                    'chemin': chemin,
+                    'nom': nom,
+                    'taille': os.path.getsize(chemin_absolu),
+                }, chemin_absolu
+    
+    @staticmethod
+    def est_binaire(octets: bytes) -> bool:
+        """
+        Reconnaître un fichier binaire : un octet nul au début du fichier
+        
+        Args:
+            octets: Contenu (ou début du contenu) du fichier
+            
+        Returns:
+            Si le fichier est binaire
+        """
+        return octets.find(b'\x00', 0, TAILLE_TEST_BINAIRE) != -1
@@ -0,0 +1,245 @@
+"""
+Module de récupération GraphQL - Contenu de nombreux fichiers par requête, via des champs object() avec alias
+"""
+import json
+from typing import List, Dict, Optional, Iterable, Iterator, Tuple
+import requests
+from token_pool import ReserveJetons
+from config import (
+    GITHUB_TOKEN, URL_API_GITHUB, TAILLE_MAX_FICHIER, FICHIERS_MAX_REQUETE_GRAPHQL, OCTETS_MAX_REQUETE_GRAPHQL
+)
+
+# Types d'erreur GraphQL qui signalent une requête trop lourde (à découper)
+ERREURS_LIMITE_GRAPHQL = frozenset({'MAX_NODE_LIMIT_EXCEEDED', 'RESOURCE_LIMITS_EXCEEDED', 'EXCESSIVE_PAGINATION'})
+
+# Codes HTTP d'une requête trop lourde ou trop lente côté serveur
+STATUTS_LIMITE_GRAPHQL = frozenset({413, 502, 503, 504})
+
+# Fragment des informations d'un blob, sans son contenu
+CHAMPS_METADONNEES = "... on Blob { byteSize isBinary }"
+
+# Fragment du contenu texte d'un blob
+CHAMPS_TEXTE = "... on Blob { text isTruncated }"
+
+
+class RequeteTropLourde(Exception):
+    """Requête refusée par le serveur GraphQL à cause de sa taille ou de sa complexité"""
+
+
+class RecuperateurGraphQL:
+    """Récupération du contenu des fichiers par lots, une requête GraphQL pour de nombreux fichiers"""
+    
+    def __init__(self, token: str = GITHUB_TOKEN, url_graphql: Optional[str] = None,
+                 fichiers_max: int = FICHIERS_MAX_REQUETE_GRAPHQL, octets_max: int = OCTETS_MAX_REQUETE_GRAPHQL,
+                 taille_max: int = TAILLE_MAX_FICHIER, timeout: int = 60,
+                 reserve: Optional[ReserveJetons] = None):
+        """
+        Initialisation du récupérateur
+        
+        Args:
+            token: GitHub Personal Access Token
+            url_graphql: URL du point d'accès GraphQL, par défaut URL_API_GITHUB/graphql
+            fichiers_max: Nombre maximal de fichiers (champs avec alias) par requête
+            octets_max: Volume de texte visé par requête de contenu (octets)
+            taille_max: Taille au-delà de laquelle un blob est ignoré sans être téléchargé
+            timeout: Délai d'expiration d'une requête (secondes)
+            reserve: Réserve de tokens partagée avec les autres appels à l'API (token seul si absente)
+        """
+        self.url_graphql = url_graphql or f"{URL_API_GITHUB.rstrip('/')}/graphql"
+        self.fichiers_max = max(1, fichiers_max)
+        self.octets_max = max(1, octets_max)
+        self.taille_max = taille_max
+        self.timeout = timeout
+        self.reserve = reserve or ReserveJetons([token])
+        # Taille des lots réduite à chaque refus du serveur, conservée d'un dépôt à l'autre
+        self.taille_lot = self.fichiers_max
+        
+        # Le token est choisi à chaque requête dans la réserve
+        self.session = requests.Session()
+    
+    def recuperer(self, nom_complet_depot: str, fichiers: Iterable[Dict],
+                  reference: str = "HEAD") -> Iterator[Tuple[Dict, Optional[bytes]]]:
+        """
+        Récupérer le contenu des fichiers d'un dépôt, par lots
+        
+        Une première série de requêtes ne demande que la taille et la nature des blobs : les
+        blobs binaires ou trop volumineux sont écartés avant tout téléchargement de contenu.
+        Les autres sont ensuite regroupés en lots dont le volume de texte est borné.
+        
+        Args:
+            nom_complet_depot: Nom complet du dépôt (proprietaire/depot)
+            fichiers: Informations des fichiers (clé chemin)
+            reference: Révision lue (branche, étiquette ou SHA)
+            
+        Yields:
+            (informations du fichier, contenu ou None en cas d'échec), blobs binaires ou trop
+            volumineux exclus, dans l'ordre d'origine
+        """
+        proprietaire, nom = nom_complet_depot.split('/', 1)
+        fichiers = list(fichiers)
+        
+        metadonnees = self._interroger_par_lots(proprietaire, nom, reference,
+                                                [infos_fichier['chemin'] for infos_fichier in fichiers],
+                                                CHAMPS_METADONNEES)
+        
+        a_telecharger = []
+        for infos_fichier in fichiers:
+            blob = metadonnees.get(infos_fichier['chemin'])
+            if blob is None:
+                # Métadonnées indisponibles : le contenu sera tout de même demandé
+                a_telecharger.append((infos_fichier, infos_fichier.get('taille') or 0))
+                continue
+            if blob.get('isBinary') or (blob.get('byteSize') or 0) > self.taille_max:
+                continue
+            a_telecharger.append((infos_fichier, blob.get('byteSize') or 0))
+        
+        # Lots bornés en nombre de fichiers et en volume de texte
+        lot = []
+        volume = 0
+        for infos_fichier, taille in a_telecharger:
+            if lot and (len(lot) >= self.fichiers_max or volume + taille > self.octets_max):
+                yield from self._telecharger_lot(proprietaire, nom, reference, lot)
+                lot = []
+                volume = 0
+            lot.append(infos_fichier)
+            volume += taille
+        if lot:
+            yield from self._telecharger_lot(proprietaire, nom, reference, lot)
+    
+    def _telecharger_lot(self, proprietaire: str, nom: str, reference: str,
+                         lot: List[Dict]) -> Iterator[Tuple[Dict, Optional[bytes]]]:
+        """
+        Télécharger le contenu texte d'un lot de fichiers
+        
+        Args:
+            proprietaire: Propriétaire du dépôt
+            nom: Nom du dépôt
+            reference: Révision lue
+            lot: Informations des fichiers du lot
+            
+        Yields:
+            (informations du fichier, contenu encodé en UTF-8 ou None)
+        """
+        blobs = self._interroger_par_lots(proprietaire, nom, reference,
+                                          [infos_fichier['chemin'] for infos_fichier in lot], CHAMPS_TEXTE)
+        for infos_fichier in lot:
+            blob = blobs.get(infos_fichier['chemin'])
+            # Texte absent (blob binaire) ou tronqué par le serveur : rien d'exploitable
+            if blob is None or blob.get('text') is None or blob.get('isTruncated'):
+                yield infos_fichier, None
+            else:
+                yield infos_fichier, blob['text'].encode('utf-8')
+    
+    def _interroger_par_lots(self, proprietaire: str, nom: str, reference: str, chemins: List[str],
+                             champs: str) -> Dict[str, Dict]:
+        """
+        Interroger des blobs par lots de taille adaptative
+        
+        Un lot refusé car trop lourd est coupé en deux et réessayé, et les lots suivants sont
+        limités à cette nouvelle taille.
+        
+        Args:
+            proprietaire: Propriétaire du dépôt
+            nom: Nom du dépôt
+            reference: Révision lue
+            chemins: Chemins des fichiers
+            champs: Fragment GraphQL demandé pour chaque blob
+            
+        Returns:
+            Dictionnaire chemin -> champs du blob (chemins introuvables ou en échec absents)
+        """
+        resultats = {}
+        en_attente = list(reversed(chemins))
+        while en_attente:
+            lot = [en_attente.pop() for _ in range(min(self.taille_lot, len(en_attente)))]
+            try:
+                resultats.update(self._interroger(proprietaire, nom, reference, lot, champs))
+            except RequeteTropLourde:
+                if len(lot) == 1:
+                    print(f"  ⚠️  Fichier refusé par l'API GraphQL : {lot[0]}")
+                    continue
+                self.taille_lot = max(1, min(self.taille_lot, len(lot) // 2))
+                en_attente.extend(reversed(lot))
+                continue
+            except (requests.RequestException, ValueError) as e:
+                print(f"  ⚠️  Échec de la requête GraphQL ({len(lot)} fichiers) : {e}")
+                continue
+        return resultats
+    
+    def _interroger(self, proprietaire: str, nom: str, reference: str, chemins: List[str],
+                    champs: str) -> Dict[str, Dict]:
+        """
+        Interroger un lot de blobs en une seule requête, un champ object() avec alias par fichier
+        
+        Args:
+            proprietaire: Propriétaire du dépôt
+            nom: Nom du dépôt
+            reference: Révision lue
+            chemins: Chemins des fichiers
+            champs: Fragment GraphQL demandé pour chaque blob
+            
+        Returns:
+            Dictionnaire chemin -> champs du blob
+            
+        Raises:
+            RequeteTropLourde: Si le serveur refuse la requête à cause de sa taille
+        """
+        # Les chaînes JSON sont des chaînes GraphQL valides
+        objets = ' '.join(
+            f'f{numero}: object(expression: {json.dumps(f"{reference}:{chemin}")}) {{ {champs} }}'
+            for numero, chemin in enumerate(chemins)
+        )
+        requete = ('query($proprietaire: String!, $nom: String!) '
+                   f'{{ repository(owner: $proprietaire, name: $nom) {{ {objets} }} }}')
+        
+        tentative = 0
+        exclus = []
+        while True:
+            jeton = self.reserve.choisir('graphql', exclus)
+            self.reserve.acquerir(jeton, 'graphql')
+            reponse = self.session.post(
+                self.url_graphql,
+                json={'query': requete, 'variables': {'proprietaire': proprietaire, 'nom': nom}},
+                headers={'Authorization': f'bearer {jeton.token}'},
+                timeout=self.timeout
+            )
+            donnees = reponse.json() if reponse.status_code == 200 else {}
+            # La limite secondaire de GraphQL peut aussi être signalée dans une réponse 200
+            limite_signalee = any(erreur.get('type') == 'RATE_LIMITED' for erreur in donnees.get('errors') or [])
+            attente = jeton.limiteur.mettre_a_jour(reponse.headers, 'graphql', reponse.status_code, limite_signalee)
+            
+            # Token refusé : l'écarter et réessayer avec un autre
+            if reponse.status_code == 401 and self.reserve.choisir('graphql', exclus + [jeton]) is not None:
+                self.reserve.mettre_en_quarantaine(jeton, "401 (token invalide, expiré ou révoqué)")
+                exclus.append(jeton)
+                continue
+            if attente is None or tentative >= jeton.limiteur.tentatives:
+                break
+            tentative += 1
+            print(f"⚠️  Limite de taux de l'API (graphql) atteinte, nouvelle tentative "
+                  f"({tentative}/{jeton.limiteur.tentatives}) dans {attente:.0f} secondes...")
+        
+        if reponse.status_code in STATUTS_LIMITE_GRAPHQL:
+            raise RequeteTropLourde(f"HTTP {reponse.status_code}")
+        reponse.raise_for_status()
+        
+        erreurs = donnees.get('errors') or []
+        if any(erreur.get('type') in ERREURS_LIMITE_GRAPHQL for erreur in erreurs):
+            raise RequeteTropLourde(erreurs[0].get('message', ''))
+        
+        depot = (donnees.get('data') or {}).get('repository')
+        if depot is None:
+            if erreurs:
+                raise ValueError(erreurs[0].get('message', 'réponse GraphQL sans dépôt'))
+            return {}
+        
+        # Les erreurs restantes portent sur des fichiers isolés (chemin introuvable), dont l'objet est nul
+        return {
+            chemin: depot[f'f{numero}']
+            for numero, chemin in enumerate(chemins)
+            if depot.get(f'f{numero}')
+        }
+    
+    def fermer(self):
+        """Fermer les connexions persistantes"""
+        self.session.close()
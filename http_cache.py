@@ -0,0 +1,366 @@
+"""
+Module du cache HTTP - Réponses GET de l'API conservées entre les analyses et revalidées par requêtes conditionnelles
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from config import DOSSIER_CACHE, TAILLE_MAX_CACHE_HTTP, AGE_MAX_CACHE_HTTP_JOURS
+
+# Nom du fichier du cache dans DOSSIER_CACHE
+NOM_FICHIER_CACHE_HTTP = 'http.sqlite3'
+
+# Taille approximative d'une entrée hors corps et en-têtes (clé, validateurs, colonnes SQLite)
+TAILLE_FIXE_ENTREE = 128
+
+# Après une éviction, le cache est ramené à cette fraction de sa taille maximale
+FRACTION_APRES_EVICTION = 0.9
+
+# En-têtes propres à la transmission d'une réponse, jamais rejoués depuis le cache
+# (le corps est conservé décompressé)
+ENTETES_TRANSPORT = frozenset({'content-encoding', 'content-length', 'transfer-encoding', 'connection', 'keep-alive'})
+
+# Attente maximale d'un verrou tenu par une autre instance (secondes) : au-delà, une lecture
+# est un échec du cache et une écriture est abandonnée, sans interrompre l'analyse
+DELAI_ATTENTE_CACHE = 5
+
+# Nombre de nouvelles réponses écrites ensemble, dans une transaction courte
+TAILLE_LOT_ECRITURE = 50
+
+
+class CacheHttp:
+    """Cache persistant des réponses GET (corps, en-têtes, ETag et Last-Modified), avec éviction par taille et par âge"""
+    
+    def __init__(self, chemin: Optional[str] = None, taille_max: int = TAILLE_MAX_CACHE_HTTP,
+                 age_max_jours: float = AGE_MAX_CACHE_HTTP_JOURS):
+        """
+        Initialisation du cache
+        
+        Args:
+            chemin: Chemin du fichier SQLite, par défaut DOSSIER_CACHE/http.sqlite3
+            taille_max: Taille maximale des réponses enregistrées (octets, corps compressés)
+            age_max_jours: Âge au-delà duquel une réponse qui n'a pas été revalidée est supprimée
+                           (0 ou moins : aucune limite)
+        """
+        if chemin is None:
+            chemin = str(Path(DOSSIER_CACHE) / NOM_FICHIER_CACHE_HTTP)
+        Path(chemin).parent.mkdir(exist_ok=True, parents=True)
+        
+        self.taille_max = taille_max
+        self.age_max = age_max_jours * 86400
+        self._verrou = threading.Lock()
+        # Revalidations enregistrées en mémoire, écrites en une fois par valider()
+        self._acces = set()
+        # Nouvelles réponses pas encore écrites :
+        # clé -> (ETag, Last-Modified, en-têtes, corps compressé, taille, dernier accès)
+        self._nouvelles: Dict[str, Tuple[Optional[str], Optional[str], str, bytes, int, float]] = {}
+        self.revalidations = 0
+        self.echecs = 0
+        
+        # Connexion partagée par les clients de tous les tokens, protégée par un verrou.
+        # Journal WAL et transactions courtes : une autre instance de l'analyse qui partage le
+        # cache ne bloque ni les lectures ni, au-delà de DELAI_ATTENTE_CACHE, les écritures
+        self.connexion = sqlite3.connect(chemin, timeout=DELAI_ATTENTE_CACHE, check_same_thread=False)
+        try:
+            self.connexion.execute('PRAGMA journal_mode=WAL')
+            self.connexion.execute('PRAGMA synchronous=NORMAL')
+            with self.connexion:
+                self.connexion.execute(
+                    'CREATE TABLE IF NOT EXISTS reponses ('
+                    'cle TEXT PRIMARY KEY, etag TEXT, derniere_modification TEXT, entetes TEXT NOT NULL, '
+                    'corps BLOB NOT NULL, taille INTEGER NOT NULL, dernier_acces REAL NOT NULL)'
+                )
+                self.connexion.execute('CREATE INDEX IF NOT EXISTS reponses_acces ON reponses (dernier_acces)')
+        except sqlite3.OperationalError as e:
+            print(f"⚠️  Cache HTTP indisponible, requêtes sans cache : {e}")
+            self.connexion.close()
+            self.connexion = None
+    
+    @staticmethod
+    def calculer_cle(methode: str, url: str, accept: str) -> str:
+        """
+        Calculer la clé d'une requête
+        
+        Le token n'en fait pas partie : une réponse obtenue avec un token peut être revalidée avec
+        un autre, GitHub ne répondant 304 que si le contenu est identique pour ce token.
+        
+        Args:
+            methode: Méthode HTTP
+            url: URL complète (paramètres compris)
+            accept: En-tête Accept (format de la réponse)
+            
+        Returns:
+            Clé hexadécimale
+        """
+        return hashlib.sha256(f"{methode} {url}\n{accept}".encode('utf-8')).hexdigest()
+    
+    def validateurs(self, cle: str) -> Optional[Tuple[Optional[str], Optional[str]]]:
+        """
+        Obtenir les validateurs d'une réponse enregistrée
+        
+        Args:
+            cle: Clé de la requête
+            
+        Returns:
+            (ETag, Last-Modified), None si la réponse est inconnue ou la base occupée
+        """
+        with self._verrou:
+            if cle in self._nouvelles:
+                return self._nouvelles[cle][:2]
+            ligne = self._lire('SELECT etag, derniere_modification FROM reponses WHERE cle = ?', cle)
+            if ligne is None:
+                self.echecs += 1
+            return ligne
+    
+    def obtenir(self, cle: str) -> Optional[Tuple[Dict[str, str], bytes]]:
+        """
+        Obtenir une réponse enregistrée, confirmée par un 304 du serveur
+        
+        Args:
+            cle: Clé de la requête
+            
+        Returns:
+            (en-têtes, corps), None si la réponse a été évincée entre-temps ou la base occupée
+        """
+        with self._verrou:
+            if cle in self._nouvelles:
+                ligne = self._nouvelles[cle][2:4]
+            else:
+                ligne = self._lire('SELECT entetes, corps FROM reponses WHERE cle = ?', cle)
+                if ligne is None:
+                    return None
+                self._acces.add(cle)
+            self.revalidations += 1
+        return json.loads(ligne[0]), zlib.decompress(ligne[1])
+    
+    def _lire(self, requete: str, cle: str) -> Optional[Tuple]:
+        """
+        Lire une réponse enregistrée (appelé avec le verrou tenu)
+        
+        Args:
+            requete: Requête SELECT paramétrée par la clé
+            cle: Clé de la requête HTTP
+            
+        Returns:
+            Colonnes lues, None si la réponse est inconnue ou la base occupée
+        """
+        if self.connexion is None:
+            return None
+        try:
+            return self.connexion.execute(requete, (cle,)).fetchone()
+        except sqlite3.OperationalError:
+            return None
+    
+    def memoriser(self, cle: str, reponse: requests.Response):
+        """
+        Mémoriser une réponse 200 qui porte un validateur (ETag ou Last-Modified), écrite par lots
+        de TAILLE_LOT_ECRITURE
+        
+        Args:
+            cle: Clé de la requête
+            reponse: Réponse complète (corps déjà lisible)
+        """
+        etag = reponse.headers.get('ETag')
+        derniere_modification = reponse.headers.get('Last-Modified')
+        if not etag and not derniere_modification:
+            return
+        
+        entetes = json.dumps({
+            nom: valeur for nom, valeur in reponse.headers.items() if nom.lower() not in ENTETES_TRANSPORT
+        }, ensure_ascii=False, separators=(',', ':'))
+        corps = zlib.compress(reponse.content)
+        taille = TAILLE_FIXE_ENTREE + len(entetes) + len(corps)
+        if taille > self.taille_max:
+            return
+        
+        with self._verrou:
+            self._nouvelles[cle] = (etag, derniere_modification, entetes, corps, taille, time.time())
+            self._acces.discard(cle)
+            if len(self._nouvelles) >= TAILLE_LOT_ECRITURE:
+                self._ecrire_nouvelles()
+    
+    def _ecrire_nouvelles(self):
+        """Écrire les nouvelles réponses en une transaction courte (appelé avec le verrou tenu)"""
+        if not self._nouvelles:
+            return
+        lignes = [(cle, *valeurs) for cle, valeurs in self._nouvelles.items()]
+        self._nouvelles.clear()
+        if self.connexion is None:
+            return
+        try:
+            with self.connexion:
+                self.connexion.executemany(
+                    'INSERT OR REPLACE INTO reponses (cle, etag, derniere_modification, entetes, corps, taille, '
+                    'dernier_acces) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    lignes
+                )
+        except sqlite3.OperationalError as e:
+            # Base occupée par une autre instance : ces réponses seront simplement redemandées
+            print(f"⚠️  Cache HTTP occupé, {len(lignes)} réponse(s) non enregistrée(s) : {e}")
+    
+    def valider(self):
+        """Enregistrer les nouvelles réponses et les revalidations, puis évincer les plus anciennes"""
+        with self._verrou:
+            self._ecrire_nouvelles()
+            acces = self._acces
+            self._acces = set()
+            if self.connexion is None:
+                return
+            
+            try:
+                with self.connexion:
+                    maintenant = time.time()
+                    if acces:
+                        self.connexion.executemany(
+                            'UPDATE reponses SET dernier_acces = ? WHERE cle = ?',
+                            [(maintenant, cle) for cle in acces]
+                        )
+                    
+                    # Réponses qui n'ont plus été demandées depuis longtemps (dépôt supprimé...)
+                    if self.age_max > 0:
+                        self.connexion.execute('DELETE FROM reponses WHERE dernier_acces < ?',
+                                               (maintenant - self.age_max,))
+                    
+                    taille_totale = self.connexion.execute(
+                        'SELECT COALESCE(SUM(taille), 0) FROM reponses'
+                    ).fetchone()[0]
+                    if taille_totale > self.taille_max:
+                        a_liberer = taille_totale - int(self.taille_max * FRACTION_APRES_EVICTION)
+                        a_supprimer = []
+                        for cle, taille in self.connexion.execute(
+                            'SELECT cle, taille FROM reponses ORDER BY dernier_acces'
+                        ):
+                            if a_liberer <= 0:
+                                break
+                            a_supprimer.append((cle,))
+                            a_liberer -= taille
+                        self.connexion.executemany('DELETE FROM reponses WHERE cle = ?', a_supprimer)
+            except sqlite3.OperationalError as e:
+                # Revalidations perdues (elles ne servent qu'à l'éviction), éviction reprise plus tard
+                print(f"⚠️  Cache HTTP occupé, validation reportée : {e}")
+    
+    def fermer(self):
+        """Valider les dernières modifications et fermer le fichier du cache"""
+        self.valider()
+        if self.connexion is not None:
+            self.connexion.close()
+            self.connexion = None
+
+
+class AdaptateurCacheHttp(HTTPAdapter):
+    """Adaptateur requests qui rend les requêtes GET conditionnelles et sert les réponses 304 depuis le cache"""
+    
+    def __init__(self, cache: CacheHttp, **kwargs):
+        """
+        Initialisation de l'adaptateur
+        
+        Args:
+            cache: Cache partagé des réponses
+            **kwargs: Arguments transmis à HTTPAdapter (tentatives, taille du groupe de connexions)
+        """
+        super().__init__(**kwargs)
+        self.cache = cache
+    
+    def send(self, request: requests.PreparedRequest, stream: bool = False, **kwargs) -> requests.Response:
+        """
+        Envoyer une requête, avec If-None-Match / If-Modified-Since si sa réponse est en cache
+        
+        Les téléchargements en flux et les requêtes déjà conditionnelles ne passent pas par le cache.
+        
+        Args:
+            request: Requête préparée
+            stream: Lecture du corps en flux
+            **kwargs: Arguments transmis à HTTPAdapter.send
+            
+        Returns:
+            Réponse du serveur, ou réponse 200 reconstituée depuis le cache après un 304
+        """
+        if request.method != 'GET' or stream or 'If-None-Match' in request.headers \
+                or 'If-Modified-Since' in request.headers:
+            return super().send(request, stream=stream, **kwargs)
+        
+        cle = CacheHttp.calculer_cle(request.method, request.url, request.headers.get('Accept', ''))
+        validateurs = self.cache.validateurs(cle)
+        if validateurs is not None:
+            etag, derniere_modification = validateurs
+            if etag:
+                request.headers['If-None-Match'] = etag
+            elif derniere_modification:
+                request.headers['If-Modified-Since'] = derniere_modification
+        
+        reponse = super().send(request, stream=stream, **kwargs)
+        
+        if reponse.status_code == 304 and validateurs is not None:
+            enregistree = self.cache.obtenir(cle)
+            if enregistree is not None:
+                return self._reconstituer(reponse, *enregistree)
+            # Réponse évincée ou base occupée depuis la lecture des validateurs : redemander le corps
+            reponse.close()
+            request.headers.pop('If-None-Match', None)
+            request.headers.pop('If-Modified-Since', None)
+            reponse = super().send(request, stream=stream, **kwargs)
+        
+        if reponse.status_code == 200:
+            self.cache.memoriser(cle, reponse)
+        return reponse
+    
+    @staticmethod
+    def _reconstituer(reponse_304: requests.Response, entetes: Dict[str, str], corps: bytes) -> requests.Response:
+        """
+        Reconstituer la réponse complète à partir du cache
+        
+        Les en-têtes de la réponse 304 (X-RateLimit-*, date) remplacent ceux enregistrés.
+        
+        Args:
+            reponse_304: Réponse 304 du serveur
+            entetes: En-têtes enregistrés
+            corps: Corps enregistré
+            
+        Returns:
+            Réponse 200
+        """
+        reponse = requests.Response()
+        reponse.status_code = 200
+        reponse.reason = 'OK'
+        reponse.headers = CaseInsensitiveDict(entetes)
+        reponse.headers.update({
+            nom: valeur for nom, valeur in reponse_304.headers.items() if nom.lower() not in ENTETES_TRANSPORT
+        })
+        reponse._content = corps
+        reponse._content_consumed = True
+        reponse.encoding = requests.utils.get_encoding_from_headers(reponse.headers)
+        reponse.url = reponse_304.url
+        reponse.request = reponse_304.request
+        reponse.connection = reponse_304.connection
+        reponse.elapsed = reponse_304.elapsed
+        reponse_304.close()
+        return reponse
+
+
+def monter_cache_http(session: requests.Session, cache: CacheHttp):
+    """
+    Faire passer les requêtes d'une session par le cache HTTP
+    
+    Les réglages de l'adaptateur en place (tentatives, taille du groupe de connexions) sont conservés.
+    
+    Args:
+        session: Session requests
+        cache: Cache partagé des réponses
+    """
+    for prefixe in ('https://', 'http://'):
+        ancien = session.get_adapter(prefixe)
+        adaptateur = AdaptateurCacheHttp(
+            cache,
+            max_retries=ancien.max_retries,
+            pool_connections=getattr(ancien, '_pool_connections', requests.adapters.DEFAULT_POOLSIZE),
+            pool_maxsize=getattr(ancien, '_pool_maxsize', requests.adapters.DEFAULT_POOLSIZE),
+        )
+        session.mount(prefixe, adaptateur)
+        ancien.close()
@@ -0,0 +1,228 @@
+"""
+Module de limitation du débit - Budget de chaque ressource de l'API GitHub, suivi à partir des en-têtes des réponses
+"""
+import math
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Mapping, Tuple
+from config import REQUETES_MAX_PAR_HEURE, TAUX_LIMIT_RETRY
+
+# Requêtes laissées de côté dans chaque budget (autres outils utilisant le même token)
+MARGE_REQUETES = 2
+
+# Part du budget en dessous de laquelle les requêtes restantes sont réparties jusqu'à la réinitialisation
+FRACTION_RESERVE = 0.2
+
+# Délai ajouté après une réinitialisation annoncée (décalage d'horloge avec GitHub)
+DELAI_APRES_REINITIALISATION = 1.0
+
+# Attente par défaut après un refus pour limite secondaire sans en-tête Retry-After (secondes)
+ATTENTE_LIMITE_SECONDAIRE = 60.0
+
+
+class CompartimentTaux:
+    """Budget d'une ressource de l'API (core, search, code_search, graphql...)"""
+    
+    def __init__(self):
+        """Initialisation du compartiment, budget inconnu jusqu'à la première réponse"""
+        self.limite: Optional[int] = None
+        self.restant: Optional[int] = None
+        self.reinitialisation = 0.0  # Horodatage Unix de la réinitialisation
+        self.prochaine_requete = 0.0  # Horodatage Unix à partir duquel la requête suivante peut partir
+        self.requetes_recentes = deque()  # Horodatage des requêtes de la dernière heure (plafond local)
+    
+    def attente(self, maintenant: float, plafond_par_heure: int) -> float:
+        """
+        Calculer l'attente nécessaire avant la prochaine requête
+        
+        Args:
+            maintenant: Horodatage Unix actuel
+            plafond_par_heure: Plafond local de requêtes par heure (0 ou moins : aucun)
+            
+        Returns:
+            Attente en secondes (0 si la requête peut partir)
+        """
+        # Réinitialisation passée : budget complet jusqu'à la prochaine réponse
+        if self.restant is not None and 0 < self.reinitialisation <= maintenant:
+            self.restant = self.limite
+            self.prochaine_requete = 0.0
+        
+        attente = max(0.0, self.prochaine_requete - maintenant)
+        
+        # Budget épuisé : attendre la réinitialisation annoncée par GitHub
+        if self.restant is not None and self.restant <= MARGE_REQUETES and self.reinitialisation > maintenant:
+            attente = max(attente, self.reinitialisation - maintenant + DELAI_APRES_REINITIALISATION)
+        
+        if plafond_par_heure > 0:
+            while self.requetes_recentes and self.requetes_recentes[0] <= maintenant - 3600:
+                self.requetes_recentes.popleft()
+            if len(self.requetes_recentes) >= plafond_par_heure:
+                attente = max(attente, self.requetes_recentes[0] + 3600 - maintenant)
+        
+        return attente
+    
+    def reserver(self, maintenant: float):
+        """
+        Comptabiliser une requête sur le point de partir
+        
+        Args:
+            maintenant: Horodatage Unix actuel
+        """
+        self.requetes_recentes.append(maintenant)
+        if self.restant is None:
+            return
+        
+        # En dessous de la réserve, espacer les requêtes pour que le budget dure jusqu'à la réinitialisation
+        if self.limite and self.restant <= self.limite * FRACTION_RESERVE and self.reinitialisation > maintenant:
+            disponibles = max(1, self.restant - MARGE_REQUETES)
+            self.prochaine_requete = maintenant + (self.reinitialisation - maintenant) / disponibles
+        # Décompte local jusqu'à la réponse, qui donnera la valeur exacte
+        self.restant -= 1
+
+
+class LimiteurTaux:
+    """Limiteur local : un compartiment par ressource, mis à jour par les en-têtes X-RateLimit-* et Retry-After"""
+    
+    def __init__(self, plafond_par_heure: int = REQUETES_MAX_PAR_HEURE, tentatives: int = TAUX_LIMIT_RETRY):
+        """
+        Initialisation du limiteur
+        
+        Args:
+            plafond_par_heure: Plafond local de requêtes par heure et par ressource (0 ou moins : aucun)
+            tentatives: Nombre de nouvelles tentatives après une requête refusée pour limite de taux
+        """
+        self.plafond_par_heure = plafond_par_heure
+        self.tentatives = max(0, tentatives)
+        self.compartiments: Dict[str, CompartimentTaux] = {}
+        # Limite secondaire : GitHub suspend toutes les ressources à la fois
+        self.bloque_jusqu_a = 0.0
+        self._verrou = threading.Lock()
+    
+    def _compartiment(self, ressource: str) -> CompartimentTaux:
+        """Obtenir le compartiment d'une ressource, créé à la première utilisation"""
+        compartiment = self.compartiments.get(ressource)
+        if compartiment is None:
+            compartiment = self.compartiments[ressource] = CompartimentTaux()
+        return compartiment
+    
+    def acquerir(self, ressource: str = 'core', reserver: bool = True):
+        """
+        Attendre que la ressource dispose d'un budget suffisant
+        
+        Plusieurs threads peuvent attendre en même temps : chacun réserve sa requête avant de
+        libérer le verrou, et les requêtes sont espacées uniquement quand le budget s'épuise.
+        
+        Args:
+            ressource: Ressource de l'API sollicitée
+            reserver: Comptabiliser une requête (False : attendre seulement)
+        """
+        annonce = False
+        while True:
+            with self._verrou:
+                maintenant = time.time()
+                compartiment = self._compartiment(ressource)
+                attente = max(self.bloque_jusqu_a - maintenant,
+                              compartiment.attente(maintenant, self.plafond_par_heure))
+                if attente <= 0:
+                    if reserver:
+                        compartiment.reserver(maintenant)
+                    return
+            
+            # Annoncer seulement les attentes notables, une fois par requête
+            if attente >= 5 and not annonce:
+                print(f"⏳ Limite de taux de l'API ({ressource}) : attente de {attente:.0f} secondes...")
+                annonce = True
+            time.sleep(attente)
+    
+    def disponibilite(self, ressource: str = 'core') -> Tuple[float, float]:
+        """
+        Évaluer le budget d'une ressource sans réserver de requête
+        
+        Args:
+            ressource: Ressource de l'API
+            
+        Returns:
+            (attente avant la prochaine requête en secondes, requêtes restantes ou l'infini si inconnu)
+        """
+        with self._verrou:
+            maintenant = time.time()
+            compartiment = self._compartiment(ressource)
+            attente = max(0.0, self.bloque_jusqu_a - maintenant,
+                          compartiment.attente(maintenant, self.plafond_par_heure))
+            restant = compartiment.restant if compartiment.restant is not None else math.inf
+            return attente, restant
+    
+    def mettre_a_jour(self, entetes: Mapping[str, str], ressource: str = 'core',
+                      statut: Optional[int] = None, limite_signalee: bool = False) -> Optional[float]:
+        """
+        Mettre à jour le budget à partir des en-têtes d'une réponse
+        
+        Args:
+            entetes: En-têtes de la réponse
+            ressource: Ressource sollicitée (remplacée par X-RateLimit-Resource si présent)
+            statut: Code HTTP de la réponse
+            limite_signalee: Le corps de la réponse indique une limite de taux (message ou erreur GraphQL)
+            
+        Returns:
+            Attente avant une nouvelle tentative (secondes) si la requête a été refusée pour
+            limite de taux, None sinon
+        """
+        entetes = {cle.lower(): valeur for cle, valeur in (entetes or {}).items()}
+        ressource = entetes.get('x-ratelimit-resource') or ressource
+        
+        with self._verrou:
+            maintenant = time.time()
+            compartiment = self._compartiment(ressource)
+            try:
+                if 'x-ratelimit-limit' in entetes:
+                    compartiment.limite = int(float(entetes['x-ratelimit-limit']))
+                if 'x-ratelimit-remaining' in entetes:
+                    compartiment.restant = int(float(entetes['x-ratelimit-remaining']))
+                if 'x-ratelimit-reset' in entetes:
+                    compartiment.reinitialisation = float(entetes['x-ratelimit-reset'])
+            except ValueError:
+                pass
+            # Le budget exact est connu : l'espacement repart de cette valeur
+            if compartiment.restant is not None and compartiment.limite \
+                    and compartiment.restant > compartiment.limite * FRACTION_RESERVE:
+                compartiment.prochaine_requete = 0.0
+            
+            if statut not in (403, 429) and not limite_signalee:
+                return None
+            
+            # Limite secondaire (ou explicite) : délai imposé par GitHub pour toutes les ressources
+            if 'retry-after' in entetes:
+                try:
+                    delai = float(entetes['retry-after'])
+                except ValueError:
+                    delai = ATTENTE_LIMITE_SECONDAIRE
+                self.bloque_jusqu_a = max(self.bloque_jusqu_a, maintenant + delai)
+                return delai
+            
+            # Limite principale : budget épuisé jusqu'à la réinitialisation
+            if compartiment.restant == 0:
+                return max(0.0, compartiment.reinitialisation - maintenant) + DELAI_APRES_REINITIALISATION
+            
+            # Limite secondaire sans Retry-After : refus alors que le budget n'est pas épuisé
+            if statut == 429 or limite_signalee:
+                self.bloque_jusqu_a = max(self.bloque_jusqu_a, maintenant + ATTENTE_LIMITE_SECONDAIRE)
+                return ATTENTE_LIMITE_SECONDAIRE
+            return None
+    
+    def etat(self) -> Dict[str, Dict]:
+        """
+        Obtenir le budget connu de chaque ressource
+        
+        Returns:
+            Dictionnaire ressource -> {'restant', 'limite', 'reinitialisation'}
+        """
+        with self._verrou:
+            return {
+                ressource: {
+                    'restant': compartiment.restant,
+                    'limite': compartiment.limite,
+                    'reinitialisation': compartiment.reinitialisation,
+                }
+                for ressource, compartiment in self.compartiments.items()
+            }
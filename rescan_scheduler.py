@@ -0,0 +1,116 @@
+"""
+Module de planification des réanalyses - Dépôts de l'historique à réanalyser en priorité (ancienneté, risque, activité)
+"""
+import heapq
+import math
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Iterable
+from scan_history import HistoriqueAnalyse
+from config import MAX_HISTORIQUE_JOURS
+
+# Demi-vie de l'activité d'un dépôt : un dépôt poussé N jours avant son analyse compte moitié moins
+# qu'un dépôt poussé le jour même (jours)
+DEMI_VIE_ACTIVITE_JOURS = 30
+
+# Poids des dépôts dont la dernière analyse n'a pas pu lire le contenu (accès refusé, liste vide)
+POIDS_SANS_ACCES = 0.25
+
+# Suffixes du type d'analyse enregistré quand le contenu n'a pas pu être lu
+SUFFIXES_SANS_ACCES = (':interdit', ':pas-acces')
+
+
+class PlanificateurReanalyses:
+    """File de priorité des dépôts dont l'analyse est plus ancienne que MAX_HISTORIQUE_JOURS"""
+    
+    def __init__(self, historique: HistoriqueAnalyse, age_min_jours: float = MAX_HISTORIQUE_JOURS):
+        """
+        Initialisation du planificateur
+        
+        Args:
+            historique: Historique d'analyse
+            age_min_jours: Âge de la dernière analyse à partir duquel un dépôt peut être réanalysé
+        """
+        self.historique = historique
+        self.age_min_jours = max(1.0, age_min_jours)
+    
+    def priorite(self, infos_depot: Dict, maintenant: Optional[datetime] = None,
+                 decalage_utc: Optional[timedelta] = None) -> float:
+        """
+        Calculer la priorité de réanalyse d'un dépôt
+        
+        Produit de trois facteurs : l'ancienneté de l'analyse (en multiples de l'âge minimal),
+        le risque (problèmes trouvés lors de la dernière analyse, en échelle logarithmique) et
+        l'activité (proximité entre le dernier push connu et l'analyse, de 1 à 2).
+        
+        Args:
+            infos_depot: Informations d'analyse du dépôt (historique)
+            maintenant: Date de référence (heure locale), par défaut l'heure actuelle
+            decalage_utc: Décalage de l'heure locale sur UTC, par défaut celui de maintenant
+            
+        Returns:
+            Priorité, d'autant plus élevée que la réanalyse est urgente
+        """
+        maintenant = maintenant or datetime.now()
+        if decalage_utc is None:
+            decalage_utc = maintenant.astimezone().utcoffset()
+        derniere_analyse = datetime.fromisoformat(infos_depot['derniere_analyse'])
+        anciennete = max(0.0, (maintenant - derniere_analyse).total_seconds() / 86400) / self.age_min_jours
+        
+        risque = 1 + math.log1p(max(0, infos_depot.get('compte_problemes', 0)))
+        
+        activite = 1.0
+        if infos_depot.get('pousse_le'):
+            # Dates comparées en UTC sans fuseau (pousse_le est enregistré en UTC)
+            pousse_le = datetime.fromisoformat(infos_depot['pousse_le']).replace(tzinfo=None)
+            inactivite = max(0.0, (derniere_analyse - decalage_utc - pousse_le).total_seconds())
+            activite += 0.5 ** (inactivite / 86400 / DEMI_VIE_ACTIVITE_JOURS)
+        
+        priorite = anciennete * risque * activite
+        if infos_depot.get('type_analyse', '').endswith(SUFFIXES_SANS_ACCES):
+            priorite *= POIDS_SANS_ACCES
+        return priorite
+    
+    def selectionner(self, budget: int, exclus: Iterable[str] = ()) -> List[Dict]:
+        """
+        Choisir les dépôts à réanalyser lors de cette analyse
+        
+        Seuls les budget meilleurs candidats sont conservés pendant le parcours de l'historique
+        (tas de taille bornée). Les dépôts choisis sont réanalysés entièrement (reanalyse_forcee),
+        même sans nouveau commit : les règles ont pu changer depuis leur dernière analyse.
+        
+        Args:
+            budget: Nombre maximal de dépôts à réanalyser
+            exclus: Noms des dépôts déjà prévus par ailleurs
+            
+        Returns:
+            Informations des dépôts (format de ScannerGitHub, complété par le dernier commit
+            analysé), par priorité décroissante
+        """
+        if budget <= 0:
+            return []
+        
+        maintenant = datetime.now()
+        decalage_utc = maintenant.astimezone().utcoffset()
+        exclus = set(exclus)
+        # Informations conservées avec la priorité (le nom départage les priorités égales)
+        candidats = (
+            (self.priorite(infos_depot, maintenant, decalage_utc), nom,
+             infos_depot.get('pousse_le'), infos_depot.get('dernier_commit'))
+            for nom, infos_depot in self.historique.parcourir_depots_anterieurs(
+                maintenant - timedelta(days=self.age_min_jours)
+            )
+            if nom not in exclus
+        )
+        return [
+            {
+                'nom': nom.split('/', 1)[-1],
+                'nom_complet': nom,
+                'url': f"https://github.com/{nom}",
+                'url_clone': f"https://github.com/{nom}.git",
+                'pousse_le': datetime.fromisoformat(pousse_le) if pousse_le else None,
+                'dernier_commit': dernier_commit,
+                'priorite_reanalyse': priorite,
+                'reanalyse_forcee': True,
+            }
+            for priorite, nom, pousse_le, dernier_commit in heapq.nlargest(budget, candidats)
+        ]
@@ -0,0 +1,333 @@
+"""
+Module du paquet de règles - Analyse des motifs (ancres, identifiants, fournisseurs) mise en cache sur disque
+"""
+import ast
+import hashlib
+import marshal
+import mmap
+import os
+import re
+import sys
+from pathlib import Path
+from typing import List, Dict, Optional
+import config
+from config import MODELES_SENSIBLES, DOSSIER_CACHE
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+# Version du format du paquet : à incrémenter si l'analyse des règles change
+VERSION_PAQUET = 1
+
+# Longueur minimale d'une ancre littérale pour qu'elle soit sélective
+LONGUEUR_MIN_ANCRE = 3
+
+# En-têtes de section de config.py, par exemple "# ===== OPENAI & AZURE OPENAI ====="
+MODELE_EN_TETE_SECTION = re.compile(r'^\s*#\s*=+\s*(.+?)\s*=+\s*$')
+
+
+class PaquetRegles:
+    """Règles analysées : identifiants, fournisseurs, ancres littérales et largeurs"""
+    
+    def __init__(self, cle: str, sources: List[str], identifiants: List[str],
+                 fournisseurs: List[Optional[str]], ancres: List[Optional[str]],
+                 ancres_minimales: List[str], largeurs_max: List[int]):
+        """
+        Initialisation du paquet de règles
+        
+        Args:
+            cle: Empreinte des règles et de config.py
+            sources: Motifs source des règles
+            identifiants: Identifiant stable de chaque règle
+            fournisseurs: Fournisseur de chaque règle (section de config.py), None si inconnu
+            ancres: Ancre littérale obligatoire de chaque règle, None si aucune
+            ancres_minimales: Ancres suffisantes pour le préfiltre (vide si une règle n'a pas d'ancre)
+            largeurs_max: Longueur maximale d'une correspondance de chaque règle
+        """
+        self.cle = cle
+        self.sources = sources
+        self.identifiants = identifiants
+        self.fournisseurs = fournisseurs
+        self.ancres = ancres
+        self.ancres_minimales = ancres_minimales
+        self.largeurs_max = largeurs_max
+    
+    @classmethod
+    def charger(cls, modeles: List[str] = MODELES_SENSIBLES,
+                dossier_cache: str = DOSSIER_CACHE) -> 'PaquetRegles':
+        """
+        Charger le paquet depuis le cache, ou le construire s'il est absent ou périmé
+        
+        Args:
+            modeles: Liste de motifs d'expressions régulières
+            dossier_cache: Répertoire du cache (vide pour désactiver le cache)
+            
+        Returns:
+            Paquet de règles
+        """
+        contenu_config = cls._lire_config()
+        cle = cls.calculer_cle(modeles, contenu_config)
+        
+        if not dossier_cache:
+            return cls.construire(modeles, cle, contenu_config)
+        
+        chemin = Path(dossier_cache) / f"paquet_regles_{cle[:16]}.bin"
+        paquet = cls._lire(chemin, cle)
+        if paquet is None:
+            paquet = cls.construire(modeles, cle, contenu_config)
+            paquet.sauvegarder(chemin)
+        return paquet
+    
+    @classmethod
+    def construire(cls, modeles: List[str], cle: Optional[str] = None,
+                   contenu_config: Optional[str] = None) -> 'PaquetRegles':
+        """
+        Analyser les règles
+        
+        Args:
+            modeles: Liste de motifs d'expressions régulières
+            cle: Empreinte déjà calculée (calculée si absente)
+            contenu_config: Source de config.py (lue si absente)
+            
+        Returns:
+            Paquet de règles
+        """
+        if contenu_config is None:
+            contenu_config = cls._lire_config()
+        if cle is None:
+            cle = cls.calculer_cle(modeles, contenu_config)
+        
+        sources = list(modeles)
+        fournisseurs_config = cls.extraire_fournisseurs(contenu_config)
+        modeles_compiles = [re.compile(modele) for modele in sources]
+        ancres = [cls._extraire_ancre(modele) for modele in modeles_compiles]
+        
+        return cls(
+            cle=cle,
+            sources=sources,
+            identifiants=[hashlib.sha1(modele.encode('utf-8')).hexdigest()[:10] for modele in sources],
+            fournisseurs=[fournisseurs_config.get(modele) for modele in sources],
+            ancres=ancres,
+            ancres_minimales=cls._reduire_ancres(ancres),
+            largeurs_max=[
+                int(min(sre_parse.parse(modele.pattern, modele.flags).getwidth()[1], sre_constants.MAXREPEAT))
+                for modele in modeles_compiles
+            ]
+        )
+    
+    def sauvegarder(self, chemin: Path):
+        """
+        Enregistrer le paquet sur disque (écriture atomique)
+        
+        Args:
+            chemin: Chemin du fichier de cache
+        """
+        donnees = {
+            'version': VERSION_PAQUET,
+            'cle': self.cle,
+            'sources': self.sources,
+            'identifiants': self.identifiants,
+            'fournisseurs': self.fournisseurs,
+            'ancres': self.ancres,
+            'ancres_minimales': self.ancres_minimales,
+            'largeurs_max': self.largeurs_max,
+        }
+        try:
+            chemin.parent.mkdir(exist_ok=True, parents=True)
+            chemin_temporaire = chemin.with_suffix(f'.{os.getpid()}.tmp')
+            with open(chemin_temporaire, 'wb') as f:
+                marshal.dump(donnees, f)
+            os.replace(chemin_temporaire, chemin)
+            
+            # Supprimer les paquets périmés
+            for ancien in chemin.parent.glob('paquet_regles_*.bin'):
+                if ancien != chemin:
+                    ancien.unlink(missing_ok=True)
+        except OSError as e:
+            print(f"⚠️  Échec de l'enregistrement du paquet de règles : {e}")
+    
+    @classmethod
+    def _lire(cls, chemin: Path, cle: str) -> Optional['PaquetRegles']:
+        """
+        Lire un paquet depuis le cache, par projection en mémoire du fichier
+        
+        Args:
+            chemin: Chemin du fichier de cache
+            cle: Empreinte attendue
+            
+        Returns:
+            Paquet de règles, None si le cache est absent, illisible ou périmé
+        """
+        try:
+            with open(chemin, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as projection:
+                donnees = marshal.loads(projection)
+        except (OSError, ValueError, EOFError, TypeError):
+            return None
+        
+        if not isinstance(donnees, dict) or donnees.get('version') != VERSION_PAQUET or donnees.get('cle') != cle:
+            return None
+        
+        return cls(
+            cle=donnees['cle'],
+            sources=donnees['sources'],
+            identifiants=donnees['identifiants'],
+            fournisseurs=donnees['fournisseurs'],
+            ancres=donnees['ancres'],
+            ancres_minimales=donnees['ancres_minimales'],
+            largeurs_max=donnees['largeurs_max'],
+        )
+    
+    @staticmethod
+    def calculer_cle(modeles: List[str], contenu_config: str) -> str:
+        """
+        Calculer l'empreinte qui identifie un paquet
+        
+        Elle dépend des motifs, de config.py (les fournisseurs viennent de ses commentaires),
+        de la version du format et de la version de Python (format marshal, analyseur sre).
+        
+        Args:
+            modeles: Liste de motifs d'expressions régulières
+            contenu_config: Source de config.py
+            
+        Returns:
+            Empreinte hexadécimale
+        """
+        empreinte = hashlib.sha256()
+        empreinte.update(f"{VERSION_PAQUET}|{sys.version_info[:2]}|".encode('utf-8'))
+        empreinte.update(contenu_config.encode('utf-8'))
+        for modele in modeles:
+            empreinte.update(b'\x00' + modele.encode('utf-8'))
+        return empreinte.hexdigest()
+    
+    @staticmethod
+    def _lire_config() -> str:
+        """Lire la source de config.py (vide si indisponible)"""
+        try:
+            with open(config.__file__, 'r', encoding='utf-8') as f:
+                return f.read()
+        except (OSError, TypeError):
+            return ''
+    
+    @staticmethod
+    def extraire_fournisseurs(contenu_config: str) -> Dict[str, str]:
+        """
+        Associer chaque motif de MODELES_SENSIBLES à la section de config.py qui le contient
+        
+        Args:
+            contenu_config: Source de config.py
+            
+        Returns:
+            Dictionnaire motif -> fournisseur
+        """
+        try:
+            arbre = ast.parse(contenu_config)
+        except SyntaxError:
+            return {}
+        
+        lignes = contenu_config.split('\n')
+        fournisseurs = {}
+        for noeud in arbre.body:
+            if not (isinstance(noeud, ast.Assign) and isinstance(noeud.value, ast.List)
+                    and any(isinstance(cible, ast.Name) and cible.id == 'MODELES_SENSIBLES'
+                            for cible in noeud.targets)):
+                continue
+            
+            section = None
+            numero_ligne = noeud.lineno
+            for element in noeud.value.elts:
+                # Dernier en-tête de section rencontré avant l'élément
+                while numero_ligne < element.lineno:
+                    en_tete = MODELE_EN_TETE_SECTION.match(lignes[numero_ligne - 1])
+                    if en_tete:
+                        section = en_tete.group(1)
+                    numero_ligne += 1
+                if isinstance(element, ast.Constant) and isinstance(element.value, str):
+                    fournisseurs.setdefault(element.value, section)
+        
+        return fournisseurs
+    
+    @staticmethod
+    def _extraire_ancre(modele: re.Pattern) -> Optional[str]:
+        """
+        Extraire la plus longue sous-chaîne littérale présente dans toute correspondance
+        
+        Args:
+            modele: Expression régulière compilée
+            
+        Returns:
+            Ancre littérale, None si la règle n'en contient pas d'exploitable
+        """
+        if modele.flags & re.IGNORECASE:
+            return None
+        
+        try:
+            arbre = sre_parse.parse(modele.pattern, modele.flags)
+        except Exception:
+            return None
+        
+        def sequences_obligatoires(elements) -> List[str]:
+            # Suites de littéraux consécutifs qui apparaissent obligatoirement
+            sequences = []
+            courante = []
+            for operation, argument in elements:
+                if operation is sre_constants.LITERAL:
+                    courante.append(chr(argument))
+                    continue
+                
+                sequences.append(''.join(courante))
+                courante = []
+                if operation is sre_constants.SUBPATTERN:
+                    # (groupe, drapeaux ajoutés, drapeaux retirés, contenu)
+                    if not argument[1] & sre_constants.SRE_FLAG_IGNORECASE:
+                        sequences.extend(sequences_obligatoires(argument[3]))
+                elif operation in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT):
+                    # (minimum, maximum, contenu) : obligatoire seulement si minimum >= 1
+                    if argument[0] >= 1:
+                        sequences.extend(sequences_obligatoires(argument[2]))
+            sequences.append(''.join(courante))
+            return sequences
+        
+        candidats = [
+            sequence for sequence in sequences_obligatoires(arbre)
+            if len(sequence) >= LONGUEUR_MIN_ANCRE and '\n' not in sequence
+        ]
+        if not candidats:
+            return None
+        return max(candidats, key=len)
+    
+    @staticmethod
+    def _reduire_ancres(ancres: List[Optional[str]]) -> List[str]:
+        """
+        Réduire les ancres à l'ensemble minimal suffisant pour le préfiltre
+        
+        Une ancre qui en contient une autre est redondante : si elle apparaît, l'ancre
+        plus courte apparaît aussi (par exemple OPENAI_API_KEY et API_KEY).
+        
+        Args:
+            ancres: Ancre de chaque règle
+            
+        Returns:
+            Ancres minimales, liste vide si une règle n'a pas d'ancre
+        """
+        if not ancres or any(ancre is None for ancre in ancres):
+            return []
+        
+        uniques = set(ancres)
+        return sorted(
+            ancre for ancre in uniques
+            if not any(autre != ancre and autre in ancre for autre in uniques)
+        )
+
+
+if __name__ == "__main__":
+    # Étape de construction : reconstruire le paquet de règles et l'enregistrer dans le cache
+    paquet = PaquetRegles.construire(MODELES_SENSIBLES)
+    chemin_paquet = Path(DOSSIER_CACHE) / f"paquet_regles_{paquet.cle[:16]}.bin"
+    paquet.sauvegarder(chemin_paquet)
+    print(f"✅ Paquet de règles construit : {len(paquet.sources)} règles, "
+          f"{len(paquet.ancres_minimales)} ancres minimales, "
+          f"{len(set(f for f in paquet.fournisseurs if f))} fournisseurs")
+    print(f"📄 Enregistré à : {chemin_paquet}")
@@ -0,0 +1,229 @@
+"""
+Module de profilage des règles - Coût de chaque règle et budget de temps par fichier
+"""
+import json
+import threading
+from pathlib import Path
+from typing import List, Dict, Set
+from rule_pack import PaquetRegles
+
+# Clé du moteur combiné dans le budget de temps d'un fichier (les règles ont un rang >= 0)
+RANG_MOTEUR_COMBINE = -1
+
+
+class BudgetFichier:
+    """Temps consommé par chaque règle sur un fichier, borné par un budget"""
+    
+    def __init__(self, limite: float):
+        """
+        Initialisation du budget
+        
+        Args:
+            limite: Temps maximal (secondes) d'une règle sur le fichier, 0 ou moins pour désactiver
+        """
+        self.limite = limite
+        self.durees: Dict[int, float] = {}
+        self.abandonnees: Set[int] = set()
+    
+    def epuise(self, rang: int, duree_en_cours: float = 0.0) -> bool:
+        """
+        Vérifier si une règle a dépassé son budget
+        
+        Args:
+            rang: Rang de la règle
+            duree_en_cours: Temps de l'appel en cours, pas encore comptabilisé
+            
+        Returns:
+            Si le budget de la règle est dépassé (toujours vrai pour une règle abandonnée)
+        """
+        if rang in self.abandonnees:
+            return True
+        return self.limite > 0 and self.durees.get(rang, 0.0) + duree_en_cours > self.limite
+    
+    def consommer(self, rang: int, duree: float) -> bool:
+        """
+        Comptabiliser le temps d'un appel
+        
+        Args:
+            rang: Rang de la règle
+            duree: Temps de l'appel (secondes)
+            
+        Returns:
+            True si la règle vient de dépasser son budget et doit être abandonnée
+        """
+        self.durees[rang] = self.durees.get(rang, 0.0) + duree
+        if rang not in self.abandonnees and self.epuise(rang):
+            self.abandonnees.add(rang)
+            return True
+        return False
+
+
+class ProfileurRegles:
+    """Compteurs par règle : appels, correspondances, temps cumulé, pire longueur de ligne"""
+    
+    def __init__(self, paquet: PaquetRegles, actif: bool = False):
+        """
+        Initialisation du profileur
+        
+        Les règles abandonnées sont toujours enregistrées, les compteurs seulement si le
+        profilage est actif.
+        
+        Args:
+            paquet: Paquet de règles (identifiants et fournisseurs)
+            actif: Enregistrer les compteurs de chaque appel
+        """
+        self.paquet = paquet
+        self.actif = actif
+        self.statistiques: Dict[int, Dict] = {}
+        self.regles_abandonnees: List[Dict] = []
+        # Plusieurs dépôts peuvent être analysés simultanément
+        self._verrou = threading.Lock()
+    
+    def enregistrer(self, rang: int, duree: float, correspondances: int, longueur: int):
+        """
+        Enregistrer un appel d'une règle
+        
+        Args:
+            rang: Rang de la règle
+            duree: Temps de l'appel (secondes)
+            correspondances: Nombre de correspondances trouvées
+            longueur: Longueur du texte analysé (ligne ou tampon)
+        """
+        with self._verrou:
+            statistiques = self.statistiques.get(rang)
+            if statistiques is None:
+                statistiques = self.statistiques[rang] = {
+                    'appels': 0,
+                    'correspondances': 0,
+                    'duree': 0.0,
+                    'duree_max': 0.0,
+                    'longueur_pire_appel': 0,
+                    'longueur_max': 0,
+                }
+            
+            statistiques['appels'] += 1
+            statistiques['correspondances'] += correspondances
+            statistiques['duree'] += duree
+            if duree > statistiques['duree_max']:
+                statistiques['duree_max'] = duree
+                statistiques['longueur_pire_appel'] = longueur
+            if longueur > statistiques['longueur_max']:
+                statistiques['longueur_max'] = longueur
+    
+    def abandonner(self, rang: int, chemin_fichier: str, duree: float, limite: float):
+        """
+        Enregistrer l'abandon d'une règle sur un fichier
+        
+        Args:
+            rang: Rang de la règle (RANG_MOTEUR_COMBINE pour le moteur combiné)
+            chemin_fichier: Chemin du fichier
+            duree: Temps consommé par la règle sur le fichier (secondes)
+            limite: Budget dépassé (secondes)
+        """
+        combine = rang == RANG_MOTEUR_COMBINE
+        identifiant = 'combine' if combine else self.paquet.identifiants[rang]
+        with self._verrou:
+            self.regles_abandonnees.append({
+                'chemin_fichier': chemin_fichier,
+                'regle': identifiant,
+                'fournisseur': None if combine else self.paquet.fournisseurs[rang],
+                'modele': None if combine else self.paquet.sources[rang],
+                'duree': round(duree, 3),
+            })
+        print(f"  ⏱️  Règle {identifiant} abandonnée pour {chemin_fichier} : "
+              f"{duree:.2f}s > budget de {limite}s")
+    
+    def extraire(self) -> Dict:
+        """
+        Extraire les données enregistrées et remettre le profileur à zéro
+        (transmission des processus de travail vers le processus principal)
+        
+        Returns:
+            Dictionnaire des statistiques et des règles abandonnées
+        """
+        with self._verrou:
+            donnees = {'statistiques': self.statistiques, 'regles_abandonnees': self.regles_abandonnees}
+            self.statistiques = {}
+            self.regles_abandonnees = []
+            return donnees
+    
+    def fusionner(self, donnees: Dict):
+        """
+        Ajouter les données extraites d'un autre profileur
+        
+        Args:
+            donnees: Données retournées par extraire()
+        """
+        with self._verrou:
+            for rang, autres in donnees['statistiques'].items():
+                statistiques = self.statistiques.get(rang)
+                if statistiques is None:
+                    self.statistiques[rang] = dict(autres)
+                    continue
+                statistiques['appels'] += autres['appels']
+                statistiques['correspondances'] += autres['correspondances']
+                statistiques['duree'] += autres['duree']
+                if autres['duree_max'] > statistiques['duree_max']:
+                    statistiques['duree_max'] = autres['duree_max']
+                    statistiques['longueur_pire_appel'] = autres['longueur_pire_appel']
+                statistiques['longueur_max'] = max(statistiques['longueur_max'], autres['longueur_max'])
+            
+            self.regles_abandonnees.extend(donnees['regles_abandonnees'])
+    
+    def resultats(self) -> Dict:
+        """
+        Construire le rapport de profilage, règles les plus coûteuses d'abord
+        
+        Returns:
+            Dictionnaire des règles profilées et des règles abandonnées
+        """
+        regles = []
+        for rang, statistiques in self.statistiques.items():
+            regles.append({
+                'regle': self.paquet.identifiants[rang],
+                'fournisseur': self.paquet.fournisseurs[rang],
+                'modele': self.paquet.sources[rang],
+                'appels': statistiques['appels'],
+                'correspondances': statistiques['correspondances'],
+                'duree': round(statistiques['duree'], 6),
+                'duree_max': round(statistiques['duree_max'], 6),
+                'longueur_pire_appel': statistiques['longueur_pire_appel'],
+                'longueur_max': statistiques['longueur_max'],
+            })
+        regles.sort(key=lambda regle: regle['duree'], reverse=True)
+        
+        return {'regles': regles, 'regles_abandonnees': self.regles_abandonnees}
+    
+    def afficher(self, limite: int = 20):
+        """
+        Afficher le tableau des règles les plus coûteuses
+        
+        Args:
+            limite: Nombre maximal de règles affichées
+        """
+        resultats = self.resultats()
+        
+        print(f"\n📊 Profil des règles ({len(resultats['regles'])} règles appelées)")
+        print(f"{'Règle':<12}{'Fournisseur':<28}{'Appels':>10}{'Corresp.':>10}"
+              f"{'Temps (s)':>12}{'Pire (ms)':>12}{'Long. pire':>12}")
+        for regle in resultats['regles'][:limite]:
+            fournisseur = (regle['fournisseur'] or '-')[:26]
+            print(f"{regle['regle']:<12}{fournisseur:<28}{regle['appels']:>10}{regle['correspondances']:>10}"
+                  f"{regle['duree']:>12.3f}{regle['duree_max'] * 1000:>12.2f}{regle['longueur_pire_appel']:>12}")
+        
+        if resultats['regles_abandonnees']:
+            print(f"\n⏱️  {len(resultats['regles_abandonnees'])} règle(s) abandonnée(s) (budget dépassé) :")
+            for abandon in resultats['regles_abandonnees']:
+                print(f"  - {abandon['regle']} sur {abandon['chemin_fichier']} ({abandon['duree']}s)")
+    
+    def sauvegarder(self, chemin: str):
+        """
+        Enregistrer le rapport de profilage au format JSON
+        
+        Args:
+            chemin: Chemin du fichier JSON
+        """
+        chemin_fichier = Path(chemin)
+        chemin_fichier.parent.mkdir(exist_ok=True, parents=True)
+        with open(chemin_fichier, 'w', encoding='utf-8') as f:
+            json.dump(self.resultats(), f, ensure_ascii=False, indent=2)
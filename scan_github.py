@@ -8,7 +8,8 @@ import argparse
 import sys
 import os
 from datetime import datetime
-from config import GITHUB_TOKEN
+from config import GITHUB_TOKEN, REANALYSES_PAR_ANALYSE
+from token_pool import charger_tokens
 from scanner import CloudScanner
 
 
@@ -35,6 +36,7 @@ def valider_token_github() -> bool:
         print("1. Copier .env.example en .env")
         print("2. Créer un Personal Access Token sur https://github.com/settings/tokens")
         print("3. Ajouter le Token à la variable GITHUB_TOKEN dans le fichier .env")
+        print("   (plusieurs tokens : GITHUB_TOKENS séparés par des virgules, ou FICHIER_TOKENS_GITHUB)")
         return False
     return True
 
@@ -63,6 +65,12 @@ Exemples d'utilisation:
   
   # Recherche et analyse automatique d'un nombre spécifique de dépôts
   python scan_github.py --auto --depots-max 100
+  
+  # Reprendre une analyse interrompue (délai d'expiration, tâche arrêtée) là où elle s'est arrêtée
+  python scan_github.py --reprendre
+  
+  # Afficher le coût de chaque règle après l'analyse et l'enregistrer en JSON
+  python scan_github.py --depot proprietaire/nom_depot --profil-regles profil.json
         """
     )
     
@@ -91,6 +99,12 @@ Exemples d'utilisation:
         help='Recherche et analyse automatique de projets liés à l\'IA'
     )
     
+    parser.add_argument(
+        '--reprendre',
+        action='store_true',
+        help='Reprendre l\'analyse interrompue enregistrée dans le journal de reprise et générer son rapport complet'
+    )
+    
     parser.add_argument(
         '--depots-max',
         type=int,
@@ -98,6 +112,14 @@ Exemples d'utilisation:
         help='Nombre maximum de dépôts à scanner en mode automatique (par défaut: 200)'
     )
     
+    parser.add_argument(
+        '--reanalyses-max',
+        type=int,
+        default=REANALYSES_PAR_ANALYSE,
+        help='Nombre maximum de dépôts analysés il y a plus de MAX_HISTORIQUE_JOURS jours à réanalyser '
+             f'en mode automatique (par défaut: {REANALYSES_PAR_ANALYSE})'
+    )
+    
     parser.add_argument(
         '--token',
         type=str,
@@ -116,18 +138,27 @@ Exemples d'utilisation:
         help='Ne pas sauter les dépôts déjà analysés, forcer la réanalyse de tous les dépôts'
     )
     
+    parser.add_argument(
+        '--profil-regles',
+        type=str,
+        nargs='?',
+        const='',
+        help='Profiler les règles de détection et afficher leur coût après l\'analyse '
+             '(optionnel : fichier JSON où enregistrer le profil)'
+    )
+    
     # Analyser les arguments
     args = parser.parse_args()
     
     # Vérifier si au moins une option d'analyse est fournie
-    if not any([args.utilisateur, args.organisation, args.depot, args.auto]):
+    if not any([args.utilisateur, args.organisation, args.depot, args.auto, args.reprendre]):
         parser.print_help()
-        print("\n❌ Erreur : Veuillez spécifier au moins une option d'analyse (--utilisateur, --organisation, --depot, ou --auto)")
+        print("\n❌ Erreur : Veuillez spécifier au moins une option d'analyse (--utilisateur, --organisation, --depot, --auto ou --reprendre)")
         sys.exit(1)
     
     # Valider le token GitHub
     token = args.token or GITHUB_TOKEN
-    if not token:
+    if not charger_tokens(token):
         if not valider_token_github():
             sys.exit(1)
     
@@ -135,24 +166,51 @@ Exemples d'utilisation:
     if args.dossier_sortie:
         os.environ['DOSSIER_SORTIE'] = args.dossier_sortie
     
+    scanner = None
     try:
         # Créer une instance du scanner
         sauter_analyses = not args.ne_pas_sauter_analyses
-        scanner = CloudScanner(token, sauter_analyses=sauter_analyses)
+        profilage_regles = args.profil_regles is not None
+        scanner = CloudScanner(token, sauter_analyses=sauter_analyses, profilage_regles=profilage_regles)
+        
+        # Une nouvelle analyse remplace le journal d'une analyse interrompue
+        if not args.reprendre and not args.depot and scanner.journal.existe():
+            print("⚠️  Une analyse interrompue n'a pas été reprise (--reprendre) : son journal sera remplacé")
         
         # Exécuter différentes analyses selon les paramètres
-        if args.utilisateur:
+        if args.reprendre:
+            chemin_rapport = scanner.reprendre_analyse()
+            if chemin_rapport is None:
+                print(f"❌ Aucune analyse interrompue à reprendre ({scanner.journal.chemin})")
+                sys.exit(1)
+        elif args.utilisateur:
             chemin_rapport = scanner.analyser_utilisateur(args.utilisateur)
         elif args.organisation:
             chemin_rapport = scanner.analyser_organisation(args.organisation)
         elif args.depot:
             chemin_rapport = scanner.analyser_depot_unique(args.depot)
         elif args.auto:
-            chemin_rapport = scanner.analyser_projets_ia(depots_max=args.depots_max)
+            chemin_rapport = scanner.analyser_projets_ia(depots_max=args.depots_max,
+                                                         reanalyses_max=args.reanalyses_max)
         
         print(f"\n✅ Analyse terminée !")
         print(f"📄 Rapport enregistré à : {chemin_rapport}")
         
+        if profilage_regles:
+            profileur = scanner.detecteur_secret.profileur
+            profileur.afficher()
+            if args.profil_regles:
+                profileur.sauvegarder(args.profil_regles)
+                print(f"📄 Profil des règles enregistré à : {args.profil_regles}")
+        
+        if scanner.cache_http is not None and scanner.cache_http.revalidations:
+            print(f"💾 Cache HTTP : {scanner.cache_http.revalidations} réponse(s) inchangée(s) servie(s) "
+                  f"depuis le disque (304, sans consommer de budget)")
+        
+        # Utilisation de chaque token de la réserve
+        if len(scanner.scanner_github.reserve.jetons) > 1:
+            scanner.scanner_github.reserve.afficher_utilisation()
+    
     except KeyboardInterrupt:
         print("\n\n⚠️  Analyse interrompue par l'utilisateur")
         sys.exit(0)
@@ -161,6 +219,9 @@ Exemples d'utilisation:
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        if scanner is not None:
+            scanner.fermer()
 
 
 if __name__ == "__main__":
@@ -1,58 +1,462 @@
-
 """
 Module de gestion de l'historique d'analyse - Suivi des dépôts déjà analysés pour éviter les analyses répétées
 """
+import hashlib
 import json
 import os
-from datetime import datetime
-from typing import Dict, List, Set
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Iterable, Iterator, Tuple
 from pathlib import Path
+from bloom_filter import FiltreBloom
+from config import (
+    DB_TYPE, DB_NAME, DOSSIER_CACHE, FILTRE_HISTORIQUE, TAUX_FAUX_POSITIFS_FILTRE, DUREE_BAIL_MINUTES
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou entre processus sur le filtre et la migration
+    fcntl = None
+
+# Dossier de l'historique (base SQLite et ancien fichier JSON)
+DOSSIER_HISTORIQUE = "historique_analyse"
+
+# Ancien fichier JSON de l'historique, importé une seule fois dans la base
+NOM_FICHIER_JSON = "depots_analyses.json"
+
+# Attente maximale d'une écriture quand un autre processus écrit dans la base (secondes)
+DELAI_ATTENTE_BASE = 60
+
+# Capacité minimale du filtre de Bloom (agrandi, c'est-à-dire reconstruit, au-delà)
+CAPACITE_MIN_FILTRE = 1_000_000
+
+# Nombre de lignes lues à la fois lors d'un parcours de la base
+TAILLE_LOT_LECTURE = 1000
+
+# Colonnes de la table des dépôts, dans l'ordre des informations d'analyse
+COLONNES_DEPOT = ('premiere_analyse', 'derniere_analyse', 'compte_problemes', 'type_analyse',
+                  'compte_analyses', 'dernier_commit', 'pousse_le', 'problemes_par_chemin')
+
+
+def _en_utc(date: datetime) -> datetime:
+    """
+    Ramener une date en UTC (les dates sans fuseau de l'API GitHub sont en UTC)
+    
+    Args:
+        date: Date avec ou sans fuseau horaire
+        
+    Returns:
+        Date avec le fuseau UTC
+    """
+    if date.tzinfo is None:
+        return date.replace(tzinfo=timezone.utc)
+    return date.astimezone(timezone.utc)
+
+
+@contextmanager
+def _verrou_processus(chemin: Path):
+    """
+    Verrou exclusif entre processus, posé sur un fichier annexe (sans effet si fcntl est indisponible)
+    
+    Args:
+        chemin: Chemin du fichier de verrou
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(chemin, 'a') as fichier:
+        fcntl.flock(fichier, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fichier, fcntl.LOCK_UN)
 
 
 class HistoriqueAnalyse:
-    """Gestionnaire de l'historique d'analyse"""
+    """
+    Gestionnaire de l'historique d'analyse (base SQLite indexée par nom de dépôt)
+    
+    Plusieurs processus peuvent partager la même base : chaque écriture est une transaction
+    courte, et un dépôt n'est analysé que par le processus qui détient son bail (revendiquer()).
+    """
     
-    def __init__(self, fichier_historique: str = None):
+    def __init__(self, fichier_historique: str = None, fichier_json: str = None, fichier_filtre: str = None):
         """
         Initialisation du gestionnaire de l'historique d'analyse
         
         Args:
-            fichier_historique: Chemin du fichier d'historique, par défaut historique_analyse/depots_analyses.json
+            fichier_historique: Chemin de la base SQLite, par défaut historique_analyse/DB_NAME
+            fichier_json: Ancien historique JSON à importer s'il existe, par défaut
+                          depots_analyses.json dans le dossier de la base
+            fichier_filtre: Fichier du filtre de Bloom des dépôts analysés, par défaut dans
+                            DOSSIER_CACHE (aucun filtre si FILTRE_HISTORIQUE est désactivé)
         """
+        if DB_TYPE != 'sqlite':
+            raise ValueError(f"DB_TYPE non pris en charge pour l'historique d'analyse : {DB_TYPE} (sqlite uniquement)")
+        
         if fichier_historique is None:
-            dossier_historique = Path("historique_analyse")
-            dossier_historique.mkdir(exist_ok=True)
-            self.fichier_historique = dossier_historique / "depots_analyses.json"
-        else:
-            self.fichier_historique = Path(fichier_historique)
-            self.fichier_historique.parent.mkdir(exist_ok=True, parents=True)
+            fichier_historique = Path(DOSSIER_HISTORIQUE) / DB_NAME
+        self.fichier_historique = Path(fichier_historique)
+        self.fichier_historique.parent.mkdir(exist_ok=True, parents=True)
+        
+        # Opérations sur les fichiers partagés (migration, filtre) réservées à un processus à la fois
+        self._fichier_verrou = self.fichier_historique.with_name(self.fichier_historique.name + '.verrou')
         
-        self.historique = self._charger_historique()
+        # Plusieurs dépôts peuvent être analysés simultanément
+        self._verrou = threading.RLock()
+        self.connexion = sqlite3.connect(str(self.fichier_historique), timeout=DELAI_ATTENTE_BASE,
+                                         check_same_thread=False)
+        # Journal WAL : les validations ajoutent au journal au lieu de réécrire la base
+        self.connexion.execute('PRAGMA journal_mode=WAL')
+        self.connexion.execute('PRAGMA synchronous=NORMAL')
+        self.connexion.execute(
+            'CREATE TABLE IF NOT EXISTS depots ('
+            'nom TEXT PRIMARY KEY, premiere_analyse TEXT NOT NULL, derniere_analyse TEXT NOT NULL, '
+            'compte_problemes INTEGER NOT NULL DEFAULT 0, type_analyse TEXT, '
+            'compte_analyses INTEGER NOT NULL DEFAULT 1, dernier_commit TEXT, pousse_le TEXT, '
+            'problemes_par_chemin TEXT)'
+        )
+        # Base antérieure au décompte des problèmes par fichier
+        colonnes = {ligne[1] for ligne in self.connexion.execute('PRAGMA table_info(depots)')}
+        if 'problemes_par_chemin' not in colonnes:
+            self.connexion.execute('ALTER TABLE depots ADD COLUMN problemes_par_chemin TEXT')
+        # Parcours des dépôts dont l'analyse est ancienne (planification des réanalyses)
+        self.connexion.execute('CREATE INDEX IF NOT EXISTS depots_derniere_analyse ON depots (derniere_analyse)')
+        self.connexion.execute('CREATE TABLE IF NOT EXISTS metadonnees (cle TEXT PRIMARY KEY, valeur TEXT)')
+        # Baux des dépôts en cours d'analyse : propriétaire et horodatage Unix d'expiration
+        self.connexion.execute(
+            'CREATE TABLE IF NOT EXISTS baux ('
+            'nom TEXT PRIMARY KEY, proprietaire TEXT NOT NULL, expiration REAL NOT NULL)'
+        )
+        self.connexion.commit()
+        
+        # Identité de ce processus dans les baux, renouvelés tant qu'il est en vie
+        self.proprietaire = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.duree_bail = max(1.0, DUREE_BAIL_MINUTES * 60)
+        self._arret_renouvellement = threading.Event()
+        self._renouvellement = None
+        
+        if fichier_json is None:
+            fichier_json = self.fichier_historique.parent / NOM_FICHIER_JSON
+        if Path(fichier_json).exists():
+            with _verrou_processus(self._fichier_verrou):
+                # Un autre processus a pu terminer la migration pendant l'attente du verrou
+                if Path(fichier_json).exists():
+                    self.migrer_json(fichier_json)
+        
+        if fichier_filtre is None and FILTRE_HISTORIQUE and DOSSIER_CACHE:
+            # Un filtre par base : le chemin de la base fait partie du nom du fichier
+            empreinte = hashlib.sha1(str(self.fichier_historique.resolve()).encode('utf-8')).hexdigest()[:12]
+            fichier_filtre = Path(DOSSIER_CACHE) / f"historique_{empreinte}.bloom"
+        self.fichier_filtre = fichier_filtre
+        self.filtre = self._charger_filtre(fichier_filtre) if fichier_filtre else None
+    
+    def _metadonnee(self, cle: str) -> Optional[str]:
+        """Lire une métadonnée de la base"""
+        ligne = self.connexion.execute('SELECT valeur FROM metadonnees WHERE cle = ?', (cle,)).fetchone()
+        return ligne[0] if ligne else None
     
-    def _charger_historique(self) -> Dict:
+    def _charger_filtre(self, fichier_filtre: str) -> FiltreBloom:
         """
-        Charger l'historique d'analyse depuis le fichier
+        Mettre à jour le filtre de Bloom de la base, puis l'ouvrir en projection privée
         
+        Le fichier, partagé avec les autres processus, n'est modifié que sous le verrou entre
+        processus ; les dépôts marqués pendant l'analyse ne sont ajoutés qu'à la projection
+        privée, puis au fichier par fermer().
+        
+        Args:
+            fichier_filtre: Chemin du fichier du filtre
+            
         Returns:
-            Dictionnaire de l'historique
+            Filtre contenant tous les dépôts de la base
         """
-        if self.fichier_historique.exists():
-            try:
-                with open(self.fichier_historique, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"⚠️  Échec du chargement de l'historique d'analyse : {e}, création d'un nouvel historique")
-                return {"depots": {}, "total_analyses": 0, "derniere_mise_a_jour": None}
-        else:
-            return {"depots": {}, "total_analyses": 0, "derniere_mise_a_jour": None}
+        with self._verrou, _verrou_processus(self._fichier_verrou):
+            self._mettre_a_jour_filtre(fichier_filtre, reconstruire=True).fermer()
+            return FiltreBloom.ouvrir(fichier_filtre, prive=True)
+    
+    def _mettre_a_jour_filtre(self, fichier_filtre: str, reconstruire: bool) -> Optional[FiltreBloom]:
+        """
+        Ouvrir le fichier du filtre et y ajouter les dépôts enregistrés depuis sa dernière mise à jour
+        
+        Le filtre est reconstruit s'il appartient à une autre base, si des dépôts ont été supprimés
+        (un rowid a pu être réutilisé) ou s'il a dépassé sa capacité. À appeler sous le verrou
+        entre processus.
+        
+        Args:
+            fichier_filtre: Chemin du fichier du filtre
+            reconstruire: Reconstruire un filtre périmé (False : le laisser tel quel)
+            
+        Returns:
+            Filtre à jour, None si le filtre est périmé et n'a pas été reconstruit
+        """
+        with self._verrou:
+            identifiant = self._metadonnee('identifiant')
+            if identifiant is None:
+                identifiant = uuid.uuid4().hex
+                self.connexion.execute("INSERT INTO metadonnees (cle, valeur) VALUES ('identifiant', ?)",
+                                       (identifiant,))
+                self.connexion.commit()
+            suppressions = int(self._metadonnee('suppressions') or 0)
+            compte, rowid_max = self.connexion.execute(
+                'SELECT COUNT(*), COALESCE(MAX(rowid), 0) FROM depots'
+            ).fetchone()
+            
+            filtre = FiltreBloom.ouvrir(fichier_filtre)
+            if filtre is not None and (filtre.identifiant != identifiant or filtre.suppressions != suppressions
+                                       or filtre.rowid_max > rowid_max or compte > filtre.capacite):
+                filtre.fermer()
+                filtre = None
+            if filtre is None:
+                if not reconstruire:
+                    return None
+                filtre = FiltreBloom.creer(fichier_filtre, max(CAPACITE_MIN_FILTRE, 2 * compte),
+                                           TAUX_FAUX_POSITIFS_FILTRE, identifiant)
+                filtre.suppressions = suppressions
+            
+            self._completer_filtre(filtre)
+            return filtre
     
-    def _sauvegarder_historique(self):
-        """Sauvegarder l'historique d'analyse dans le fichier"""
+    def _completer_filtre(self, filtre: FiltreBloom):
+        """
+        Ajouter au filtre les dépôts enregistrés après son dernier rowid, puis l'enregistrer
+        
+        Args:
+            filtre: Filtre de Bloom de la base
+        """
+        rowid_max = filtre.rowid_max
+        for rowid, nom in self.connexion.execute('SELECT rowid, nom FROM depots WHERE rowid > ?', (filtre.rowid_max,)):
+            filtre.ajouter(nom)
+            rowid_max = max(rowid_max, rowid)
+        filtre.rowid_max = rowid_max
+        filtre.synchroniser()
+    
+    def migrer_json(self, fichier_json: str) -> int:
+        """
+        Importer l'ancien historique JSON dans la base, en une seule transaction
+        
+        Les dépôts déjà présents dans la base sont conservés. Le fichier JSON est ensuite
+        renommé (suffixe .migre) pour ne pas être importé de nouveau.
+        
+        Args:
+            fichier_json: Chemin du fichier depots_analyses.json
+            
+        Returns:
+            Nombre de dépôts importés
+        """
+        fichier_json = Path(fichier_json)
         try:
-            with open(self.fichier_historique, 'w', encoding='utf-8') as f:
-                json.dump(self.historique, f, indent=2, ensure_ascii=False)
+            with open(fichier_json, 'r', encoding='utf-8') as f:
+                historique = json.load(f)
         except Exception as e:
-            print(f"⚠️  Échec de la sauvegarde de l'historique d'analyse : {e}")
+            print(f"⚠️  Échec du chargement de l'historique JSON {fichier_json} : {e}, migration ignorée")
+            return 0
+        
+        maintenant = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        lignes = []
+        for nom_depot, infos_depot in (historique.get("depots") or {}).items():
+            derniere_analyse = infos_depot.get("derniere_analyse") or maintenant
+            lignes.append((
+                nom_depot,
+                infos_depot.get("premiere_analyse") or derniere_analyse,
+                derniere_analyse,
+                infos_depot.get("compte_problemes", 0),
+                infos_depot.get("type_analyse"),
+                infos_depot.get("compte_analyses", 1),
+                infos_depot.get("dernier_commit"),
+                infos_depot.get("pousse_le"),
+                json.dumps(infos_depot["problemes_par_chemin"], ensure_ascii=False, separators=(',', ':'),
+                           sort_keys=True) if infos_depot.get("problemes_par_chemin") is not None else None,
+            ))
+        
+        with self._verrou:
+            avant = self.obtenir_compte_analyses()
+            self.connexion.executemany(
+                f'INSERT OR IGNORE INTO depots (nom, {", ".join(COLONNES_DEPOT)}) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                lignes
+            )
+            if historique.get("derniere_mise_a_jour"):
+                self.connexion.execute(
+                    "INSERT OR IGNORE INTO metadonnees (cle, valeur) VALUES ('derniere_mise_a_jour', ?)",
+                    (historique["derniere_mise_a_jour"],)
+                )
+            self.connexion.commit()
+            importes = self.obtenir_compte_analyses() - avant
+        
+        fichier_json.replace(fichier_json.with_name(fichier_json.name + '.migre'))
+        print(f"✅ Historique JSON migré vers {self.fichier_historique} : {importes} dépôt(s) importé(s)")
+        return importes
+    
+    @staticmethod
+    def _infos_depot(valeurs: Iterable) -> Dict:
+        """
+        Convertir une ligne de la table des dépôts en informations d'analyse
+        
+        Args:
+            valeurs: Valeurs des colonnes COLONNES_DEPOT
+            
+        Returns:
+            Dictionnaire des informations d'analyse (colonnes vides omises)
+        """
+        infos_depot = {colonne: valeur for colonne, valeur in zip(COLONNES_DEPOT, valeurs) if valeur is not None}
+        if 'problemes_par_chemin' in infos_depot:
+            infos_depot['problemes_par_chemin'] = json.loads(infos_depot['problemes_par_chemin'])
+        return infos_depot
+    
+    def exporter_json(self, fichier_json: str) -> int:
+        """
+        Exporter l'historique au format JSON de l'ancien historique (clés triées, diff lisible)
+        
+        Le fichier exporté est réimporté par migrer_json() dans une base vide : c'est la copie
+        de l'historique conservée d'une analyse planifiée à la suivante, sans la base SQLite.
+        L'écriture passe par un fichier temporaire : un export interrompu ne remplace rien.
+        
+        Args:
+            fichier_json: Chemin du fichier exporté
+            
+        Returns:
+            Nombre de dépôts exportés
+        """
+        with self._verrou:
+            curseur = self.connexion.execute(f'SELECT nom, {", ".join(COLONNES_DEPOT)} FROM depots ORDER BY nom')
+            depots = {nom: self._infos_depot(valeurs) for nom, *valeurs in curseur}
+            derniere_mise_a_jour = self._metadonnee('derniere_mise_a_jour')
+        
+        fichier_json = Path(fichier_json)
+        fichier_json.parent.mkdir(exist_ok=True, parents=True)
+        temporaire = fichier_json.with_name(fichier_json.name + '.tmp')
+        with open(temporaire, 'w', encoding='utf-8') as f:
+            json.dump({'depots': depots, 'derniere_mise_a_jour': derniere_mise_a_jour}, f,
+                      indent=2, ensure_ascii=False, sort_keys=True)
+            f.write('\n')
+        temporaire.replace(fichier_json)
+        print(f"✅ Historique exporté vers {fichier_json} : {len(depots)} dépôt(s)")
+        return len(depots)
+    
+    def _lire_depot(self, nom_complet_depot: str) -> Optional[Dict]:
+        """
+        Lire l'entrée d'un dépôt
+        
+        Args:
+            nom_complet_depot: Nom complet du dépôt (proprietaire/depot)
+            
+        Returns:
+            Dictionnaire des informations d'analyse (colonnes vides omises), None si non analysé
+        """
+        with self._verrou:
+            # Dépôt jamais analysé : réponse du filtre, sans interroger la base
+            if self.filtre is not None and not self.filtre.peut_contenir(nom_complet_depot):
+                return None
+            ligne = self.connexion.execute(
+                f'SELECT {", ".join(COLONNES_DEPOT)} FROM depots WHERE nom = ?', (nom_complet_depot,)
+            ).fetchone()
+        if ligne is None:
+            return None
+        return self._infos_depot(ligne)
+    
+    def _modifie(self):
+        """Dater la dernière modification (dans la transaction en cours, validée par liberer() ou valider())"""
+        self.connexion.execute(
+            "INSERT OR REPLACE INTO metadonnees (cle, valeur) VALUES ('derniere_mise_a_jour', ?)",
+            (datetime.now().strftime('%Y-%m-%d %H:%M:%S'),)
+        )
+    
+    def _compter_suppression(self):
+        """Compter une suppression (les filtres enregistrés avant elle seront reconstruits)"""
+        self.connexion.execute(
+            "INSERT INTO metadonnees (cle, valeur) VALUES ('suppressions', '1') "
+            "ON CONFLICT (cle) DO UPDATE SET valeur = CAST(valeur AS INTEGER) + 1"
+        )
+    
+    def valider(self):
+        """Valider la transaction en cours"""
+        with self._verrou:
+            self.connexion.commit()
+    
+    def fermer(self):
+        """Libérer les baux de ce processus, enregistrer le filtre et fermer la base"""
+        self._arret_renouvellement.set()
+        if self._renouvellement is not None:
+            self._renouvellement.join()
+            self._renouvellement = None
+        with self._verrou:
+            self.connexion.execute('DELETE FROM baux WHERE proprietaire = ?', (self.proprietaire,))
+            self.connexion.commit()
+            if self.filtre is not None:
+                # Projection privée abandonnée : le fichier partagé est complété depuis la base
+                self.filtre.fermer()
+                self.filtre = None
+                with _verrou_processus(self._fichier_verrou):
+                    filtre = self._mettre_a_jour_filtre(self.fichier_filtre, reconstruire=False)
+                    if filtre is not None:
+                        filtre.fermer()
+            self.connexion.close()
+    
+    def revendiquer(self, nom_complet_depot: str, depuis: Optional[datetime] = None) -> bool:
+        """
+        Obtenir le bail d'un dépôt avant de l'analyser
+        
+        Le bail est refusé s'il est détenu par un autre processus et n'a pas expiré, ou si le
+        dépôt a été analysé depuis la date indiquée (par un autre processus, entre la sélection
+        des dépôts et leur analyse). Vérification et prise du bail forment une seule instruction
+        SQL : deux processus ne peuvent pas l'obtenir en même temps. Les baux obtenus sont
+        renouvelés en arrière-plan jusqu'à liberer() ou fermer() ; ceux d'un processus arrêté
+        expirent après DUREE_BAIL_MINUTES.
+        
+        Args:
+            nom_complet_depot: Nom complet du dépôt (proprietaire/depot)
+            depuis: Début de l'analyse en cours (heure locale), None pour ne pas vérifier l'historique
+            
+        Returns:
+            True si ce processus peut analyser le dépôt
+        """
+        maintenant = time.time()
+        depuis_texte = depuis.strftime('%Y-%m-%d %H:%M:%S') if depuis is not None else '9999'
+        with self._verrou:
+            obtenu = self.connexion.execute(
+                'INSERT INTO baux (nom, proprietaire, expiration) SELECT ?, ?, ? '
+                'WHERE NOT EXISTS (SELECT 1 FROM depots WHERE nom = ? AND derniere_analyse >= ?) '
+                'ON CONFLICT (nom) DO UPDATE SET proprietaire = excluded.proprietaire, '
+                'expiration = excluded.expiration '
+                'WHERE baux.expiration < ? OR baux.proprietaire = excluded.proprietaire',
+                (nom_complet_depot, self.proprietaire, maintenant + self.duree_bail,
+                 nom_complet_depot, depuis_texte, maintenant)
+            ).rowcount == 1
+            self.connexion.commit()
+            if obtenu and self._renouvellement is None:
+                self._renouvellement = threading.Thread(target=self._renouveler_baux, daemon=True)
+                self._renouvellement.start()
+        return obtenu
+    
+    def liberer(self, nom_complet_depot: str):
+        """
+        Libérer le bail d'un dépôt (analyse terminée, résultat déjà enregistré)
+        
+        Le résultat du dépôt et la libération du bail sont validés dans la même transaction.
+        
+        Args:
+            nom_complet_depot: Nom complet du dépôt (proprietaire/depot)
+        """
+        with self._verrou:
+            self.connexion.execute('DELETE FROM baux WHERE nom = ? AND proprietaire = ?',
+                                   (nom_complet_depot, self.proprietaire))
+            self.connexion.commit()
+    
+    def _renouveler_baux(self):
+        """Prolonger les baux de ce processus trois fois par durée de bail, jusqu'à la fermeture"""
+        while not self._arret_renouvellement.wait(self.duree_bail / 3):
+            try:
+                with self._verrou:
+                    self.connexion.execute('UPDATE baux SET expiration = ? WHERE proprietaire = ?',
+                                           (time.time() + self.duree_bail, self.proprietaire))
+                    self.connexion.commit()
+            except sqlite3.Error as e:
+                print(f"⚠️  Échec du renouvellement des baux de l'historique : {e}")
     
     def est_analyse(self, nom_complet_depot: str) -> bool:
         """
@@ -64,7 +468,38 @@ class HistoriqueAnalyse:
         Returns:
             True si déjà analysé, False sinon
         """
-        return nom_complet_depot in self.historique["depots"]
+        with self._verrou:
+            # Dépôt jamais analysé : réponse du filtre, sans interroger la base
+            if self.filtre is not None and not self.filtre.peut_contenir(nom_complet_depot):
+                return False
+            return self.connexion.execute(
+                'SELECT 1 FROM depots WHERE nom = ?', (nom_complet_depot,)
+            ).fetchone() is not None
+    
+    def est_a_jour(self, nom_complet_depot: str, pousse_le: Optional[datetime] = None) -> bool:
+        """
+        Vérifier si un dépôt a été analysé et n'a reçu aucun push depuis
+        
+        Args:
+            nom_complet_depot: Nom complet du dépôt (proprietaire/depot)
+            pousse_le: Date du dernier push (pushed_at), None si inconnue
+            
+        Returns:
+            True si l'analyse enregistrée est toujours valable, False si le dépôt est nouveau ou modifié
+        """
+        infos_depot = self._lire_depot(nom_complet_depot)
+        if infos_depot is None:
+            return False
+        # Date du dernier push inconnue : le dépôt est considéré comme inchangé
+        if pousse_le is None:
+            return True
+        
+        pousse_le = _en_utc(pousse_le)
+        if infos_depot.get("pousse_le"):
+            return pousse_le <= datetime.fromisoformat(infos_depot["pousse_le"])
+        # Entrée antérieure au suivi des pushs : comparaison avec la date de l'analyse (heure locale)
+        derniere_analyse = datetime.strptime(infos_depot["derniere_analyse"], '%Y-%m-%d %H:%M:%S').astimezone()
+        return pousse_le <= derniere_analyse
     
     def obtenir_infos_analyse(self, nom_complet_depot: str) -> Dict:
         """
@@ -76,33 +511,49 @@ class HistoriqueAnalyse:
         Returns:
             Dictionnaire des informations d'analyse, None si non analysé
         """
-        return self.historique["depots"].get(nom_complet_depot)
+        return self._lire_depot(nom_complet_depot)
     
-    def marquer_comme_analyse(self, nom_complet_depot: str, compte_problemes: int = 0, 
-                              type_analyse: str = "inconnu"):
+    def marquer_comme_analyse(self, nom_complet_depot: str, compte_problemes: int = 0,
+                              type_analyse: str = "inconnu", sha_commit: Optional[str] = None,
+                              pousse_le: Optional[datetime] = None,
+                              problemes_par_chemin: Optional[Dict[str, int]] = None):
         """
         Marquer un dépôt comme analysé
         
+        L'écriture rejoint la transaction en cours, validée avec la libération du bail du dépôt
+        (liberer()) ou par valider() : une seule transaction courte par dépôt.
+        
         Args:
             nom_complet_depot: Nom complet du dépôt (proprietaire/depot)
             compte_problemes: Nombre de problèmes détectés
             type_analyse: Type d'analyse
+            sha_commit: SHA du commit analysé (base de la prochaine analyse incrémentale),
+                        None pour conserver le précédent
+            pousse_le: Date du dernier push du dépôt, None pour conserver la précédente
+            problemes_par_chemin: Problèmes de chaque fichier au commit analysé (fichiers sans
+                                  problème omis), base du décompte de la prochaine analyse
+                                  incrémentale ; None pour conserver le précédent
         """
-        self.historique["depots"][nom_complet_depot] = {
-            "premiere_analyse": self.historique["depots"].get(nom_complet_depot, {}).get(
-                "premiere_analyse", 
-                datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            ),
-            "derniere_analyse": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            "compte_problemes": compte_problemes,
-            "type_analyse": type_analyse,
-            "compte_analyses": self.historique["depots"].get(nom_complet_depot, {}).get("compte_analyses", 0) + 1
-        }
-        
-        self.historique["total_analyses"] = len(self.historique["depots"])
-        self.historique["derniere_mise_a_jour"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        
-        self._sauvegarder_historique()
+        maintenant = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        dernier_push = _en_utc(pousse_le).isoformat() if pousse_le else None
+        par_chemin = None
+        if problemes_par_chemin is not None:
+            par_chemin = json.dumps(problemes_par_chemin, ensure_ascii=False, separators=(',', ':'), sort_keys=True)
+        with self._verrou:
+            self.connexion.execute(
+                f'INSERT INTO depots (nom, {", ".join(COLONNES_DEPOT)}) VALUES (?, ?, ?, ?, ?, 1, ?, ?, ?) '
+                'ON CONFLICT (nom) DO UPDATE SET derniere_analyse = excluded.derniere_analyse, '
+                'compte_problemes = excluded.compte_problemes, type_analyse = excluded.type_analyse, '
+                'compte_analyses = depots.compte_analyses + 1, '
+                'dernier_commit = COALESCE(excluded.dernier_commit, depots.dernier_commit), '
+                'pousse_le = COALESCE(excluded.pousse_le, depots.pousse_le), '
+                'problemes_par_chemin = COALESCE(excluded.problemes_par_chemin, depots.problemes_par_chemin)',
+                (nom_complet_depot, maintenant, maintenant, compte_problemes, type_analyse, sha_commit, dernier_push,
+                 par_chemin)
+            )
+            if self.filtre is not None:
+                self.filtre.ajouter(nom_complet_depot)
+            self._modifie()
     
     def obtenir_depots_analyses(self) -> List[str]:
         """
@@ -111,7 +562,8 @@ class HistoriqueAnalyse:
         Returns:
             Liste des noms complets des dépôts
         """
-        return list(self.historique["depots"].keys())
+        with self._verrou:
+            return [nom for nom, in self.connexion.execute('SELECT nom FROM depots')]
     
     def obtenir_compte_analyses(self) -> int:
         """
@@ -120,12 +572,59 @@ class HistoriqueAnalyse:
         Returns:
             Nombre de dépôts
         """
-        return self.historique["total_analyses"]
+        with self._verrou:
+            return self.connexion.execute('SELECT COUNT(*) FROM depots').fetchone()[0]
+    
+    def parcourir_depots_anterieurs(self, limite: datetime) -> Iterator[Tuple[str, Dict]]:
+        """
+        Parcourir les dépôts dont la dernière analyse est antérieure à une date
+        
+        Args:
+            limite: Date limite (heure locale, comme les dates d'analyse)
+            
+        Yields:
+            (nom complet du dépôt, informations d'analyse), par lots lus sous le verrou
+        """
+        with self._verrou:
+            curseur = self.connexion.execute(
+                f'SELECT nom, {", ".join(COLONNES_DEPOT)} FROM depots WHERE derniere_analyse < ?',
+                (limite.strftime('%Y-%m-%d %H:%M:%S'),)
+            )
+        while True:
+            with self._verrou:
+                lignes = curseur.fetchmany(TAILLE_LOT_LECTURE)
+            if not lignes:
+                return
+            for nom, *valeurs in lignes:
+                yield nom, self._infos_depot(valeurs)
+    
+    def purger_depots_anterieurs(self, limite: datetime) -> int:
+        """
+        Supprimer les dépôts dont la dernière analyse est antérieure à une date
+        
+        Args:
+            limite: Date limite (heure locale, comme les dates d'analyse)
+            
+        Returns:
+            Nombre de dépôts supprimés
+        """
+        with self._verrou:
+            supprimes = self.connexion.execute(
+                'DELETE FROM depots WHERE derniere_analyse < ?', (limite.strftime('%Y-%m-%d %H:%M:%S'),)
+            ).rowcount
+            if supprimes:
+                self._compter_suppression()
+                self._modifie()
+            self.valider()
+        return supprimes
     
     def effacer_historique(self):
         """Effacer tout l'historique d'analyse"""
-        self.historique = {"depots": {}, "total_analyses": 0, "derniere_mise_a_jour": None}
-        self._sauvegarder_historique()
+        with self._verrou:
+            self.connexion.execute('DELETE FROM depots')
+            self.connexion.execute("DELETE FROM metadonnees WHERE cle = 'derniere_mise_a_jour'")
+            self._compter_suppression()
+            self.valider()
         print("✅ Historique d'analyse effacé")
     
     def supprimer_depot(self, nom_complet_depot: str):
@@ -135,11 +634,13 @@ class HistoriqueAnalyse:
         Args:
             nom_complet_depot: Nom complet du dépôt (proprietaire/depot)
         """
-        if nom_complet_depot in self.historique["depots"]:
-            del self.historique["depots"][nom_complet_depot]
-            self.historique["total_analyses"] = len(self.historique["depots"])
-            self.historique["derniere_mise_a_jour"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            self._sauvegarder_historique()
+        with self._verrou:
+            supprime = self.connexion.execute('DELETE FROM depots WHERE nom = ?', (nom_complet_depot,)).rowcount
+            if supprime:
+                self._compter_suppression()
+                self._modifie()
+            self.valider()
+        if supprime:
             print(f"✅ Supprimé de l'historique : {nom_complet_depot}")
         else:
             print(f"⚠️  Dépôt non trouvé dans l'historique : {nom_complet_depot}")
@@ -151,21 +652,20 @@ class HistoriqueAnalyse:
         Returns:
             Dictionnaire des statistiques
         """
-        total_problemes = sum(
-            infos_depot.get("compte_problemes", 0) 
-            for infos_depot in self.historique["depots"].values()
-        )
-        
-        depots_avec_problemes = sum(
-            1 for infos_depot in self.historique["depots"].values() 
-            if infos_depot.get("compte_problemes", 0) > 0
-        )
+        with self._verrou:
+            total_analyses, total_problemes, depots_avec_problemes = self.connexion.execute(
+                'SELECT COUNT(*), COALESCE(SUM(compte_problemes), 0), '
+                'COALESCE(SUM(compte_problemes > 0), 0) FROM depots'
+            ).fetchone()
+            ligne = self.connexion.execute(
+                "SELECT valeur FROM metadonnees WHERE cle = 'derniere_mise_a_jour'"
+            ).fetchone()
         
         return {
-            "total_analyses": self.historique["total_analyses"],
+            "total_analyses": total_analyses,
             "total_problemes": total_problemes,
             "depots_avec_problemes": depots_avec_problemes,
-            "derniere_mise_a_jour": self.historique["derniere_mise_a_jour"]
+            "derniere_mise_a_jour": ligne[0] if ligne else None
         }
     
     def afficher_statistiques(self):
@@ -177,3 +677,22 @@ class HistoriqueAnalyse:
         print(f"   Dépôts avec problèmes: {stats['depots_avec_problemes']}")
         if stats['derniere_mise_a_jour']:
             print(f"   Dernière mise à jour: {stats['derniere_mise_a_jour']}")
+
+
+if __name__ == "__main__":
+    # Export : python scan_history.py --exporter [depots_analyses.json]
+    if len(sys.argv) > 1 and sys.argv[1] == '--exporter':
+        fichier = sys.argv[2] if len(sys.argv) > 2 else str(Path(DOSSIER_HISTORIQUE) / NOM_FICHIER_JSON)
+        historique = HistoriqueAnalyse()
+        historique.exporter_json(fichier)
+        historique.fermer()
+        sys.exit(0)
+    
+    # Migration ponctuelle : python scan_history.py [depots_analyses.json]
+    fichier = sys.argv[1] if len(sys.argv) > 1 else str(Path(DOSSIER_HISTORIQUE) / NOM_FICHIER_JSON)
+    if not Path(fichier).exists():
+        print(f"⚠️  Fichier introuvable : {fichier}")
+        sys.exit(1)
+    historique = HistoriqueAnalyse(fichier_json=fichier)
+    historique.afficher_statistiques()
+    historique.fermer()
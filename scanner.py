@@ -3,34 +3,90 @@
 Module principal du scanner - Intègre toutes les fonctionnalités
 """
 import time
-from datetime import datetime
-from typing import List, Dict, Optional
+import tarfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, Future
+from datetime import datetime, timedelta
+from typing import List, Dict, Optional, Iterator, Tuple
+import requests
 from github_scanner import ScannerGitHub
+from concurrent_fetcher import RecuperateurConcurrent
+from graphql_fetcher import RecuperateurGraphQL
 from secret_detector import DetecteurSecret
+from detection_executor import ExecuteurDetection
 from report_generator import GenerateurRapport
 from scan_history import HistoriqueAnalyse
+from blob_cache import CacheBlobs, FluxEmpreinte, calculer_sha_blob
+from http_cache import CacheHttp
+from checkpoint_journal import JournalReprise
+from rescan_scheduler import PlanificateurReanalyses
+from config import (
+    TAILLE_MAX_FICHIER, TAILLE_MIN_FLUX, PROFILAGE_REGLES, MODE_RECUPERATION, THREADS_LECTURE_LOCALE,
+    CACHE_BLOBS, CACHE_HTTP, DOSSIER_CACHE, DEPOTS_SIMULTANES, CONSERVE_HISTORIQUE, MAX_HISTORIQUE_JOURS,
+    REANALYSES_PAR_ANALYSE
+)
 
 
 class CloudScanner:
     """Scanner cloud - Logique d'analyse principale"""
     
-    def __init__(self, token_github: str, sauter_analyses: bool = True, timeout_minutes: int = 50):
+    def __init__(self, token_github: str, sauter_analyses: bool = True, timeout_minutes: int = 50,
+                 profilage_regles: bool = PROFILAGE_REGLES, mode_recuperation: str = MODE_RECUPERATION):
         """
         Initialisation du scanner
         
         Args:
-            token_github: GitHub Personal Access Token
+            token_github: GitHub Personal Access Token (complété par GITHUB_TOKENS et FICHIER_TOKENS_GITHUB)
             sauter_analyses: Ignorer les dépôts déjà analysés (par défaut: True)
             timeout_minutes: Délai d'expiration de l'analyse (minutes), par défaut 50 minutes
+            profilage_regles: Enregistrer le coût de chaque règle de détection
+            mode_recuperation: 'api' (un appel par fichier), 'graphql' (de nombreux fichiers par requête),
+                               'archive' (une archive tar par dépôt) ou 'clone' (clone superficiel du dépôt)
         """
-        self.scanner_github = ScannerGitHub(token_github)
-        self.detecteur_secret = DetecteurSecret()
+        # Réponses de l'API conservées d'une analyse à l'autre : une réponse inchangée (304) ne consomme pas de budget
+        self.cache_http = CacheHttp() if CACHE_HTTP and DOSSIER_CACHE else None
+        self.scanner_github = ScannerGitHub(token_github, cache_http=self.cache_http)
+        self.recuperateur = RecuperateurConcurrent(self.scanner_github.token)
+        self.recuperateur_graphql = None
+        if mode_recuperation == 'graphql':
+            self.recuperateur_graphql = RecuperateurGraphQL(self.scanner_github.token,
+                                                            reserve=self.scanner_github.reserve)
+        self.detecteur_secret = DetecteurSecret(profilage=profilage_regles)
+        self.executeur_detection = ExecuteurDetection(self.detecteur_secret)
+        # Résultats par SHA de blob, valables tant que les règles et le mode d'analyse ne changent pas
+        self.cache_blobs = None
+        if CACHE_BLOBS and DOSSIER_CACHE:
+            self.cache_blobs = CacheBlobs(self.detecteur_secret.version_regles)
         self.generateur_rapport = GenerateurRapport()
         self.historique_analyse = HistoriqueAnalyse()
+        self.planificateur_reanalyses = PlanificateurReanalyses(self.historique_analyse)
+        # Progression de l'analyse enregistrée au fur et à mesure, pour la reprendre après une interruption
+        self.journal = JournalReprise()
         self.sauter_analyses = sauter_analyses
+        self.mode_recuperation = mode_recuperation
+        self.threads_lecture = max(1, THREADS_LECTURE_LOCALE)
+        self.depots_simultanes = max(1, DEPOTS_SIMULTANES)
         self.timeout_secondes = timeout_minutes * 60
         self.heure_debut_analyse = None
     
+    def fermer(self):
+        """Libérer les ressources du scanner (processus de détection, connexions, caches, historique, journal)"""
+        self.executeur_detection.fermer()
+        self.journal.fermer()
+        self.recuperateur.fermer()
+        if self.recuperateur_graphql is not None:
+            self.recuperateur_graphql.fermer()
+        if self.cache_blobs is not None:
+            self.cache_blobs.fermer()
+            self.cache_blobs = None
+        if self.cache_http is not None:
+            self.cache_http.fermer()
+            self.cache_http = None
+        if self.historique_analyse is not None:
+            self.historique_analyse.fermer()
+            self.historique_analyse = None
+    
     def _est_timeout(self) -> bool:
         """Vérifier si le délai d'expiration est atteint"""
         if self.heure_debut_analyse is None:
@@ -75,36 +131,16 @@ class CloudScanner:
         depots = self.scanner_github.obtenir_depots_utilisateur(nom_utilisateur)
         print(f"📦 {len(depots)} dépôts publics trouvés")
         
-        # Filtrer les dépôts déjà analysés
+        # Filtrer les dépôts déjà analysés et inchangés depuis
         depots_a_analyser, compte_ignores = self._filtrer_depots_analyses(depots)
         if compte_ignores > 0:
-            print(f"⏭️  {compte_ignores} dépôts déjà analysés ignorés")
-            print(f"📦 {len(depots_a_analyser)} nouveaux dépôts à analyser")
-        
-        # Analyser tous les dépôts
-        toutes_decouvertes = []
-        for idx, depot in enumerate(depots_a_analyser, 1):
-            # Vérifier le délai d'expiration
-            if self._verifier_timeout(idx - 1, len(depots_a_analyser)):
-                break
-            
-            print(f"🔍 [{idx}/{len(depots_a_analyser)}] Analyse du dépôt : {depot['nom_complet']}")
-            decouvertes = self._analyser_depot(depot, type_analyse=f"utilisateur:{nom_utilisateur}")
-            toutes_decouvertes.extend(decouvertes)
+            print(f"⏭️  {compte_ignores} dépôts inchangés depuis leur dernière analyse ignorés")
+            print(f"📦 {len(depots_a_analyser)} dépôts nouveaux ou modifiés à analyser")
         
-        # Générer le rapport
-        print(f"\n📝 Génération du rapport...")
-        chemin_rapport = self.generateur_rapport.generer_rapport(
-            toutes_decouvertes, 
-            heure_debut_analyse,
-            type_analyse=f"utilisateur:{nom_utilisateur}"
-        )
-        
-        # Afficher le résumé
-        resume = self.generateur_rapport.generer_resume(chemin_rapport, len(toutes_decouvertes))
-        print(resume)
-        
-        return chemin_rapport
+        # Analyser tous les dépôts, en journalisant la progression, puis générer le rapport
+        type_analyse = f"utilisateur:{nom_utilisateur}"
+        self.journal.commencer(type_analyse, heure_debut_analyse, depots_a_analyser)
+        return self._analyser_et_rapporter(depots_a_analyser, type_analyse, heure_debut_analyse)
     
     def analyser_organisation(self, nom_organisation: str) -> str:
         """
@@ -124,43 +160,29 @@ class CloudScanner:
         depots = self.scanner_github.obtenir_depots_organisation(nom_organisation)
         print(f"📦 {len(depots)} dépôts publics trouvés")
         
-        # Filtrer les dépôts déjà analysés
+        # Filtrer les dépôts déjà analysés et inchangés depuis
         depots_a_analyser, compte_ignores = self._filtrer_depots_analyses(depots)
         if compte_ignores > 0:
-            print(f"⏭️  {compte_ignores} dépôts déjà analysés ignorés")
-            print(f"📦 {len(depots_a_analyser)} nouveaux dépôts à analyser")
-        
-        # Analyser tous les dépôts
-        toutes_decouvertes = []
-        for idx, depot in enumerate(depots_a_analyser, 1):
-            # Vérifier le délai d'expiration
-            if self._verifier_timeout(idx - 1, len(depots_a_analyser)):
-                break
-            
-            print(f"🔍 [{idx}/{len(depots_a_analyser)}] Analyse du dépôt : {depot['nom_complet']}")
-            decouvertes = self._analyser_depot(depot, type_analyse=f"organisation:{nom_organisation}")
-            toutes_decouvertes.extend(decouvertes)
+            print(f"⏭️  {compte_ignores} dépôts inchangés depuis leur dernière analyse ignorés")
+            print(f"📦 {len(depots_a_analyser)} dépôts nouveaux ou modifiés à analyser")
         
-        # Générer le rapport
-        print(f"\n📝 Génération du rapport...")
-        chemin_rapport = self.generateur_rapport.generer_rapport(
-            toutes_decouvertes,
-            heure_debut_analyse,
-            type_analyse=f"organisation:{nom_organisation}"
-        )
-        
-        # Afficher le résumé
-        resume = self.generateur_rapport.generer_resume(chemin_rapport, len(toutes_decouvertes))
-        print(resume)
-        
-        return chemin_rapport
+        # Analyser tous les dépôts, en journalisant la progression, puis générer le rapport
+        type_analyse = f"organisation:{nom_organisation}"
+        self.journal.commencer(type_analyse, heure_debut_analyse, depots_a_analyser)
+        return self._analyser_et_rapporter(depots_a_analyser, type_analyse, heure_debut_analyse)
     
-    def analyser_projets_ia(self, depots_max: int = 50) -> str:
+    def analyser_projets_ia(self, depots_max: int = 50, reanalyses_max: int = REANALYSES_PAR_ANALYSE) -> str:
         """
         Recherche et analyse automatique de projets liés à l'IA
         
+        Aux nouveaux dépôts s'ajoutent jusqu'à reanalyses_max dépôts de l'historique analysés il y
+        a plus de MAX_HISTORIQUE_JOURS jours, choisis par le planificateur des réanalyses (ou, si
+        CONSERVE_HISTORIQUE est désactivé, ces dépôts sont retirés de l'historique et peuvent être
+        retrouvés par la recherche).
+        
         Args:
-            depots_max: Nombre maximum de dépôts à analyser
+            depots_max: Nombre maximum de nouveaux dépôts à analyser
+            reanalyses_max: Nombre maximum de dépôts déjà analysés à réanalyser
             
         Returns:
             Chemin du fichier de rapport
@@ -170,6 +192,15 @@ class CloudScanner:
         heure_debut_analyse = datetime.now()
         self.heure_debut_analyse = time.time()  # Démarrer le chronomètre
         
+        # Historique non conservé : les dépôts analysés il y a trop longtemps redeviennent inconnus
+        if not CONSERVE_HISTORIQUE:
+            supprimes = self.historique_analyse.purger_depots_anterieurs(
+                datetime.now() - timedelta(days=MAX_HISTORIQUE_JOURS)
+            )
+            if supprimes:
+                print(f"🗑️  {supprimes} dépôts analysés il y a plus de {MAX_HISTORIQUE_JOURS} jours "
+                      f"retirés de l'historique")
+        
         # Définir la fonction de filtrage : vérifier si le dépôt est déjà analysé
         def est_analyse(nom_complet_depot: str) -> bool:
             return self.historique_analyse.est_analyse(nom_complet_depot)
@@ -183,31 +214,177 @@ class CloudScanner:
         
         print(f"📦 {len(depots_a_analyser)} dépôts à analyser trouvés")
         
-        # Analyser tous les dépôts
-        toutes_decouvertes = []
-        for idx, depot in enumerate(depots_a_analyser, 1):
-            # Vérifier le délai d'expiration
-            if self._verifier_timeout(idx - 1, len(depots_a_analyser)):
-                break
+        # Réanalyses : dépôts dont l'analyse est ancienne, les plus à risque et les plus actifs d'abord
+        if CONSERVE_HISTORIQUE:
+            reanalyses = self.planificateur_reanalyses.selectionner(
+                reanalyses_max, exclus=[depot['nom_complet'] for depot in depots_a_analyser]
+            )
+            if reanalyses:
+                print(f"🔁 {len(reanalyses)} dépôts analysés il y a plus de {MAX_HISTORIQUE_JOURS} jours "
+                      f"à réanalyser")
+                depots_a_analyser.extend(reanalyses)
+        
+        # Analyser tous les dépôts, en journalisant la progression, puis générer le rapport
+        type_analyse = "auto:projets-ia"
+        self.journal.commencer(type_analyse, heure_debut_analyse, depots_a_analyser)
+        return self._analyser_et_rapporter(depots_a_analyser, type_analyse, heure_debut_analyse)
+    
+    def reprendre_analyse(self) -> Optional[str]:
+        """
+        Reprendre l'analyse interrompue enregistrée dans le journal de reprise
+        
+        Les dépôts terminés ne sont pas réanalysés (leurs découvertes sont relues dans le
+        journal), le dépôt en cours repart après son dernier fichier analysé, et le rapport
+        couvre toute l'analyse, depuis son heure de début d'origine.
+        
+        Returns:
+            Chemin du fichier de rapport, None si aucune analyse n'est à reprendre
+        """
+        etat = self.journal.reprendre()
+        if etat is None:
+            return None
+        self.heure_debut_analyse = time.time()  # Démarrer le chronomètre
+        
+        depots_restants = etat['depots_restants']
+        print(f"🔁 Reprise de l'analyse {etat['type_analyse']} commencée le "
+              f"{etat['heure_debut'].strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"📦 {len(self.journal.depots_termines)} dépôts déjà analysés "
+              f"({len(etat['decouvertes'])} problème(s)), {len(depots_restants)} dépôts restants")
+        
+        return self._analyser_et_rapporter(depots_restants, etat['type_analyse'], etat['heure_debut'],
+                                           etat['decouvertes'])
+    
+    def _analyser_et_rapporter(self, depots: List[Dict], type_analyse: str, heure_debut_analyse: datetime,
+                               decouvertes_precedentes: Optional[List[Dict]] = None) -> str:
+        """
+        Analyser des dépôts puis générer le rapport de l'analyse
+        
+        Le journal de reprise est supprimé une fois tous les dépôts prévus analysés ; il est
+        conservé si le délai d'expiration a laissé des dépôts de côté.
+        
+        Args:
+            depots: Dépôts à analyser
+            type_analyse: Type d'analyse
+            heure_debut_analyse: Heure de début de l'analyse
+            decouvertes_precedentes: Découvertes des dépôts analysés avant une interruption
             
-            print(f"🔍 [{idx}/{len(depots_a_analyser)}] Analyse du dépôt : {depot['nom_complet']}")
-            decouvertes = self._analyser_depot(depot, type_analyse="auto:projets-ia")
-            toutes_decouvertes.extend(decouvertes)
+        Returns:
+            Chemin du fichier de rapport
+        """
+        toutes_decouvertes = list(decouvertes_precedentes or [])
+        toutes_decouvertes.extend(self._analyser_depots(depots, type_analyse=type_analyse))
         
         # Générer le rapport
         print(f"\n📝 Génération du rapport...")
         chemin_rapport = self.generateur_rapport.generer_rapport(
             toutes_decouvertes,
             heure_debut_analyse,
-            type_analyse="auto:projets-ia"
+            type_analyse=type_analyse
         )
         
         # Afficher le résumé
         resume = self.generateur_rapport.generer_resume(chemin_rapport, len(toutes_decouvertes))
         print(resume)
         
+        depots_restants = self.journal.depots_restants()
+        if depots_restants:
+            self.journal.fermer()
+            print(f"🔁 {len(depots_restants)} dépôts restants : l'analyse peut être poursuivie avec --reprendre")
+        else:
+            self.journal.terminer()
+        
         return chemin_rapport
     
+    def _analyser_depots(self, depots: List[Dict], type_analyse: str) -> List[Dict]:
+        """
+        Analyser plusieurs dépôts, jusqu'à depots_simultanes à la fois
+        
+        Chaque dépôt est analysé dans son propre thread ; la détection reste répartie sur le
+        groupe de processus partagé. Un dépôt n'est plus commencé une fois le délai
+        d'expiration atteint, et les découvertes sont fusionnées dans l'ordre des dépôts,
+        quel que soit l'ordre de fin des analyses.
+        
+        Args:
+            depots: Dépôts à analyser
+            type_analyse: Type d'analyse (enregistré dans l'historique)
+            
+        Returns:
+            Découvertes de tous les dépôts analysés
+        """
+        total = len(depots)
+        if self.depots_simultanes <= 1:
+            toutes_decouvertes = []
+            for idx, depot in enumerate(depots, 1):
+                # Vérifier le délai d'expiration
+                if self._verifier_timeout(idx - 1, total):
+                    break
+                
+                print(f"🔍 [{idx}/{total}] Analyse du dépôt : {depot['nom_complet']}")
+                toutes_decouvertes.extend(self._analyser_depot_sous_bail(depot, type_analyse))
+            self.historique_analyse.valider()
+            return toutes_decouvertes
+        
+        verrou_compteur = threading.Lock()
+        compteur = [0]
+        
+        def analyser(depot: Dict) -> Optional[List[Dict]]:
+            # Délai vérifié au démarrage effectif, pas à la soumission
+            if self._est_timeout():
+                return None
+            # Budget d'API partagé entre tous les threads : ne pas commencer un dépôt sans budget
+            self.scanner_github.attendre_limite_taux()
+            with verrou_compteur:
+                compteur[0] += 1
+                idx = compteur[0]
+            print(f"🔍 [{idx}/{total}] Analyse du dépôt : {depot['nom_complet']}")
+            return self._analyser_depot_sous_bail(depot, type_analyse)
+        
+        pool = ThreadPoolExecutor(max_workers=self.depots_simultanes)
+        try:
+            futurs = [pool.submit(analyser, depot) for depot in depots]
+            resultats = [futur.result() for futur in futurs]
+        except BaseException:
+            # Interruption : ne pas commencer les dépôts encore en attente
+            pool.shutdown(wait=False, cancel_futures=True)
+            raise
+        pool.shutdown(wait=True)
+        self.historique_analyse.valider()
+        
+        analyses = sum(1 for decouvertes in resultats if decouvertes is not None)
+        if analyses < total:
+            self._verifier_timeout(analyses, total)
+        
+        toutes_decouvertes = []
+        for decouvertes in resultats:
+            if decouvertes:
+                toutes_decouvertes.extend(decouvertes)
+        return toutes_decouvertes
+    
+    def _analyser_depot_sous_bail(self, depot: Dict, type_analyse: str) -> List[Dict]:
+        """
+        Analyser un dépôt si aucune autre instance du scanner ne l'analyse ou ne l'a analysé
+        depuis le début de cette analyse, puis l'enregistrer dans le journal de reprise
+        
+        Args:
+            depot: Dictionnaire des informations du dépôt
+            type_analyse: Type d'analyse
+            
+        Returns:
+            Liste des informations sensibles découvertes (vide si le dépôt est laissé à une autre instance)
+        """
+        nom_depot = depot['nom_complet']
+        debut = datetime.fromtimestamp(self.heure_debut_analyse) if self.heure_debut_analyse else None
+        if self.historique_analyse.revendiquer(nom_depot, depuis=debut):
+            try:
+                decouvertes = self._analyser_depot(depot, type_analyse=type_analyse)
+            finally:
+                self.historique_analyse.liberer(nom_depot)
+        else:
+            print(f"  🔒 Dépôt analysé par une autre instance du scanner, ignoré")
+            decouvertes = []
+        self.journal.depot_termine(nom_depot, decouvertes)
+        return decouvertes
+    
     def analyser_depot_unique(self, nom_complet_depot: str) -> str:
         """
         Analyser un seul dépôt
@@ -228,8 +405,9 @@ class CloudScanner:
             'url_clone': f"https://github.com/{nom_complet_depot}.git",
         }
         
-        # Analyser le dépôt
+        # Analyser le dépôt (sans bail : le résultat est validé ici)
         decouvertes = self._analyser_depot(infos_depot)
+        self.historique_analyse.valider()
         
         # Générer le rapport
         print(f"\n📝 Génération du rapport...")
@@ -247,7 +425,7 @@ class CloudScanner:
     
     def _filtrer_depots_analyses(self, depots: List[Dict]) -> tuple:
         """
-        Filtrer les dépôts déjà analysés
+        Filtrer les dépôts déjà analysés qui n'ont reçu aucun push depuis leur analyse
         
         Args:
             depots: Liste des dépôts
@@ -263,17 +441,273 @@ class CloudScanner:
         
         for depot in depots:
             nom_depot = depot.get('nom_complet', '')
-            if self.historique_analyse.est_analyse(nom_depot):
+            if self.historique_analyse.est_a_jour(nom_depot, depot.get('pousse_le')):
                 compte_ignores += 1
             else:
                 depots_a_analyser.append(depot)
         
         return depots_a_analyser, compte_ignores
     
+    def _analyser_fichier_en_flux(self, infos_fichier: Dict) -> Optional[List[Dict]]:
+        """
+        Analyser un gros fichier bloc par bloc, avec une mémoire bornée
+        
+        Args:
+            infos_fichier: Dictionnaire des informations du fichier
+            
+        Returns:
+            Liste des informations sensibles découvertes, None si le fichier n'a pas pu être analysé
+        """
+        reponse = self.scanner_github.ouvrir_flux_fichier(infos_fichier['url_telechargement'])
+        if reponse is None:
+            return None
+        
+        try:
+            return list(self.detecteur_secret.detecter_secrets_dans_flux(reponse.raw, infos_fichier['chemin']))
+        except Exception as e:
+            print(f"  ⚠️  Échec de l'analyse en flux de {infos_fichier['chemin']} : {e}")
+            return None
+        finally:
+            reponse.close()
+    
+    def _depuis_cache(self, sha: Optional[str], chemin_fichier: str, decouvertes_directes: List[Dict]) -> bool:
+        """
+        Reprendre les découvertes d'un blob déjà analysé (sans téléchargement ni détection)
+        
+        Args:
+            sha: SHA du blob, None si inconnu
+            chemin_fichier: Chemin du fichier dans le dépôt
+            decouvertes_directes: Liste complétée avec les découvertes mémorisées
+            
+        Returns:
+            True si le blob était dans le cache
+        """
+        if self.cache_blobs is None or not sha:
+            return False
+        decouvertes = self.cache_blobs.obtenir(sha, chemin_fichier)
+        if decouvertes is None:
+            return False
+        decouvertes_directes.extend(decouvertes)
+        return True
+    
+    def _memoriser(self, sha: Optional[str], decouvertes: List[Dict]):
+        """
+        Mémoriser les découvertes d'un blob dans le cache
+        
+        Args:
+            sha: SHA du blob, None si inconnu
+            decouvertes: Découvertes du détecteur pour ce blob
+        """
+        if self.cache_blobs is not None and sha:
+            self.cache_blobs.memoriser(sha, decouvertes)
+    
+    def _contenus_api(self, nom_complet_depot: str, fichiers: List[Dict], decouvertes_directes: List[Dict],
+                      shas: Dict[str, str], reference: Optional[str] = None) -> Iterator[Tuple[str, bytes]]:
+        """
+        Récupérer le contenu des fichiers, plusieurs téléchargements à la fois
+        
+        Les fichiers sont téléchargés par leur URL de contenu brut avec un nombre borné de
+        requêtes en cours, ou par lots de requêtes GraphQL en mode graphql, pendant que les
+        fichiers déjà reçus sont analysés. Les fichiers sans contenu passent par l'API, un par un.
+        
+        Args:
+            nom_complet_depot: Nom complet du dépôt (proprietaire/depot)
+            fichiers: Liste d'informations sur les fichiers
+            decouvertes_directes: Liste complétée avec les découvertes obtenues sans les processus de
+                                  détection (gros fichiers analysés en flux, blobs déjà en cache)
+            shas: Dictionnaire chemin -> SHA de blob complété pour les fichiers produits
+            reference: Révision listée (SHA du commit), par défaut la branche par défaut
+            
+        Yields:
+            (chemin du fichier, contenu brut)
+        """
+        a_telecharger = []
+        gros_fichiers = []
+        
+        # Sélectionner les fichiers à récupérer
+        for infos_fichier in fichiers:
+            # Vérifier si ce fichier doit être analysé
+            if not self.detecteur_secret.devrait_analyser_fichier(infos_fichier['chemin']):
+                continue
+            
+            # Contenu déjà analysé dans un autre dépôt ou une analyse précédente
+            if self._depuis_cache(infos_fichier.get('sha'), infos_fichier['chemin'], decouvertes_directes):
+                continue
+            
+            # Ignorer les fichiers trop volumineux, lire en flux les gros fichiers
+            taille = infos_fichier.get('taille') or 0
+            if taille > TAILLE_MAX_FICHIER:
+                continue
+            if taille > TAILLE_MIN_FLUX and infos_fichier.get('url_telechargement'):
+                gros_fichiers.append(infos_fichier)
+                continue
+            
+            a_telecharger.append(infos_fichier)
+        
+        if self.recuperateur_graphql is not None:
+            # Blobs binaires ou trop volumineux écartés par le récupérateur avant téléchargement
+            telechargements = self.recuperateur_graphql.recuperer(nom_complet_depot, a_telecharger,
+                                                                  reference or "HEAD")
+        else:
+            telechargements = self.recuperateur.recuperer(a_telecharger)
+        
+        for infos_fichier, contenu in telechargements:
+            if contenu is None and not infos_fichier.get('url_telechargement'):
+                # Obtenir le contenu brut du fichier via l'API
+                contenu = self.scanner_github.obtenir_contenu_fichier_octets(
+                    nom_complet_depot,
+                    infos_fichier['chemin']
+                )
+            
+            # Contenu brut, décodé seulement pour les lignes trouvées
+            if contenu and not self.scanner_github.est_binaire(contenu):
+                if infos_fichier.get('sha'):
+                    shas[infos_fichier['chemin']] = infos_fichier['sha']
+                yield infos_fichier['chemin'], contenu
+        
+        # Les gros fichiers sont analysés en flux une fois les autres téléchargés
+        for infos_fichier in gros_fichiers:
+            decouvertes = self._analyser_fichier_en_flux(infos_fichier)
+            if decouvertes is not None:
+                self._memoriser(infos_fichier.get('sha'), decouvertes)
+                decouvertes_directes.extend(decouvertes)
+    
+    def _contenus_archive(self, reponse, decouvertes_directes: List[Dict],
+                          shas: Dict[str, str]) -> Iterator[Tuple[str, bytes]]:
+        """
+        Lire le contenu des fichiers depuis l'archive du dépôt, en flux et sans extraction sur disque
+        
+        Args:
+            reponse: Réponse HTTP en flux de l'archive (fermée à la fin du parcours)
+            decouvertes_directes: Liste complétée avec les découvertes obtenues sans les processus de
+                                  détection (gros fichiers analysés en flux, blobs déjà en cache)
+            shas: Dictionnaire chemin -> SHA de blob complété pour les fichiers produits
+            
+        Yields:
+            (chemin du fichier, contenu brut)
+        """
+        try:
+            for infos_fichier, flux in self.scanner_github.parcourir_archive(
+                reponse.raw,
+                filtre_dossier=self.detecteur_secret.devrait_parcourir_dossier,
+                filtre_fichier=self.detecteur_secret.devrait_analyser_fichier
+            ):
+                # Ignorer les fichiers trop volumineux, analyser en flux les gros fichiers
+                taille = infos_fichier['taille']
+                if taille > TAILLE_MAX_FICHIER:
+                    continue
+                if taille > TAILLE_MIN_FLUX:
+                    # Le SHA du blob est calculé pendant la lecture, pour mémoriser les découvertes
+                    flux_empreinte = FluxEmpreinte(flux, taille)
+                    decouvertes = list(
+                        self.detecteur_secret.detecter_secrets_dans_flux(flux_empreinte, infos_fichier['chemin'])
+                    )
+                    self._memoriser(flux_empreinte.sha, decouvertes)
+                    decouvertes_directes.extend(decouvertes)
+                    continue
+                
+                contenu = flux.read()
+                if not contenu or self.scanner_github.est_binaire(contenu):
+                    continue
+                
+                # L'archive ne donne pas le SHA des blobs : il est calculé sur le contenu
+                sha = calculer_sha_blob(contenu)
+                if self._depuis_cache(sha, infos_fichier['chemin'], decouvertes_directes):
+                    continue
+                shas[infos_fichier['chemin']] = sha
+                yield infos_fichier['chemin'], contenu
+        except (tarfile.TarError, OSError, requests.RequestException) as e:
+            print(f"  ⚠️  Lecture de l'archive interrompue : {e}")
+        finally:
+            reponse.close()
+    
+    def _contenus_clone(self, dossier_clone: str, decouvertes_directes: List[Dict],
+                        shas: Dict[str, str]) -> Iterator[Tuple[str, bytes]]:
+        """
+        Lire le contenu des fichiers d'un clone local, plusieurs fichiers à la fois
+        
+        Args:
+            dossier_clone: Répertoire du clone
+            decouvertes_directes: Liste complétée avec les découvertes obtenues sans les processus de
+                                  détection (gros fichiers analysés en flux, blobs déjà en cache)
+            shas: Dictionnaire chemin -> SHA de blob complété pour les fichiers produits
+            
+        Yields:
+            (chemin du fichier, contenu brut), dans l'ordre du parcours
+        """
+        def lire(chemin_absolu: str) -> Optional[bytes]:
+            try:
+                with open(chemin_absolu, 'rb') as f:
+                    return f.read()
+            except OSError:
+                return None
+        
+        # SHA des blobs lus dans l'index du clone, sans lire les fichiers
+        shas_clone = self.scanner_github.lister_blobs_clone(dossier_clone)
+        
+        fichiers = self.scanner_github.parcourir_dossier_local(
+            dossier_clone,
+            filtre_dossier=self.detecteur_secret.devrait_parcourir_dossier,
+            filtre_fichier=self.detecteur_secret.devrait_analyser_fichier
+        )
+        
+        with ThreadPoolExecutor(max_workers=self.threads_lecture) as lecteurs:
+            # Fenêtre bornée de lectures en cours : la mémoire ne dépend pas de la taille du dépôt
+            lectures = deque()
+            for infos_fichier, chemin_absolu in fichiers:
+                sha = shas_clone.get(infos_fichier['chemin'])
+                if self._depuis_cache(sha, infos_fichier['chemin'], decouvertes_directes):
+                    continue
+                
+                # Ignorer les fichiers trop volumineux, analyser en flux les gros fichiers
+                taille = infos_fichier['taille']
+                if taille > TAILLE_MAX_FICHIER:
+                    continue
+                if taille > TAILLE_MIN_FLUX:
+                    with open(chemin_absolu, 'rb') as flux:
+                        decouvertes = list(
+                            self.detecteur_secret.detecter_secrets_dans_flux(flux, infos_fichier['chemin'])
+                        )
+                    self._memoriser(sha, decouvertes)
+                    decouvertes_directes.extend(decouvertes)
+                    continue
+                
+                if sha:
+                    shas[infos_fichier['chemin']] = sha
+                lectures.append((infos_fichier['chemin'], lecteurs.submit(lire, chemin_absolu)))
+                while len(lectures) > 2 * self.threads_lecture:
+                    yield from self._lecture_terminee(*lectures.popleft())
+            
+            while lectures:
+                yield from self._lecture_terminee(*lectures.popleft())
+    
+    def _lecture_terminee(self, chemin: str, lecture: Future) -> Iterator[Tuple[str, bytes]]:
+        """
+        Attendre la lecture d'un fichier local et l'écarter s'il est vide ou binaire
+        
+        Args:
+            chemin: Chemin du fichier dans le dépôt
+            lecture: Lecture en cours
+            
+        Yields:
+            (chemin du fichier, contenu brut) si le fichier doit être analysé
+        """
+        contenu = lecture.result()
+        if contenu and not self.scanner_github.est_binaire(contenu):
+            yield chemin, contenu
+    
     def _analyser_depot(self, depot: Dict, type_analyse: str = "inconnu") -> List[Dict]:
         """
         Analyser un seul dépôt
         
+        Un dépôt déjà analysé dont le dernier commit n'a pas changé n'est pas réanalysé, sauf
+        réanalyse forcée (reanalyse_forcee, toujours complète). En modes
+        api et graphql, seuls les fichiers ajoutés ou modifiés depuis le commit analysé la dernière
+        fois sont récupérés (différence des deux arbres) ; les modes archive et clone réanalysent
+        tout le dépôt, les blobs inchangés étant servis par le cache des blobs. Chaque fichier
+        analysé est enregistré dans le journal de reprise, et les fichiers qui y figurent déjà
+        (dépôt interrompu) ne sont pas analysés à nouveau.
+        
         Args:
             depot: Dictionnaire des informations du dépôt
             type_analyse: Type d'analyse
@@ -284,42 +718,119 @@ class CloudScanner:
         decouvertes = []
         heure_analyse = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         nom_depot = depot.get('nom_complet', 'inconnu')
+        pousse_le = depot.get('pousse_le')
+        dossier_clone = None
+        
+        # Analyse précédente, base d'une analyse incrémentale (sauf réanalyse forcée : analyse
+        # complète même sans nouveau commit, par exemple pour un dépôt choisi par le planificateur)
+        infos_precedentes = {}
+        if self.sauter_analyses and not depot.get('reanalyse_forcee'):
+            infos_precedentes = self.historique_analyse.obtenir_infos_analyse(nom_depot) or {}
+        commit_precedent = infos_precedentes.get('dernier_commit')
+        # Problèmes des fichiers inchangés depuis le commit précédent, repris après une analyse incrémentale
+        problemes_inchanges = None
+        
+        # Fichiers analysés avant une interruption, et enregistrement des suivants
+        deja_analyses = self.journal.fichiers_termines(nom_depot)
+        if deja_analyses:
+            print(f"  🔁 Reprise du dépôt : {len(deja_analyses)} fichier(s) déjà analysé(s)")
+        rappel = None
+        if self.journal.actif:
+            def rappel(chemin: str, secrets: List[Dict]):
+                self.journal.fichier_termine(nom_depot, chemin, secrets)
         
         try:
-            # Obtenir la liste des fichiers du dépôt
-            fichiers = self.scanner_github.obtenir_fichiers_depot(depot['nom_complet'])
-            
-            # Si l'obtention de la liste des fichiers échoue (par exemple erreur 403), retourner directement
-            if not fichiers:
-                # Enregistrer dans l'historique d'analyse pour éviter de l'analyser à nouveau
-                self.historique_analyse.marquer_comme_analyse(nom_depot, 0, f"{type_analyse}:pas-acces")
+            # Révision analysée : le même commit pour la liste des fichiers et leurs contenus
+            commit = self.scanner_github.obtenir_commit_tete(depot['nom_complet'], depot.get('branche'))
+            if depot.get('reanalyse_forcee') and commit is not None and commit == depot.get('dernier_commit'):
+                print(f"  🔁 Réanalyse complète, sans nouveau commit depuis la dernière analyse ({commit[:7]})")
+            if commit is not None and commit == commit_precedent:
+                print(f"  ⏭️  Aucun nouveau commit depuis la dernière analyse ({commit[:7]})")
+                self.historique_analyse.marquer_comme_analyse(nom_depot, infos_precedentes.get('compte_problemes', 0),
+                                                             type_analyse, commit, pousse_le)
                 return decouvertes
             
-            # Analyser chaque fichier
-            for infos_fichier in fichiers:
-                # Vérifier si ce fichier doit être analysé
-                if not self.detecteur_secret.devrait_analyser_fichier(infos_fichier['chemin']):
-                    continue
-                
-                # Obtenir le contenu du fichier
-                contenu = self.scanner_github.obtenir_contenu_fichier(
+            # Découvertes des gros fichiers, analysés en flux dans ce processus
+            decouvertes_directes = []
+            shas = {}  # Chemin -> SHA de blob des fichiers envoyés à la détection
+            contenus = None
+            
+            # Mode archive : tout le dépôt en un seul téléchargement
+            if self.mode_recuperation == 'archive':
+                reponse = self.scanner_github.ouvrir_archive_depot(depot['nom_complet'], commit)
+                if reponse is not None:
+                    contenus = self._contenus_archive(reponse, decouvertes_directes, shas)
+            
+            # Mode clone : clone superficiel, puis lecture locale de la copie de travail
+            elif self.mode_recuperation == 'clone' and depot.get('url_clone'):
+                dossier_clone = self.scanner_github.cloner_depot(
+                    depot['url_clone'], self.detecteur_secret.dossiers_exclus
+                )
+                if dossier_clone is not None:
+                    contenus = self._contenus_clone(dossier_clone, decouvertes_directes, shas)
+            
+            if contenus is None:
+                # Obtenir la liste des fichiers du dépôt
+                fichiers = self.scanner_github.obtenir_fichiers_depot(
                     depot['nom_complet'],
-                    infos_fichier['chemin']
+                    filtre_dossier=self.detecteur_secret.devrait_parcourir_dossier,
+                    filtre_fichier=self.detecteur_secret.devrait_analyser_fichier,
+                    reference=commit
                 )
                 
-                if contenu:
-                    # Détecter les informations sensibles
-                    secrets = self.detecteur_secret.detecter_secrets_dans_texte(
-                        contenu,
-                        infos_fichier['chemin']
-                    )
-                    
-                    # Ajouter les informations du dépôt
-                    for secret in secrets:
-                        secret['url_depot'] = depot.get('url', f"https://github.com/{nom_depot}")
-                        secret['nom_depot'] = depot['nom_complet']
-                        secret['heure_analyse'] = heure_analyse
-                        decouvertes.append(secret)
+                # Si l'obtention de la liste des fichiers échoue (par exemple erreur 403), retourner directement
+                if not fichiers:
+                    # Enregistrer dans l'historique d'analyse pour éviter de l'analyser à nouveau
+                    self.historique_analyse.marquer_comme_analyse(nom_depot, 0, f"{type_analyse}:pas-acces",
+                                                                 pousse_le=pousse_le)
+                    return decouvertes
+                
+                # Analyse incrémentale : seuls les blobs ajoutés ou modifiés depuis le commit précédent
+                # (entrées de l'historique antérieures au décompte par fichier : analyse complète)
+                problemes_precedents = infos_precedentes.get('problemes_par_chemin')
+                if commit is not None and commit_precedent and problemes_precedents is not None:
+                    blobs_precedents = self.scanner_github.obtenir_blobs_arbre(depot['nom_complet'], commit_precedent)
+                    if blobs_precedents is None:
+                        print(f"  ℹ️  Arbre du commit {commit_precedent[:7]} indisponible, analyse complète")
+                    else:
+                        total_fichiers = len(fichiers)
+                        inchanges = {
+                            infos_fichier['chemin'] for infos_fichier in fichiers
+                            if infos_fichier.get('sha')
+                            and blobs_precedents.get(infos_fichier['chemin']) == infos_fichier['sha']
+                        }
+                        fichiers = [
+                            infos_fichier for infos_fichier in fichiers if infos_fichier['chemin'] not in inchanges
+                        ]
+                        # Fichiers modifiés ou supprimés : leurs anciens problèmes ne comptent plus
+                        problemes_inchanges = {
+                            chemin: compte for chemin, compte in problemes_precedents.items() if chemin in inchanges
+                        }
+                        print(f"  🔀 Analyse incrémentale depuis {commit_precedent[:7]} : "
+                              f"{len(fichiers)}/{total_fichiers} fichier(s) ajouté(s) ou modifié(s)")
+                
+                if deja_analyses:
+                    fichiers = [
+                        infos_fichier for infos_fichier in fichiers if infos_fichier['chemin'] not in deja_analyses
+                    ]
+                contenus = self._contenus_api(depot['nom_complet'], fichiers, decouvertes_directes, shas, commit)
+            elif deja_analyses:
+                contenus = ((chemin, contenu) for chemin, contenu in contenus if chemin not in deja_analyses)
+            
+            # Détecter les informations sensibles dans les processus de travail,
+            # pendant que les fichiers suivants sont récupérés
+            resultats = self.executeur_detection.analyser(contenus, rappel)
+            for chemin, secrets in resultats:
+                self._memoriser(shas.get(chemin), secrets)
+            
+            resultats.extend(deja_analyses.items())
+            for secrets in [secrets for _, secrets in resultats] + [decouvertes_directes]:
+                # Ajouter les informations du dépôt
+                for secret in secrets:
+                    secret['url_depot'] = depot.get('url', f"https://github.com/{nom_depot}")
+                    secret['nom_depot'] = depot['nom_complet']
+                    secret['heure_analyse'] = heure_analyse
+                    decouvertes.append(secret)
             
             # Déduplication et filtrage
             decouvertes = self.detecteur_secret.dedoubler_decouvertes(decouvertes)
@@ -330,18 +841,35 @@ class CloudScanner:
             else:
                 print(f"  ✅ Aucun problème apparent détecté")
             
-            # Enregistrer dans l'historique d'analyse
-            self.historique_analyse.marquer_comme_analyse(nom_depot, len(decouvertes), type_analyse)
-                
+            # Enregistrer dans l'historique d'analyse, avec le commit analysé et les problèmes de
+            # chaque fichier ; les problèmes des fichiers inchangés restent comptés après une
+            # analyse incrémentale
+            problemes_par_chemin = dict(problemes_inchanges or {})
+            for decouverte in decouvertes:
+                chemin = decouverte['chemin_fichier']
+                problemes_par_chemin[chemin] = problemes_par_chemin.get(chemin, 0) + 1
+            self.historique_analyse.marquer_comme_analyse(nom_depot, sum(problemes_par_chemin.values()), type_analyse,
+                                                         commit, pousse_le, problemes_par_chemin)
+        
         except Exception as e:
             msg_erreur = str(e)
             # Traitement silencieux des erreurs 403
             if "403" in msg_erreur or "Forbidden" in msg_erreur:
                 print(f"  ⏭️  Ignorer : accès non autorisé")
-                self.historique_analyse.marquer_comme_analyse(nom_depot, 0, f"{type_analyse}:interdit")
+                self.historique_analyse.marquer_comme_analyse(nom_depot, 0, f"{type_analyse}:interdit",
+                                                             pousse_le=pousse_le)
             else:
                 print(f"  ❌ Échec de l'analyse : {e}")
                 # Même en cas d'échec de l'analyse, enregistrer pour éviter de réessayer
-                self.historique_analyse.marquer_comme_analyse(nom_depot, 0, f"{type_analyse}:echec")
+                self.historique_analyse.marquer_comme_analyse(nom_depot, 0, f"{type_analyse}:echec",
+                                                             pousse_le=pousse_le)
+        finally:
+            # Le clone est toujours supprimé, même après une erreur
+            if dossier_clone is not None:
+                self.scanner_github.supprimer_clone(dossier_clone)
+            if self.cache_blobs is not None:
+                self.cache_blobs.valider()
+            if self.cache_http is not None:
+                self.cache_http.valider()
         
         return decouvertes
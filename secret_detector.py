@@ -1,25 +1,390 @@
-
 """
 Module de détection d'informations sensibles
 """
+import mmap
 import re
-from typing import List, Dict, Optional
-from config import MODELES_SENSIBLES, EXTENSIONS_EXCLUES, DOSSIERS_EXCLUS
+from time import perf_counter
+from array import array
+from bisect import bisect_right
+from typing import List, Dict, Optional, Tuple, Union, BinaryIO, Iterator, Iterable, Callable
+from config import (
+    MODELES_SENSIBLES, EXTENSIONS_EXCLUES, DOSSIERS_EXCLUS, ANALYSE_TAMPON_ENTIER, ENCODAGES,
+    TAILLE_BLOC_FLUX, RECOUVREMENT_MAX_FLUX, PROFILAGE_REGLES, BUDGET_REGLE_SECONDES
+)
+from rule_pack import PaquetRegles
+from rule_profiler import ProfileurRegles, BudgetFichier, RANG_MOTEUR_COMBINE
+
+# Mots-clés indiquant du code d'exemple
+MOTS_CLES_EXEMPLES = [
+    'exemple', 'sample', 'demo', 'test', 'placeholder',
+    'your_api_key', 'your-api-key', 'xxx', 'yyy',
+    'todo', 'replace', 'change_me', 'changeme'
+]
+
+# Modèles évidents de texte de substitution, compilés une seule fois
+MODELES_SUBSTITUTION = [
+    re.compile(r'x{10,}', re.IGNORECASE),   # Plusieurs x
+    re.compile(r'_+', re.IGNORECASE),       # Plusieurs underscores
+    re.compile(r'\*{3,}', re.IGNORECASE),  # Plusieurs astérisques
+]
+
+# Premier caractère d'une règle quand c'est un littéral (caractère ordinaire ou ponctuation échappée)
+MODELE_TETE_LITTERALE = re.compile(r'\\[^0-9A-Za-z]|[^\\\[\](){}.*+?^$|]')
+
+# Contenus acceptés par le détecteur : texte décodé ou octets bruts
+Tampon = Union[str, bytes, bytearray, memoryview, mmap.mmap]
+
+
+class IndexLignes:
+    """Index des débuts de ligne d'un texte, construit à la demande"""
+    
+    def __init__(self, texte: Tampon):
+        """
+        Initialisation de l'index
+        
+        Args:
+            texte: Texte ou tampon d'octets à indexer
+        """
+        self.texte = texte
+        self._debuts = None
+    
+    @property
+    def debuts(self) -> array:
+        """Positions de début de chaque ligne (la ligne 1 commence à 0)"""
+        if self._debuts is None:
+            saut_ligne = '\n' if isinstance(self.texte, str) else b'\n'
+            self._debuts = array('q', [0])
+            self._debuts.extend(correspondance.end() for correspondance in re.finditer(saut_ligne, self.texte))
+        return self._debuts
+    
+    def __len__(self) -> int:
+        """Nombre de lignes du texte"""
+        return len(self.debuts)
+    
+    def numero_ligne(self, position: int) -> int:
+        """
+        Trouver le numéro de ligne (à partir de 1) d'une position par dichotomie
+        
+        Args:
+            position: Position dans le texte
+            
+        Returns:
+            Numéro de ligne
+        """
+        return bisect_right(self.debuts, position)
+    
+    def bornes_lignes(self, premiere: int, derniere: int) -> Tuple[int, int]:
+        """
+        Obtenir les bornes d'un groupe de lignes, sans le saut de ligne final
+        
+        Args:
+            premiere: Numéro de la première ligne
+            derniere: Numéro de la dernière ligne
+            
+        Returns:
+            (début, fin) dans le texte
+        """
+        debuts = self.debuts
+        fin = debuts[derniere] - 1 if derniere < len(debuts) else len(self.texte)
+        return debuts[premiere - 1], fin
+    
+    def extrait(self, debut: int, fin: int) -> Union[str, bytes]:
+        """
+        Découper une portion du texte (copiée en bytes pour les tampons)
+        
+        Args:
+            debut: Position de début
+            fin: Position de fin
+            
+        Returns:
+            Portion du texte
+        """
+        portion = self.texte[debut:fin]
+        if isinstance(portion, (memoryview, bytearray)):
+            return bytes(portion)
+        return portion
+    
+    def ligne(self, numero: int) -> Union[str, bytes]:
+        """
+        Découper une seule ligne du texte
+        
+        Args:
+            numero: Numéro de ligne
+            
+        Returns:
+            Contenu de la ligne
+        """
+        return self.extrait(*self.bornes_lignes(numero, numero))
+
+
+class JeuRegles:
+    """Règles d'un paquet, compilées à la demande pour du texte ou pour des octets"""
+    
+    def __init__(self, paquet: PaquetRegles, octets: bool = False):
+        """
+        Initialisation du jeu de règles
+        
+        Seul l'automate des ancres est compilé immédiatement : une règle n'est compilée que
+        la première fois que son ancre apparaît, ce qui rend le démarrage quasi instantané.
+        
+        Args:
+            paquet: Paquet de règles analysées
+            octets: Compiler les règles pour des tampons d'octets plutôt que du texte
+        """
+        self.paquet = paquet
+        self.octets = octets
+        self.sources = paquet.sources
+        
+        if octets:
+            self.ancres = [ancre.encode('utf-8') if ancre is not None else None for ancre in paquet.ancres]
+            self.ancres_minimales = [ancre.encode('utf-8') for ancre in paquet.ancres_minimales]
+        else:
+            self.ancres = paquet.ancres
+            self.ancres_minimales = paquet.ancres_minimales
+        
+        # Longueur de la plus longue correspondance possible (bornée pour les quantificateurs infinis)
+        self.longueur_max = min(max(paquet.largeurs_max, default=0), RECOUVREMENT_MAX_FLUX)
+        
+        # Automate de sous-chaînes : alternative des ancres minimales, la plus longue d'abord
+        self.automate_ancres = None
+        if self.ancres_minimales:
+            separateur = b'|' if octets else '|'
+            self.automate_ancres = re.compile(separateur.join(
+                re.escape(ancre) for ancre in sorted(self.ancres_minimales, key=len, reverse=True)
+            ))
+        
+        self._modeles: List[Optional[re.Pattern]] = [None] * len(self.sources)
+        self._moteur_combine = None
+        self._moteur_combine_compile = False
+        # Rang de la règle de chaque groupe nommé du moteur combiné, règles combinées à partir
+        # de chaque règle combinée, et règles laissées hors du moteur (appliquées une par une)
+        self._rangs_groupes: Dict[str, int] = {}
+        self._combinees_suivantes: Dict[int, List[int]] = {}
+        self._rangs_separes: Tuple[int, ...] = tuple(range(len(self.sources)))
+    
+    def modele(self, rang: int) -> re.Pattern:
+        """
+        Obtenir une règle compilée, en la compilant à la première utilisation
+        
+        Args:
+            rang: Rang de la règle
+            
+        Returns:
+            Expression régulière compilée
+        """
+        modele = self._modeles[rang]
+        if modele is None:
+            source = self.sources[rang]
+            modele = re.compile(source.encode('utf-8') if self.octets else source)
+            self._modeles[rang] = modele
+        return modele
+    
+    @property
+    def modeles(self) -> List[re.Pattern]:
+        """Toutes les règles compilées"""
+        return [self.modele(rang) for rang in range(len(self.sources))]
+    
+    @property
+    def moteur_combine(self) -> Optional[re.Pattern]:
+        """Moteur combiné : les règles combinables en une seule expression, un groupe nommé par règle"""
+        if not self._moteur_combine_compile:
+            self._compiler_moteur_combine()
+        return self._moteur_combine
+    
+    @property
+    def rangs_groupes(self) -> Dict[str, int]:
+        """Rang de la règle de chaque groupe nommé du moteur combiné"""
+        if not self._moteur_combine_compile:
+            self._compiler_moteur_combine()
+        return self._rangs_groupes
+    
+    @property
+    def combinees_suivantes(self) -> Dict[int, List[int]]:
+        """Pour chaque règle combinée, elle-même et les règles de même premier caractère essayées après elle"""
+        if not self._moteur_combine_compile:
+            self._compiler_moteur_combine()
+        return self._combinees_suivantes
+    
+    @property
+    def rangs_separes(self) -> Tuple[int, ...]:
+        """Règles qui ne peuvent pas être combinées, appliquées une par une"""
+        if not self._moteur_combine_compile:
+            self._compiler_moteur_combine()
+        return self._rangs_separes
+    
+    @staticmethod
+    def contient(tampon: Tampon, motif: Union[str, bytes]) -> bool:
+        """
+        Tester la présence d'une sous-chaîne dans un texte ou un tampon
+        
+        Args:
+            tampon: Texte ou tampon d'octets
+            motif: Sous-chaîne recherchée
+            
+        Returns:
+            Si la sous-chaîne est présente (toujours True pour un memoryview, sans recherche)
+        """
+        if isinstance(tampon, (str, bytes, bytearray)):
+            return motif in tampon
+        if isinstance(tampon, mmap.mmap):
+            # L'opérateur in d'un mmap ne cherche que des octets isolés
+            return tampon.find(motif) != -1
+        return True
+    
+    def peut_correspondre(self, tampon: Tampon) -> bool:
+        """
+        Test rapide au niveau du fichier : au moins une ancre est-elle présente ?
+        
+        Args:
+            tampon: Texte ou tampon d'octets
+            
+        Returns:
+            False seulement si aucune règle ne peut correspondre
+        """
+        if self.automate_ancres is None:
+            return True
+        if isinstance(tampon, memoryview):
+            return self.automate_ancres.search(tampon) is not None
+        return any(self.contient(tampon, ancre) for ancre in self.ancres_minimales)
+    
+    def lignes_candidates(self, tampon: Tampon, index: IndexLignes) -> Optional[List[int]]:
+        """
+        Trouver les lignes contenant au moins une ancre littérale
+        
+        Args:
+            tampon: Texte ou tampon d'octets
+            index: Index des débuts de ligne du tampon
+            
+        Returns:
+            Numéros de ligne triés, None si le préfiltre n'est pas applicable
+            (au moins une règle sans ancre)
+        """
+        if self.automate_ancres is None:
+            return None
+        
+        numeros = []
+        for correspondance in self.automate_ancres.finditer(tampon):
+            numero_ligne = index.numero_ligne(correspondance.start())
+            if not numeros or numeros[-1] != numero_ligne:
+                numeros.append(numero_ligne)
+        
+        return numeros
+    
+    @staticmethod
+    def combinable(source: str) -> bool:
+        """
+        Vérifier qu'une règle peut faire partie du moteur combiné sans changer ses correspondances
+        
+        Args:
+            source: Motif de la règle
+            
+        Returns:
+            False pour les drapeaux globaux (comme (?i) au début de la règle, qui s'appliqueraient
+            à toute l'alternative), les groupes nommés et les références à un groupe (dont les noms
+            et les numéros changent dans l'alternative)
+        """
+        try:
+            modele = re.compile(source)
+        except re.error:
+            return False
+        if modele.flags & ~re.UNICODE or modele.groupindex:
+            return False
+        return re.search(r'\\[1-9]|\(\?\(', source) is None
+    
+    @staticmethod
+    def tete_litterale(source: str) -> Optional[str]:
+        """
+        Extraire le caractère littéral par lequel commence une règle
+        
+        Args:
+            source: Motif de la règle
+            
+        Returns:
+            Texte du premier caractère (échappé ou non), None s'il n'est pas un littéral simple
+        """
+        tete = MODELE_TETE_LITTERALE.match(source)
+        if tete is None or source[tete.end():tete.end() + 1] in ('*', '+', '?', '{'):
+            return None
+        return tete.group(0)
+    
+    def _compiler_moteur_combine(self):
+        """
+        Compiler les règles combinables en une seule alternative de groupes nommés
+        
+        Les règles sont regroupées par premier caractère littéral : l'alternative commence alors
+        par un littéral dans chaque branche, et le moteur d'expressions régulières ne l'essaie
+        qu'aux positions dont le caractère commence au moins une règle. Le groupe de la règle,
+        (?P<r{rang}>...), suit ce caractère : il ne sert qu'à l'attribution (lastgroup), la
+        correspondance entière étant celle de la règle. Les règles sans premier caractère
+        littéral, et celles qui ne peuvent pas être combinées, restent hors du moteur.
+        """
+        groupes: Dict[str, List[int]] = {}
+        for rang, source in enumerate(self.sources):
+            tete = self.tete_litterale(source) if self.combinable(source) else None
+            if tete is not None:
+                groupes.setdefault(tete, []).append(rang)
+        
+        # Ordre des règles dans l'alternative : celui dans lequel le moteur les essaie
+        combinees = [rang for rangs in groupes.values() for rang in rangs]
+        self._moteur_combine = None
+        if combinees:
+            motif = '|'.join(
+                tete + '(?:' + '|'.join(f'(?P<r{rang}>{self.sources[rang][len(tete):]})' for rang in rangs) + ')'
+                for tete, rangs in groupes.items()
+            )
+            try:
+                self._moteur_combine = re.compile(motif.encode('utf-8') if self.octets else motif)
+            except re.error:
+                combinees = []
+        
+        self._rangs_groupes = {f'r{rang}': rang for rang in combinees}
+        # Seules les règles de même premier caractère peuvent correspondre à la même position
+        self._combinees_suivantes = {
+            rang: rangs[position:] for rangs in groupes.values() for position, rang in enumerate(rangs)
+        } if combinees else {}
+        self._rangs_separes = tuple(sorted(frozenset(range(len(self.sources))) - frozenset(combinees)))
+        self._moteur_combine_compile = True
 
 
 class DetecteurSecret:
     """Détecteur d'informations sensibles"""
     
-    def __init__(self, modeles: List[str] = MODELES_SENSIBLES):
+    def __init__(self, modeles: List[str] = MODELES_SENSIBLES, tampon_entier: bool = ANALYSE_TAMPON_ENTIER,
+                 profilage: bool = PROFILAGE_REGLES, budget_regle: float = BUDGET_REGLE_SECONDES):
         """
         Initialisation du détecteur
         
         Args:
             modeles: Liste de motifs d'expressions régulières
+            tampon_entier: Appliquer les règles au texte entier plutôt que ligne par ligne,
+                           ce qui permet les correspondances sur plusieurs lignes
+            profilage: Enregistrer les compteurs de chaque règle (appels, correspondances, temps)
+            budget_regle: Temps maximal (secondes) d'une règle sur un fichier avant son abandon
+                          pour ce fichier, 0 pour désactiver
         """
-        self.modeles = [re.compile(modele) for modele in modeles]
-        self.extensions_exclues = EXTENSIONS_EXCLUES
-        self.dossiers_exclus = DOSSIERS_EXCLUS
+        self.tampon_entier = tampon_entier
+        self.budget_regle = budget_regle
+        # Analyse des règles lue depuis le cache sur disque, reconstruite si config.py a changé
+        self.paquet = PaquetRegles.charger(modeles)
+        self.regles_texte = JeuRegles(self.paquet)
+        self.regles_octets = JeuRegles(self.paquet, octets=True)
+        self.profileur = ProfileurRegles(self.paquet, actif=profilage)
+        # Ensembles précalculés : un test par suffixe ou par composant de chemin
+        self.extensions_exclues = frozenset(ext.lower() for ext in EXTENSIONS_EXCLUES)
+        self.dossiers_exclus = frozenset(DOSSIERS_EXCLUS)
+        # Fonction appelée avec le rang de chaque règle (ou RANG_MOTEUR_COMBINE) juste avant son
+        # application, pour qu'un autre processus puisse interrompre un appel qui ne se termine pas
+        self.surveillance: Optional[Callable[[int], None]] = None
+    
+    @property
+    def modeles(self) -> List[re.Pattern]:
+        """Liste des règles compilées"""
+        return self.regles_texte.modeles
+    
+    @property
+    def version_regles(self) -> str:
+        """Version des résultats : empreinte du paquet de règles et mode d'analyse"""
+        return f"{self.paquet.cle[:16]}:{'tampon' if self.tampon_entier else 'ligne'}"
     
     def devrait_analyser_fichier(self, chemin_fichier: str) -> bool:
         """
@@ -31,58 +396,465 @@ class DetecteurSecret:
         Returns:
             Si le fichier doit être analysé
         """
-        # Vérifier l'extension du fichier
-        for ext in self.extensions_exclues:
-            if chemin_fichier.lower().endswith(ext):
-                return False
-        
         # Vérifier le répertoire
         parties_chemin = chemin_fichier.split('/')
-        for dossier_exclu in self.dossiers_exclus:
-            if dossier_exclu in parties_chemin:
+        if not self.dossiers_exclus.isdisjoint(parties_chemin):
+            return False
+        
+        # Vérifier l'extension du fichier : chaque suffixe commençant par un point (.gz, .tar.gz, ...)
+        nom_fichier = parties_chemin[-1].lower()
+        position = nom_fichier.find('.')
+        while position != -1:
+            if nom_fichier[position:] in self.extensions_exclues:
                 return False
+            position = nom_fichier.find('.', position + 1)
         
         return True
     
-    def detecter_secrets_dans_texte(self, texte: str, chemin_fichier: str = "") -> List[Dict]:
+    def devrait_parcourir_dossier(self, chemin_dossier: str) -> bool:
+        """
+        Déterminer si un répertoire doit être parcouru
+        
+        Args:
+            chemin_dossier: Chemin du répertoire
+            
+        Returns:
+            Si le répertoire peut contenir des fichiers à analyser
+        """
+        return self.dossiers_exclus.isdisjoint(chemin_dossier.split('/'))
+    
+    def peut_contenir_secret(self, texte: Tampon) -> bool:
+        """
+        Test rapide par ancres, sans appliquer les règles
+        
+        Args:
+            texte: Contenu à analyser, texte décodé ou octets bruts
+            
+        Returns:
+            False seulement si aucune règle ne peut correspondre
+        """
+        jeu = self.regles_texte if isinstance(texte, str) else self.regles_octets
+        if isinstance(texte, memoryview) and texte.format != 'B':
+            texte = texte.cast('B')
+        return jeu.peut_correspondre(texte)
+    
+    def detecter_secrets_dans_texte(self, texte: Tampon, chemin_fichier: str = "",
+                                    regles_exclues: Iterable[int] = ()) -> List[Dict]:
         """
         Détecter les informations sensibles dans un texte
         
         Args:
-            texte: Contenu texte à analyser
+            texte: Contenu à analyser, texte décodé ou octets bruts (bytes, memoryview, mmap)
+            chemin_fichier: Chemin du fichier (pour le rapport)
+            regles_exclues: Rangs des règles déjà abandonnées pour ce fichier
+                            (RANG_MOTEUR_COMBINE pour appliquer les règles une par une)
+                            
+        Returns:
+            Liste des informations sensibles détectées
+        """
+        budget = BudgetFichier(self.budget_regle)
+        budget.abandonnees.update(regles_exclues)
+        return self._detecter(texte, chemin_fichier, budget=budget)
+    
+    def detecter_secrets_dans_flux(self, flux: BinaryIO, chemin_fichier: str = "",
+                                   taille_bloc: int = TAILLE_BLOC_FLUX) -> Iterator[Dict]:
+        """
+        Détecter les informations sensibles dans un flux, bloc par bloc
+        
+        La mémoire utilisée reste bornée quelle que soit la taille du fichier. En mode ligne,
+        les blocs sont coupés après le dernier saut de ligne, ce qui donne exactement les mêmes
+        résultats qu'une analyse du contenu entier. En mode tampon entier, ou pour une ligne plus
+        longue qu'un bloc, les blocs se recouvrent de la longueur de la plus longue correspondance
+        possible (bornée par RECOUVREMENT_MAX_FLUX pour les quantificateurs infinis).
+        
+        Args:
+            flux: Flux binaire lisible (fichier ouvert, réponse HTTP, etc.)
+            chemin_fichier: Chemin du fichier (pour le rapport)
+            taille_bloc: Nombre d'octets lus à chaque étape
+            
+        Yields:
+            Informations sensibles détectées, avec leur numéro de ligne dans le fichier entier
+        """
+        recouvrement = self.regles_octets.longueur_max
+        tampon = b''
+        debut_min = 0   # Les correspondances avant cette position ont déjà été signalées
+        ligne_base = 1  # Numéro de ligne du premier octet du tampon
+        fins_regles = {}  # Fin de la dernière correspondance signalée de chaque règle
+        budget = BudgetFichier(self.budget_regle)  # Partagé par tous les blocs du fichier
+        
+        while True:
+            bloc = flux.read(taille_bloc)
+            final = not bloc
+            tampon += bloc
+            
+            if final:
+                for decouverte in self._detecter(tampon, chemin_fichier, debut_min, fins_regles=fins_regles,
+                                                 budget=budget):
+                    decouverte['numero_ligne'] += ligne_base - 1
+                    yield decouverte
+                return
+            
+            fin_lignes = tampon.rfind(b'\n') + 1
+            if not self.tampon_entier and fin_lignes > debut_min:
+                # Mode ligne : analyser toutes les lignes complètes, garder la ligne en cours
+                coupe = reprise = fin_lignes
+                limite = None
+            elif len(tampon) >= taille_bloc + recouvrement:
+                # Coupe forcée : les correspondances qui commencent dans le recouvrement
+                # seront signalées à l'étape suivante
+                coupe = len(tampon) - recouvrement
+                limite = coupe
+                # Reprendre au début de la ligne de la coupe pour garder le contenu de ligne complet
+                reprise = tampon.rfind(b'\n', 0, coupe) + 1
+                if coupe - reprise > taille_bloc:
+                    reprise = coupe
+            else:
+                continue
+            
+            for decouverte in self._detecter(tampon[:coupe] if limite is None else tampon,
+                                             chemin_fichier, debut_min, limite, fins_regles, budget):
+                decouverte['numero_ligne'] += ligne_base - 1
+                yield decouverte
+            
+            ligne_base += tampon.count(b'\n', 0, reprise)
+            debut_min = coupe - reprise
+            fins_regles = {rang: fin - reprise for rang, fin in fins_regles.items() if fin > reprise}
+            tampon = tampon[reprise:]
+    
+    def _detecter(self, texte: Tampon, chemin_fichier: str, debut_min: int = 0,
+                  debut_max: Optional[int] = None, fins_regles: Optional[Dict[int, int]] = None,
+                  budget: Optional[BudgetFichier] = None) -> List[Dict]:
+        """
+        Détecter les informations sensibles dont la correspondance commence dans un intervalle
+        
+        Args:
+            texte: Contenu à analyser
             chemin_fichier: Chemin du fichier (pour le rapport)
+            debut_min: Position minimale de début d'une correspondance
+            debut_max: Position maximale (exclue) de début d'une correspondance, None si aucune
+            fins_regles: Fin de la dernière correspondance déjà retenue de chaque règle, mise à jour
+                         au fur et à mesure (les correspondances qui la chevauchent sont ignorées)
+            budget: Temps consommé par chaque règle sur le fichier, None pour un nouveau fichier
             
         Returns:
             Liste des informations sensibles détectées
         """
         if not texte:
             return []
+        if budget is None:
+            budget = BudgetFichier(self.budget_regle)
+        
+        # Les octets sont analysés directement, seules les lignes trouvées sont décodées
+        jeu = self.regles_texte if isinstance(texte, str) else self.regles_octets
+        if isinstance(texte, memoryview) and texte.format != 'B':
+            texte = texte.cast('B')
+        
+        # Test rapide au niveau du fichier : la plupart des fichiers ne contiennent aucune ancre
+        if not jeu.peut_correspondre(texte):
+            return []
+        
+        index = IndexLignes(texte)
+        if self.tampon_entier:
+            return self._detecter_dans_tampon(jeu, texte, index, chemin_fichier, debut_min, debut_max,
+                                              fins_regles, budget)
+        
+        # Préfiltre par ancres : seules les lignes contenant une ancre sont découpées
+        numeros_candidats = jeu.lignes_candidates(texte, index)
+        if numeros_candidats is None:
+            numeros_candidats = range(1, len(index) + 1)
+        
+        # Le profilage mesure chaque règle séparément : le moteur combiné n'est alors pas utilisé
+        moteur_actif = jeu.moteur_combine is not None and not self.profileur.actif
         
         decouvertes = []
-        lignes = texte.split('\n')
-        
-        for numero_ligne, ligne in enumerate(lignes, 1):
-            for modele in self.modeles:
-                correspondances = modele.finditer(ligne)
-                for correspondance in correspondances:
-                    # Extraire la clé correspondante
-                    secret = correspondance.group(0)
-                    
-                    # Vérifier si c'est probablement un commentaire ou un exemple
-                    if self._est_probablement_exemple(ligne, secret):
-                        continue
-                    
-                    decouvertes.append({
-                        'chemin_fichier': chemin_fichier,
-                        'numero_ligne': numero_ligne,
-                        'contenu_ligne': ligne.strip(),
-                        'secret': secret,
-                        'modele': modele.pattern,
-                        'confiance': self._calculer_confiance(secret, ligne)
-                    })
+        for numero_ligne in numeros_candidats:
+            debut_ligne, fin_ligne = index.bornes_lignes(numero_ligne, numero_ligne)
+            if fin_ligne < debut_min or (debut_max is not None and debut_ligne >= debut_max):
+                continue
+            ligne = index.extrait(debut_ligne, fin_ligne)
+            
+            # Une seule passe du moteur combiné pour toutes les règles combinables. S'il dépasse
+            # le budget (une règle coûteuse en fait partie), les règles sont appliquées une par
+            # une pour que seule la règle fautive soit abandonnée
+            correspondances = None
+            if moteur_actif and not budget.epuise(RANG_MOTEUR_COMBINE):
+                correspondances = self._parcourir_moteur_combine(jeu, ligne, budget)
+            if correspondances is None:
+                correspondances = []
+                individuelles = self._regles_presentes(jeu, ligne, range(len(jeu.sources)), budget)
+            else:
+                individuelles = self._regles_presentes(jeu, ligne, jeu.rangs_separes, budget)
+            
+            for rang in individuelles:
+                if self.surveillance is not None:
+                    self.surveillance(rang)
+                debut_chrono = perf_counter()
+                trouvees = list(jeu.modele(rang).finditer(ligne))
+                self._mesurer(rang, perf_counter() - debut_chrono, len(trouvees), len(ligne),
+                              budget, chemin_fichier)
+                correspondances.extend((rang, correspondance) for correspondance in trouvees)
+            
+            # Même ordre que l'application règle par règle : par règle, puis par position
+            correspondances.sort(key=lambda element: (element[0], element[1].start()))
+            for rang, correspondance in correspondances:
+                debut = debut_ligne + correspondance.start()
+                if not self._debut_retenu(rang, debut, debut_ligne + correspondance.end(),
+                                          debut_min, debut_max, fins_regles):
+                    continue
+                
+                decouverte = self._creer_decouverte(
+                    correspondance.group(0), ligne, numero_ligne, jeu.sources[rang], chemin_fichier
+                )
+                if decouverte:
+                    decouvertes.append(decouverte)
         
         return decouvertes
     
+    @staticmethod
+    def _regles_presentes(jeu: JeuRegles, texte: Tampon, rangs: Iterable[int], budget: BudgetFichier) -> List[int]:
+        """
+        Filtrer les règles à appliquer une par une
+        
+        Args:
+            jeu: Règles compilées adaptées au type du contenu
+            texte: Contenu à analyser
+            rangs: Rangs des règles candidates, dans l'ordre
+            budget: Temps consommé par chaque règle sur le fichier
+            
+        Returns:
+            Rangs des règles dont l'ancre obligatoire est présente et qui ne sont pas abandonnées
+            pour ce fichier
+        """
+        return [
+            rang for rang in rangs
+            if (jeu.ancres[rang] is None or jeu.contient(texte, jeu.ancres[rang])) and rang not in budget.abandonnees
+        ]
+    
+    def _parcourir_moteur_combine(self, jeu: JeuRegles, texte: Tampon, budget: BudgetFichier, debut: int = 0,
+                                  debut_max: Optional[int] = None) -> Optional[List[Tuple[int, re.Match]]]:
+        """
+        Trouver en une seule passe les correspondances de toutes les règles combinées
+        
+        À chaque position trouvée, le groupe de la correspondance (lastgroup) désigne la première
+        règle de l'alternative qui y correspond : seules les règles de même premier caractère que
+        le moteur essaie après elle peuvent aussi y correspondre, et elles ne sont essayées qu'à
+        cette position. La recherche reprend à la position suivante, et les correspondances qui
+        chevauchent la précédente de la même règle sont ignorées : le résultat est exactement
+        celui de finditer() appliqué règle par règle.
+        
+        Args:
+            jeu: Règles compilées adaptées au type du contenu
+            texte: Contenu à analyser
+            budget: Temps consommé par chaque règle sur le fichier
+            debut: Position de début de la recherche
+            debut_max: Position maximale (exclue) de début d'une correspondance, None si aucune
+            
+        Returns:
+            Couples (rang, correspondance) dans l'ordre des positions, None si le moteur a
+            dépassé son budget (les règles doivent alors être appliquées une par une)
+        """
+        if self.surveillance is not None:
+            self.surveillance(RANG_MOTEUR_COMBINE)
+        moteur = jeu.moteur_combine
+        fins: Dict[int, int] = {}
+        correspondances = []
+        position = debut
+        debut_chrono = perf_counter()
+        
+        while True:
+            if budget.epuise(RANG_MOTEUR_COMBINE, perf_counter() - debut_chrono):
+                budget.consommer(RANG_MOTEUR_COMBINE, perf_counter() - debut_chrono)
+                return None
+            
+            trouvee = moteur.search(texte, position)
+            if trouvee is None:
+                break
+            position = trouvee.start()
+            if debut_max is not None and position >= debut_max:
+                break
+            
+            premiere = jeu.rangs_groupes[trouvee.lastgroup]
+            for rang in jeu.combinees_suivantes[premiere]:
+                if rang in budget.abandonnees or position < fins.get(rang, 0):
+                    continue
+                correspondance = trouvee if rang == premiere else jeu.modele(rang).match(texte, position)
+                if correspondance is not None:
+                    correspondances.append((rang, correspondance))
+                    fins[rang] = correspondance.end()
+            position += 1
+        
+        budget.consommer(RANG_MOTEUR_COMBINE, perf_counter() - debut_chrono)
+        return correspondances
+    
+    def _detecter_dans_tampon(self, jeu: JeuRegles, texte: Tampon, index: IndexLignes,
+                              chemin_fichier: str, debut_min: int = 0, debut_max: Optional[int] = None,
+                              fins_regles: Optional[Dict[int, int]] = None,
+                              budget: Optional[BudgetFichier] = None) -> List[Dict]:
+        """
+        Appliquer les règles une seule fois sur le texte entier (une passe du moteur combiné)
+        
+        Les numéros de ligne sont retrouvés par dichotomie dans l'index, et les lignes
+        ne sont découpées que pour les correspondances effectives.
+        
+        Args:
+            jeu: Règles compilées adaptées au type du contenu
+            texte: Contenu à analyser
+            index: Index des débuts de ligne du texte
+            chemin_fichier: Chemin du fichier (pour le rapport)
+            debut_min: Position minimale de début d'une correspondance
+            debut_max: Position maximale (exclue) de début d'une correspondance, None si aucune
+            fins_regles: Fin de la dernière correspondance déjà retenue de chaque règle
+            budget: Temps consommé par chaque règle sur le fichier
+            
+        Returns:
+            Liste des informations sensibles détectées, dans l'ordre des lignes
+        """
+        if budget is None:
+            budget = BudgetFichier(self.budget_regle)
+        
+        # Une seule passe du moteur combiné, sauf pour le profilage ou au-delà de son budget
+        correspondances = None
+        if jeu.moteur_combine is not None and not self.profileur.actif and not budget.epuise(RANG_MOTEUR_COMBINE):
+            correspondances = self._parcourir_moteur_combine(jeu, texte, budget, debut_min, debut_max)
+        if correspondances is None:
+            correspondances = []
+            individuelles = self._regles_presentes(jeu, texte, range(len(jeu.sources)), budget)
+        else:
+            # Ignorer les règles dont l'ancre obligatoire est absente du texte,
+            # et celles abandonnées pour ce fichier
+            individuelles = self._regles_presentes(jeu, texte, jeu.rangs_separes, budget)
+        
+        for rang in individuelles:
+            if self.surveillance is not None:
+                self.surveillance(rang)
+            debut_chrono = perf_counter()
+            nombre_correspondances = 0
+            for correspondance in jeu.modele(rang).finditer(texte, debut_min):
+                # Arrêter la règle entre deux correspondances si son budget est dépassé
+                if budget.epuise(rang, perf_counter() - debut_chrono):
+                    break
+                nombre_correspondances += 1
+                if debut_max is not None and correspondance.start() >= debut_max:
+                    break
+                correspondances.append((rang, correspondance))
+            
+            self._mesurer(rang, perf_counter() - debut_chrono, nombre_correspondances, len(texte),
+                          budget, chemin_fichier)
+        
+        resultats = []
+        for rang, correspondance in correspondances:
+            debut, fin = correspondance.span()
+            if not self._debut_retenu(rang, debut, fin, debut_min, debut_max, fins_regles):
+                continue
+            numero_ligne = index.numero_ligne(debut)
+            
+            # Lignes couvertes par la correspondance (une seule dans la plupart des cas)
+            derniere_ligne = index.numero_ligne(max(debut, fin - 1))
+            ligne = index.extrait(*index.bornes_lignes(numero_ligne, derniere_ligne))
+            
+            decouverte = self._creer_decouverte(
+                correspondance.group(0), ligne, numero_ligne, jeu.sources[rang], chemin_fichier
+            )
+            if decouverte:
+                resultats.append(((numero_ligne, rang, debut), decouverte))
+        
+        resultats.sort(key=lambda resultat: resultat[0])
+        return [decouverte for _, decouverte in resultats]
+    
+    def _mesurer(self, rang: int, duree: float, correspondances: int, longueur: int,
+                 budget: BudgetFichier, chemin_fichier: str):
+        """
+        Comptabiliser un appel d'une règle et l'abandonner pour le fichier si elle dépasse son budget
+        
+        Args:
+            rang: Rang de la règle
+            duree: Temps de l'appel (secondes)
+            correspondances: Nombre de correspondances trouvées
+            longueur: Longueur du texte analysé
+            budget: Temps consommé par chaque règle sur le fichier
+            chemin_fichier: Chemin du fichier (pour le rapport)
+        """
+        if self.profileur.actif:
+            self.profileur.enregistrer(rang, duree, correspondances, longueur)
+        if budget.consommer(rang, duree):
+            self.profileur.abandonner(rang, chemin_fichier, budget.durees[rang], budget.limite)
+    
+    @staticmethod
+    def _debut_retenu(rang: int, debut: int, fin: int, debut_min: int, debut_max: Optional[int],
+                      fins_regles: Optional[Dict[int, int]]) -> bool:
+        """
+        Vérifier qu'une correspondance doit être signalée lors de cette étape
+        
+        Args:
+            rang: Rang de la règle
+            debut: Position de début de la correspondance
+            fin: Position de fin de la correspondance
+            debut_min: Position minimale de début
+            debut_max: Position maximale (exclue) de début, None si aucune
+            fins_regles: Fin de la dernière correspondance retenue de chaque règle
+            
+        Returns:
+            Si la correspondance est retenue
+        """
+        if debut < debut_min or (debut_max is not None and debut >= debut_max):
+            return False
+        if fins_regles is not None:
+            if debut < fins_regles.get(rang, 0):
+                return False
+            fins_regles[rang] = fin
+        return True
+    
+    def _creer_decouverte(self, secret: Union[str, bytes], ligne: Union[str, bytes], numero_ligne: int,
+                          modele: str, chemin_fichier: str) -> Optional[Dict]:
+        """
+        Construire une découverte à partir d'une correspondance
+        
+        Args:
+            secret: Clé correspondante
+            ligne: Ligne(s) contenant la clé
+            numero_ligne: Numéro de ligne
+            modele: Motif source de la règle
+            chemin_fichier: Chemin du fichier (pour le rapport)
+            
+        Returns:
+            Découverte, None si c'est probablement un exemple
+        """
+        # Décoder uniquement les lignes trouvées lorsque le contenu est en octets
+        if isinstance(ligne, bytes):
+            ligne = self._decoder(ligne)
+            secret = self._decoder(secret)
+        
+        # Vérifier si c'est probablement un commentaire ou un exemple
+        if self._est_probablement_exemple(ligne, secret):
+            return None
+        
+        return {
+            'chemin_fichier': chemin_fichier,
+            'numero_ligne': numero_ligne,
+            'contenu_ligne': ligne.strip(),
+            'secret': secret,
+            'modele': modele,
+            'confiance': self._calculer_confiance(secret, ligne)
+        }
+    
+    @staticmethod
+    def _decoder(octets: bytes) -> str:
+        """
+        Décoder des octets en essayant successivement les encodages configurés
+        
+        Args:
+            octets: Octets à décoder
+            
+        Returns:
+            Texte décodé
+        """
+        for encodage in ENCODAGES:
+            try:
+                return octets.decode(encodage)
+            except UnicodeDecodeError:
+                continue
+        return octets.decode('utf-8', errors='replace')
+    
     def _est_probablement_exemple(self, ligne: str, secret: str) -> bool:
         """
         Déterminer si c'est probablement du code d'exemple
@@ -97,25 +869,13 @@ class DetecteurSecret:
         ligne_minuscules = ligne.lower()
         
         # Vérifier la présence de mots-clés liés aux exemples
-        mots_cles_exemples = [
-            'exemple', 'sample', 'demo', 'test', 'placeholder',
-            'your_api_key', 'your-api-key', 'xxx', 'yyy',
-            'todo', 'replace', 'change_me', 'changeme'
-        ]
-        
-        for mot_cle in mots_cles_exemples:
+        for mot_cle in MOTS_CLES_EXEMPLES:
             if mot_cle in ligne_minuscules:
                 return True
         
         # Vérifier si la clé contient des modèles évidents de texte de substitution
-        modeles_substitution = [
-            r'x{10,}',  # Plusieurs x
-            r'_+',      # Plusieurs underscores
-            r'\*{3,}',  # Plusieurs astérisques
-        ]
-        
-        for modele in modeles_substitution:
-            if re.search(modele, secret, re.IGNORECASE):
+        for modele in MODELES_SUBSTITUTION:
+            if modele.search(secret):
                 return True
         
         return False
@@ -0,0 +1,37 @@
+"""
+Configuration commune des tests - Dépôt de référence et scanner isolé dans un répertoire temporaire
+"""
+import os
+import sys
+from typing import Dict
+
+import pytest
+
+# Les modules du projet sont à la racine du dépôt
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scanner import CloudScanner  # noqa: E402
+
+# Clé au format OpenAI, sans aucun mot-clé d'exemple (elle serait écartée comme exemple)
+SECRET = 'sk-' + 'Q7vR2mK9pL4nW8zH' * 3
+
+# Fichiers du dépôt de référence : le même secret dans un fichier analysé et dans un répertoire exclu
+FICHIERS_DEPOT: Dict[str, bytes] = {
+    'app/config.py': f'OPENAI_API_KEY = "{SECRET}"\n'.encode('utf-8'),
+    'node_modules/paquet/index.js': f'const cle = "{SECRET}";\n'.encode('utf-8'),
+    'README.md': b'# Depot de reference\n',
+}
+
+
+def secrets_trouves(decouvertes):
+    """Couples (chemin, secret) des découvertes retenues par le détecteur"""
+    return sorted((decouverte['chemin_fichier'], decouverte['secret']) for decouverte in decouvertes)
+
+
+@pytest.fixture
+def scanner(tmp_path, monkeypatch):
+    """Scanner dont les caches, l'historique et le journal sont créés dans un répertoire temporaire"""
+    monkeypatch.chdir(tmp_path)
+    scanner = CloudScanner('jeton-de-test', mode_recuperation='archive')
+    yield scanner
+    scanner.fermer()
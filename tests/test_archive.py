@@ -0,0 +1,110 @@
+"""
+Tests du mode archive - Archive tar servie par un serveur HTTP local à la place de l'API GitHub
+"""
+import gzip
+import io
+import tarfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+import scanner as module_scanner
+from blob_cache import calculer_sha_blob
+from conftest import SECRET, FICHIERS_DEPOT, secrets_trouves
+
+# Répertoire racine ajouté par GitHub à chaque entrée de l'archive
+RACINE_ARCHIVE = 'proprio-depot-abc1234'
+
+
+def construire_archive(fichiers):
+    """Archive tar.gz des fichiers, au format des archives de l'API GitHub"""
+    tampon = io.BytesIO()
+    with tarfile.open(fileobj=tampon, mode='w:gz') as archive:
+        for chemin, contenu in fichiers.items():
+            membre = tarfile.TarInfo(f'{RACINE_ARCHIVE}/{chemin}')
+            membre.size = len(contenu)
+            archive.addfile(membre, io.BytesIO(contenu))
+    return tampon.getvalue()
+
+
+@pytest.fixture
+def serveur_archive():
+    """Serveur HTTP qui répond à /repos/proprio/depot/tarball/<référence> ; retourne (url, requêtes, fichiers)"""
+    fichiers = dict(FICHIERS_DEPOT)
+    requetes = []
+    
+    class Gestionnaire(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requetes.append(self.path)
+            if not self.path.startswith('/repos/proprio/depot/tarball/'):
+                self.send_error(404)
+                return
+            corps = construire_archive(fichiers)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-gzip')
+            self.send_header('Content-Length', str(len(corps)))
+            self.end_headers()
+            self.wfile.write(corps)
+        
+        def log_message(self, *args):
+            pass
+    
+    serveur = ThreadingHTTPServer(('127.0.0.1', 0), Gestionnaire)
+    thread = threading.Thread(target=serveur.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{serveur.server_address[1]}', requetes, fichiers
+    serveur.shutdown()
+    serveur.server_close()
+
+
+def lire_archive(scanner, url):
+    """Ouvrir l'archive du dépôt de test et analyser les fichiers produits par _contenus_archive"""
+    scanner.scanner_github.url_api = url
+    reponse = scanner.scanner_github.ouvrir_archive_depot('proprio/depot', 'abc1234')
+    assert reponse is not None
+    decouvertes_directes = []
+    shas = {}
+    contenus = list(scanner._contenus_archive(reponse, decouvertes_directes, shas))
+    decouvertes = list(decouvertes_directes)
+    for chemin, contenu in contenus:
+        decouvertes.extend(scanner.detecteur_secret.detecter_secrets_dans_texte(contenu, chemin))
+    return contenus, shas, decouvertes
+
+
+def test_parcourir_archive_ecarte_les_dossiers_exclus():
+    detecteur = module_scanner.DetecteurSecret()
+    archive = io.BytesIO(construire_archive(FICHIERS_DEPOT))
+    chemins = [
+        infos['chemin'] for infos, flux in module_scanner.ScannerGitHub.parcourir_archive(
+            gzip.GzipFile(fileobj=archive),
+            filtre_dossier=detecteur.devrait_parcourir_dossier,
+            filtre_fichier=detecteur.devrait_analyser_fichier
+        )
+    ]
+    assert chemins == ['app/config.py', 'README.md']
+
+
+def test_archive_trouve_le_secret_hors_dossiers_exclus(scanner, serveur_archive):
+    url, requetes, _ = serveur_archive
+    contenus, shas, decouvertes = lire_archive(scanner, url)
+    
+    assert requetes == ['/repos/proprio/depot/tarball/abc1234']
+    assert [chemin for chemin, _ in contenus] == ['app/config.py', 'README.md']
+    assert shas['app/config.py'] == calculer_sha_blob(FICHIERS_DEPOT['app/config.py'])
+    assert secrets_trouves(decouvertes) == [('app/config.py', SECRET)]
+
+
+def test_archive_memorise_les_gros_fichiers_lus_en_flux(scanner, serveur_archive, monkeypatch):
+    url, _, fichiers = serveur_archive
+    gros = (b'# remplissage\n' * 200) + f'OPENAI_API_KEY = "{SECRET}"\n'.encode('utf-8')
+    fichiers['app/gros.py'] = gros
+    monkeypatch.setattr(module_scanner, 'TAILLE_MIN_FLUX', 1024)
+    
+    contenus, _, decouvertes = lire_archive(scanner, url)
+    
+    # Analysé en flux, hors des processus de détection
+    assert 'app/gros.py' not in [chemin for chemin, _ in contenus]
+    assert ('app/gros.py', SECRET) in secrets_trouves(decouvertes)
+    memorisees = scanner.cache_blobs.obtenir(calculer_sha_blob(gros), 'app/gros.py')
+    assert secrets_trouves(memorisees) == [('app/gros.py', SECRET)]
@@ -0,0 +1,76 @@
+"""
+Tests du filtre de Bloom - Reconstruction du fichier pendant qu'un autre processus le lit
+"""
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+import pytest
+
+from bloom_filter import FiltreBloom
+
+# Dépôts connus du filtre d'origine
+DEPOTS = [f'proprio{i}/depot{i}' for i in range(500)]
+
+# Reconstruction dans un autre processus : filtre de la capacité demandée, rempli puis enregistré
+RECONSTRUCTION = textwrap.dedent('''
+    import sys
+    from bloom_filter import FiltreBloom
+    chemin, capacite, nombre = sys.argv[1], int(sys.argv[2]), int(sys.argv[3])
+    filtre = FiltreBloom.creer(chemin, capacite, 0.01, 'reconstruit')
+    for i in range(nombre):
+        filtre.ajouter(f'autre{i}/depot{i}')
+    filtre.fermer()
+''')
+
+
+@pytest.fixture
+def fichier_filtre(tmp_path):
+    """Fichier d'un filtre contenant DEPOTS"""
+    chemin = tmp_path / 'filtre.bloom'
+    filtre = FiltreBloom.creer(str(chemin), 1000, 0.01, 'origine')
+    for nom in DEPOTS:
+        filtre.ajouter(nom)
+    filtre.fermer()
+    return chemin
+
+
+@pytest.mark.parametrize('capacite', [100_000, 50], ids=['agrandi', 'reduit'])
+def test_lecteur_pendant_reconstruction(fichier_filtre, capacite):
+    """Un lecteur ouvert garde l'ancien filtre complet pendant et après la reconstruction"""
+    lecteur = FiltreBloom.ouvrir(str(fichier_filtre), prive=True)
+    try:
+        subprocess.run([sys.executable, '-c', RECONSTRUCTION, str(fichier_filtre), str(capacite), '900'],
+                       cwd=Path(__file__).resolve().parent.parent, check=True)
+        
+        assert lecteur.identifiant == 'origine'
+        assert all(nom in lecteur for nom in DEPOTS)
+    finally:
+        lecteur.fermer()
+    
+    # Les nouveaux lecteurs voient le filtre reconstruit, aucun fichier temporaire ne reste
+    filtre = FiltreBloom.ouvrir(str(fichier_filtre), prive=True)
+    assert filtre.identifiant == 'reconstruit'
+    assert filtre.capacite == capacite
+    assert 'autre0/depot0' in filtre
+    filtre.fermer()
+    assert [chemin.name for chemin in fichier_filtre.parent.iterdir()] == ['filtre.bloom']
+
+
+def test_filtre_publie_une_fois_rempli(fichier_filtre):
+    """Un filtre en construction n'est visible à son chemin qu'après sa synchronisation"""
+    filtre = FiltreBloom.creer(str(fichier_filtre), 2000, 0.01, 'reconstruit')
+    filtre.ajouter('autre/depot')
+    
+    pendant = FiltreBloom.ouvrir(str(fichier_filtre), prive=True)
+    assert pendant.identifiant == 'origine'
+    assert all(nom in pendant for nom in DEPOTS)
+    pendant.fermer()
+    
+    filtre.synchroniser()
+    apres = FiltreBloom.ouvrir(str(fichier_filtre), prive=True)
+    assert apres.identifiant == 'reconstruit'
+    assert 'autre/depot' in apres
+    apres.fermer()
+    filtre.fermer()
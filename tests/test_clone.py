@@ -0,0 +1,66 @@
+"""
+Tests du mode clone - Dépôt nu local cloné par file://
+"""
+import os
+import subprocess
+
+import pytest
+
+from blob_cache import calculer_sha_blob
+from conftest import SECRET, FICHIERS_DEPOT, secrets_trouves
+
+
+def git(*arguments, dossier=None):
+    """Exécuter une commande git avec une identité de test"""
+    commande = ['git'] + (['-C', str(dossier)] if dossier else []) + list(arguments)
+    environnement = dict(os.environ, GIT_AUTHOR_NAME='test', GIT_AUTHOR_EMAIL='test@exemple.org',
+                         GIT_COMMITTER_NAME='test', GIT_COMMITTER_EMAIL='test@exemple.org')
+    subprocess.run(commande, check=True, capture_output=True, env=environnement)
+
+
+@pytest.fixture
+def depot_nu(tmp_path_factory):
+    """Dépôt nu contenant les fichiers de référence ; retourne son URL file://"""
+    racine = tmp_path_factory.mktemp('depots')
+    travail = racine / 'travail'
+    nu = racine / 'depot.git'
+    for chemin, contenu in FICHIERS_DEPOT.items():
+        fichier = travail / chemin
+        fichier.parent.mkdir(parents=True, exist_ok=True)
+        fichier.write_bytes(contenu)
+    
+    git('init', '--quiet', '--initial-branch=main', str(travail))
+    git('add', '.', dossier=travail)
+    git('commit', '--quiet', '-m', 'Fichiers de reference', dossier=travail)
+    git('clone', '--quiet', '--bare', str(travail), str(nu))
+    # Le filtre --filter=blob:none du clone superficiel est accepté comme avec GitHub
+    git('config', 'uploadpack.allowFilter', 'true', dossier=nu)
+    return nu.as_uri()
+
+
+def test_clone_trouve_le_secret_hors_dossiers_exclus(scanner, depot_nu):
+    dossier = scanner.scanner_github.cloner_depot(depot_nu, scanner.detecteur_secret.dossiers_exclus)
+    assert dossier is not None
+    try:
+        # Les répertoires exclus ne sont pas extraits (sparse checkout)
+        assert os.path.isfile(os.path.join(dossier, 'app', 'config.py'))
+        assert not os.path.exists(os.path.join(dossier, 'node_modules'))
+        
+        decouvertes_directes = []
+        shas = {}
+        contenus = list(scanner._contenus_clone(dossier, decouvertes_directes, shas))
+    finally:
+        scanner.scanner_github.supprimer_clone(dossier)
+    
+    assert not os.path.exists(dossier)
+    assert [chemin for chemin, _ in contenus] == ['README.md', 'app/config.py']
+    assert shas['app/config.py'] == calculer_sha_blob(FICHIERS_DEPOT['app/config.py'])
+    
+    decouvertes = list(decouvertes_directes)
+    for chemin, contenu in contenus:
+        decouvertes.extend(scanner.detecteur_secret.detecter_secrets_dans_texte(contenu, chemin))
+    assert secrets_trouves(decouvertes) == [('app/config.py', SECRET)]
+
+
+def test_clone_inaccessible(scanner, tmp_path):
+    assert scanner.scanner_github.cloner_depot((tmp_path / 'absent.git').as_uri(), delai=30) is None
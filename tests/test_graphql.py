@@ -0,0 +1,148 @@
+"""
+Tests du récupérateur GraphQL - Serveur HTTP local qui interprète les champs object() avec alias
+"""
+import json
+import re
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+from graphql_fetcher import RecuperateurGraphQL, CHAMPS_METADONNEES, CHAMPS_TEXTE
+from conftest import SECRET
+
+# Champs avec alias au-delà desquels le serveur refuse la requête (MAX_NODE_LIMIT_EXCEEDED)
+ALIAS_MAX_SERVEUR = 3
+
+# Taille au-delà de laquelle le récupérateur écarte un blob
+TAILLE_MAX_TEST = 1000
+
+# Alias et expression (chaîne JSON) de chaque champ object() de la requête
+MODELE_OBJET = re.compile(r'(f\d+): object\(expression: ("(?:[^"\\]|\\.)*")\)')
+
+# Blobs du dépôt servi : texte, ou octets pour un blob binaire
+BLOBS = {
+    'app/config.py': f'OPENAI_API_KEY = "{SECRET}"\n',
+    'images/logo.png': b'\x89PNG\r\n\x1a\n\x00\x00',
+    'donnees/export.csv': 'a,b\n' * 400,
+    'README.md': '# Depot de reference\n',
+    'src/main.py': 'print("bonjour")\n',
+    'src/utilitaires.py': 'def aide():\n    pass\n',
+    'docs/guide.md': '## Guide\n',
+}
+
+
+@pytest.fixture
+def serveur_graphql():
+    """Serveur HTTP qui répond à POST /graphql ; retourne (url, requêtes reçues)"""
+    requetes = []
+    
+    class Gestionnaire(BaseHTTPRequestHandler):
+        def do_POST(self):
+            corps = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+            objets = [(alias, json.loads(expression).split(':', 1)[1])
+                      for alias, expression in MODELE_OBJET.findall(corps['query'])]
+            requetes.append({
+                'chemins': [chemin for _, chemin in objets],
+                'texte': CHAMPS_TEXTE in corps['query'],
+                'metadonnees': CHAMPS_METADONNEES in corps['query'],
+                'variables': corps['variables'],
+            })
+            
+            if len(objets) > ALIAS_MAX_SERVEUR:
+                reponse = {'errors': [{'type': 'MAX_NODE_LIMIT_EXCEEDED', 'message': 'trop de champs'}]}
+            else:
+                depot = {}
+                for alias, chemin in objets:
+                    blob = BLOBS.get(chemin)
+                    if blob is None:
+                        depot[alias] = None
+                    elif CHAMPS_TEXTE in corps['query']:
+                        depot[alias] = {'text': None if isinstance(blob, bytes) else blob, 'isTruncated': False}
+                    else:
+                        depot[alias] = {'byteSize': len(blob if isinstance(blob, bytes) else blob.encode('utf-8')),
+                                        'isBinary': isinstance(blob, bytes)}
+                reponse = {'data': {'repository': depot}}
+            
+            donnees = json.dumps(reponse).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(donnees)))
+            self.end_headers()
+            self.wfile.write(donnees)
+        
+        def log_message(self, *args):
+            pass
+    
+    serveur = ThreadingHTTPServer(('127.0.0.1', 0), Gestionnaire)
+    thread = threading.Thread(target=serveur.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{serveur.server_address[1]}/graphql', requetes
+    serveur.shutdown()
+    serveur.server_close()
+
+
+@pytest.fixture
+def recuperateur(serveur_graphql):
+    """Récupérateur dont les premiers lots dépassent la limite du serveur"""
+    url, _ = serveur_graphql
+    recuperateur = RecuperateurGraphQL('jeton-de-test', url_graphql=url, fichiers_max=8,
+                                       taille_max=TAILLE_MAX_TEST)
+    yield recuperateur
+    recuperateur.fermer()
+
+
+def test_lots_reduits_et_ordre_conserve(serveur_graphql, recuperateur):
+    """Lots coupés en deux jusqu'à être acceptés, résultats dans l'ordre d'origine"""
+    _, requetes = serveur_graphql
+    chemins = list(BLOBS) + ['introuvable.txt']
+    
+    resultats = list(recuperateur.recuperer('proprio/depot', [{'chemin': chemin} for chemin in chemins]))
+    
+    # Lots de 8 puis de 4 refusés, puis lots de 2 acceptés et conservés pour la suite
+    assert recuperateur.taille_lot == 2
+    assert [len(requete['chemins']) for requete in requetes[:3]] == [8, 4, 2]
+    assert all(len(requete['chemins']) <= 2 for requete in requetes[2:])
+    assert all(requete['variables'] == {'proprietaire': 'proprio', 'nom': 'depot'} for requete in requetes)
+    
+    # Blob binaire et blob trop volumineux écartés, chemin introuvable conservé sans contenu
+    attendus = [chemin for chemin in chemins if chemin not in ('images/logo.png', 'donnees/export.csv')]
+    assert [infos_fichier['chemin'] for infos_fichier, _ in resultats] == attendus
+    contenus = dict((infos_fichier['chemin'], contenu) for infos_fichier, contenu in resultats)
+    assert contenus['app/config.py'] == BLOBS['app/config.py'].encode('utf-8')
+    assert contenus['introuvable.txt'] is None
+
+
+def test_contenu_demande_apres_les_metadonnees(serveur_graphql, recuperateur):
+    """Le contenu des blobs binaires ou trop volumineux n'est jamais demandé"""
+    _, requetes = serveur_graphql
+    
+    list(recuperateur.recuperer('proprio/depot', [{'chemin': chemin} for chemin in BLOBS]))
+    
+    requetes_metadonnees = [requete for requete in requetes if requete['metadonnees']]
+    requetes_texte = [requete for requete in requetes if requete['texte']]
+    # Toutes les métadonnées sont lues avant le premier contenu
+    assert requetes.index(requetes_texte[0]) > requetes.index(requetes_metadonnees[-1])
+    assert {chemin for requete in requetes_metadonnees for chemin in requete['chemins']} == set(BLOBS)
+    demandes = [chemin for requete in requetes_texte for chemin in requete['chemins']]
+    assert 'images/logo.png' not in demandes
+    assert 'donnees/export.csv' not in demandes
+    assert sorted(demandes) == sorted(set(BLOBS) - {'images/logo.png', 'donnees/export.csv'})
+
+
+def test_volume_de_texte_borne(serveur_graphql):
+    """Les lots de contenu sont bornés par le volume annoncé des blobs"""
+    url, requetes = serveur_graphql
+    recuperateur = RecuperateurGraphQL('jeton-de-test', url_graphql=url, fichiers_max=ALIAS_MAX_SERVEUR,
+                                       octets_max=40, taille_max=TAILLE_MAX_TEST)
+    try:
+        resultats = list(recuperateur.recuperer('proprio/depot', [{'chemin': chemin} for chemin in BLOBS]))
+    finally:
+        recuperateur.fermer()
+    
+    assert recuperateur.taille_lot == ALIAS_MAX_SERVEUR
+    # app/config.py dépasse à lui seul le volume visé : il part seul
+    lots_texte = [requete['chemins'] for requete in requetes if requete['texte']]
+    assert ['app/config.py'] in lots_texte
+    assert all(len(BLOBS[lot[0]]) > 40 or sum(len(BLOBS[chemin]) for chemin in lot) <= 40 for lot in lots_texte)
+    assert all(contenu is not None for _, contenu in resultats)
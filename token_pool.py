@@ -0,0 +1,214 @@
+"""
+Module de la réserve de tokens - Plusieurs tokens GitHub, chaque requête utilisant celui qui a le plus grand budget
+"""
+import threading
+from pathlib import Path
+from typing import List, Dict, Optional, Iterable
+import requests
+from github import Github
+from http_cache import CacheHttp, monter_cache_http
+from rate_limiter import LimiteurTaux
+from config import GITHUB_TOKEN, GITHUB_TOKENS, FICHIER_TOKENS_GITHUB
+
+
+def charger_tokens(token: str = GITHUB_TOKEN, tokens: Iterable[str] = GITHUB_TOKENS,
+                   fichier: str = FICHIER_TOKENS_GITHUB) -> List[str]:
+    """
+    Rassembler les tokens configurés, sans doublons
+    
+    Args:
+        token: Token principal (utilisé en premier à budget égal)
+        tokens: Tokens supplémentaires
+        fichier: Fichier de tokens, un par ligne (lignes vides et commentaires # ignorés)
+        
+    Returns:
+        Liste des tokens, dans l'ordre de configuration
+    """
+    candidats = [token, *tokens]
+    if fichier:
+        try:
+            with open(Path(fichier), 'r', encoding='utf-8') as f:
+                candidats.extend(ligne.split('#', 1)[0] for ligne in f)
+        except OSError as e:
+            print(f"⚠️  Lecture du fichier de tokens impossible : {e}")
+    
+    resultat = []
+    for candidat in candidats:
+        candidat = (candidat or '').strip()
+        if candidat and candidat not in resultat:
+            resultat.append(candidat)
+    return resultat
+
+
+class JetonGitHub:
+    """Un token GitHub : son client, son budget par ressource et son utilisation"""
+    
+    def __init__(self, token: str, cache_http: Optional[CacheHttp] = None):
+        """
+        Initialisation du jeton
+        
+        Args:
+            token: GitHub Personal Access Token
+            cache_http: Cache des réponses de l'API partagé entre les tokens (aucun si absent)
+        """
+        self.token = token
+        # Configuration des délais d'expiration et des tentatives pour éviter les longues attentes
+        self.github = Github(
+            token,
+            timeout=30,  # Délai d'expiration de 30 secondes
+            retry=None   # Désactive les tentatives automatiques, nous les gérons nous-mêmes
+        )
+        self.limiteur = LimiteurTaux()
+        self.requetes: Dict[str, int] = {}
+        self.quarantaine: Optional[str] = None
+        
+        session = self._session_pygithub()
+        if session is not None:
+            # Budget mis à jour par chaque réponse, dans le thread qui l'a reçue
+            session.hooks['response'].append(self._suivre_reponse)
+            if cache_http is not None:
+                monter_cache_http(session, cache_http)
+    
+    def _session_pygithub(self) -> Optional[requests.Session]:
+        """
+        Obtenir la session requests du client PyGithub
+        
+        PyGithub n'offre pas d'accès public à sa session : la connexion persistante de son
+        Requester est créée ici pour y monter le suivi des budgets et l'adaptateur du cache.
+        
+        Returns:
+            Session du client, None si cette version de PyGithub ne l'expose pas
+        """
+        try:
+            return self.github._Github__requester._Requester__createConnection().session
+        except AttributeError:
+            print("⚠️  Suivi des en-têtes X-RateLimit-* et cache HTTP indisponibles "
+                  "avec cette version de PyGithub")
+            return None
+    
+    def _suivre_reponse(self, reponse: requests.Response, *args, **kwargs):
+        """
+        Mettre à jour le budget à partir des en-têtes X-RateLimit-* d'une réponse (hook requests)
+        
+        Seules les réponses qui nomment leur ressource (X-RateLimit-Resource) sont prises en
+        compte ; les refus et les nouvelles tentatives restent traités par l'appelant.
+        
+        Args:
+            reponse: Réponse reçue par le client PyGithub
+        """
+        ressource = reponse.headers.get('X-RateLimit-Resource')
+        if ressource:
+            self.limiteur.mettre_a_jour(reponse.headers, ressource)
+    
+    @property
+    def nom(self) -> str:
+        """Token masqué, pour l'affichage"""
+        return f"{self.token[:4]}…{self.token[-4:]}" if len(self.token) > 12 else "****"
+
+
+class ReserveJetons:
+    """Réserve de tokens : chaque requête part avec le token qui a le plus grand budget pour sa ressource"""
+    
+    def __init__(self, tokens: List[str], cache_http: Optional[CacheHttp] = None):
+        """
+        Initialisation de la réserve
+        
+        Args:
+            tokens: Tokens GitHub (au moins un)
+            cache_http: Cache des réponses de l'API partagé entre les tokens (aucun si absent)
+        """
+        if not tokens:
+            raise ValueError("Token GitHub requis. Veuillez définir GITHUB_TOKEN dans le fichier .env")
+        self.jetons = [JetonGitHub(token, cache_http) for token in tokens]
+        self._verrou = threading.Lock()
+    
+    def choisir(self, ressource: str = 'core', exclus: Iterable[JetonGitHub] = ()) -> Optional[JetonGitHub]:
+        """
+        Choisir le token à utiliser pour une requête
+        
+        Les tokens dont le budget est inconnu passent en premier (leur première réponse le fera
+        connaître), puis ceux qui peuvent partir sans attendre, par budget restant décroissant.
+        
+        Args:
+            ressource: Ressource de l'API sollicitée
+            exclus: Tokens à ne pas utiliser (déjà refusés pour cette requête)
+            
+        Returns:
+            Token choisi, None si aucun token n'est utilisable
+        """
+        exclus = list(exclus)
+        meilleur = None
+        meilleur_cle = None
+        for jeton in self.jetons:
+            if jeton.quarantaine is not None or jeton in exclus:
+                continue
+            attente, restant = jeton.limiteur.disponibilite(ressource)
+            cle = (attente, -restant)
+            if meilleur is None or cle < meilleur_cle:
+                meilleur, meilleur_cle = jeton, cle
+        return meilleur
+    
+    def acquerir(self, jeton: JetonGitHub, ressource: str = 'core'):
+        """
+        Attendre le budget d'un token et comptabiliser la requête
+        
+        Args:
+            jeton: Token utilisé
+            ressource: Ressource de l'API sollicitée
+        """
+        jeton.limiteur.acquerir(ressource)
+        with self._verrou:
+            jeton.requetes[ressource] = jeton.requetes.get(ressource, 0) + 1
+    
+    def mettre_en_quarantaine(self, jeton: JetonGitHub, raison: str):
+        """
+        Écarter un token refusé par GitHub (révoqué, expiré, bloqué)
+        
+        Le dernier token utilisable n'est jamais écarté : les erreurs remontent alors
+        comme avec un seul token.
+        
+        Args:
+            jeton: Token refusé
+            raison: Motif affiché et conservé dans l'utilisation
+        """
+        with self._verrou:
+            if jeton.quarantaine is not None:
+                return
+            if not any(autre.quarantaine is None for autre in self.jetons if autre is not jeton):
+                return
+            jeton.quarantaine = raison
+        print(f"🚫 Token {jeton.nom} mis en quarantaine : {raison}")
+    
+    def utilisation(self) -> List[Dict]:
+        """
+        Obtenir l'utilisation de chaque token
+        
+        Returns:
+            Liste de dictionnaires (token masqué, requêtes et budget restant par ressource, quarantaine)
+        """
+        with self._verrou:
+            return [
+                {
+                    'token': jeton.nom,
+                    'requetes': dict(jeton.requetes),
+                    'restant': {ressource: etat['restant'] for ressource, etat in jeton.limiteur.etat().items()},
+                    'quarantaine': jeton.quarantaine,
+                }
+                for jeton in self.jetons
+            ]
+    
+    def afficher_utilisation(self):
+        """Afficher les requêtes envoyées et le budget restant de chaque token"""
+        print(f"\n🔑 Utilisation des tokens ({len(self.jetons)})")
+        for utilisation in self.utilisation():
+            requetes = ', '.join(f"{ressource}: {nombre}" for ressource, nombre in sorted(utilisation['requetes'].items()))
+            restant = ', '.join(f"{ressource}: {nombre}" for ressource, nombre in sorted(utilisation['restant'].items())
+                                if nombre is not None)
+            ligne = f"  - {utilisation['token']} : {sum(utilisation['requetes'].values())} requête(s)"
+            if requetes:
+                ligne += f" ({requetes})"
+            if restant:
+                ligne += f", restant {restant}"
+            if utilisation['quarantaine']:
+                ligne += f" — quarantaine : {utilisation['quarantaine']}"
+            print(ligne)